@@ -14,6 +14,7 @@ entry_points = {
 TESTS_REQUIRE = [
     'fudge',
     'nose',
+    'numpy',
     'nti.testing',
     'zope.dottedname',
     'zope.testrunner',
@@ -94,6 +95,9 @@ setup(
     ],
     extras_require={
         'test': TESTS_REQUIRE,
+        'analytics': [
+            'numpy',
+        ],
         'docs': [
             'Sphinx',
             'repoze.sphinx.autointerface',
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compiled snapshots of assessment indexes.
+
+A snapshot holds the internalized ``AssessmentItems`` of an index so
+they can be registered without parsing and internalizing the JSON again.
+It is made of a header (the snapshot version and the fingerprint of the
+index text it was compiled from) followed by the pickled objects.
+Snapshots must only be read from trusted locations.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import os
+import mmap
+import hashlib
+
+from six.moves import cPickle as pickle
+
+from nti.assessment._question_index import QuestionIndex
+from nti.assessment._question_index import _load_question_map_json
+
+from nti.base._compat import bytes_
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The version of the snapshot layout and of the pickled objects. Bump it
+#: whenever the internalized form of assessment objects changes.
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_MAGIC = b'NTIASMSNAPSHOT\n'
+
+PICKLE_PROTOCOL = 2
+
+
+def index_fingerprint(asm_index_text):
+    return hashlib.sha1(bytes_(asm_index_text)).hexdigest()
+
+
+def _internalize_index(index, question_index, externals=None):
+    items = question_index._index_items(index)
+    if externals is not None:
+        externals.update((k, v[1]) for k, v in items.items())
+    return [(ntiid, question_index._internalize_assessment(ntiid, ext_obj))
+            for ntiid, (_, ext_obj) in sorted(items.items())]
+
+
+def _write_index_snapshot(objects, asm_index_text, path):
+    header = {
+        'version': SNAPSHOT_VERSION,
+        'source': index_fingerprint(asm_index_text),
+    }
+    temp = '%s.%s.tmp' % (path, os.getpid())
+    try:
+        with open(temp, 'wb') as fp:
+            fp.write(SNAPSHOT_MAGIC)
+            pickle.dump(header, fp, PICKLE_PROTOCOL)
+            pickle.dump(objects, fp, PICKLE_PROTOCOL)
+        os.rename(temp, path)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def compile_index_snapshot(asm_index_text, path, question_index=None):
+    """
+    Internalize the ``AssessmentItems`` of the given index text and write
+    them to a snapshot at ``path``.
+
+    :return: The ntiids of the snapshot items.
+    """
+    question_index = question_index or QuestionIndex()
+    index = _load_question_map_json(asm_index_text) or {}
+    objects = _internalize_index(index, question_index)
+    _write_index_snapshot(objects, asm_index_text, path)
+    return [x[0] for x in objects]
+
+
+def load_index_snapshot(path, asm_index_text=None):
+    """
+    Return the (ntiid, object) items of the snapshot at ``path``, or
+    ``None`` if there is no snapshot, if it cannot be read or if it was
+    not compiled from ``asm_index_text`` by this snapshot version.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as fp:
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                if data.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                    logger.warning("%s is not an assessment snapshot", path)
+                    return None
+                header = pickle.load(data)
+                if header.get('version') != SNAPSHOT_VERSION:
+                    logger.info("Assessment snapshot %s has version %s",
+                                path, header.get('version'))
+                    return None
+                if      asm_index_text is not None \
+                    and header.get('source') != index_fingerprint(asm_index_text):
+                    logger.info("Assessment snapshot %s is stale", path)
+                    return None
+                return pickle.load(data)
+            finally:
+                data.close()
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Cannot read assessment snapshot %s", path)
+        return None
+
+
+def register_index(asm_index_text, path, registry=None, question_index=None,
+                   compile_snapshot=True):
+    """
+    Register the assessments of the given index text from its snapshot
+    at ``path``. When the snapshot is missing or stale, the index text
+    is loaded instead and, if ``compile_snapshot`` is true, a new snapshot
+    is written for the next time.
+
+    :return: The set of registered ntiids.
+    """
+    question_index = question_index or QuestionIndex()
+    externals = {}
+    items = load_index_snapshot(path, asm_index_text)
+    if items is None:
+        index = _load_question_map_json(asm_index_text)
+        if not index or question_index._check_root_index(index) is None:
+            return set()
+        # The snapshot is written from the objects we register, before
+        # registering canonicalizes them in place.
+        items = _internalize_index(index, question_index, externals)
+        if compile_snapshot:
+            try:
+                _write_index_snapshot(items, asm_index_text, path)
+            except (IOError, OSError, pickle.PicklingError):
+                logger.exception("Cannot write assessment snapshot %s", path)
+    return question_index._from_internalized([x[1] for x in items],
+                                             registry=registry,
+                                             externals=externals)
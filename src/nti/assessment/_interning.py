@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Interning of the (immutable) values read from assessment indexes.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import sys
+import threading
+
+from collections import namedtuple
+from collections import OrderedDict
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The default number of values held by the global interning pool
+DEFAULT_POOL_SIZE = 100000
+
+InterningStats = namedtuple('InterningStats',
+                            ('size', 'maxsize', 'hits', 'misses', 'evictions',
+                             'held_bytes', 'saved_bytes'))
+
+
+class InterningPool(object):
+    """
+    A pool of interned values keyed by the factory that created them and
+    their source value.
+
+    Content fragments cannot be weakly referenced, so the pool is bounded
+    by size instead: when it holds more than ``maxsize`` values, the least
+    recently used ones are evicted. A ``maxsize`` of ``None`` makes the
+    pool unbounded, which is fine for pools that live as long as a
+    single load.
+    """
+
+    def __init__(self, maxsize=DEFAULT_POOL_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+            self.held_bytes = self.saved_bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def intern(self, value, factory=None):
+        """
+        Return the pooled equivalent of ``factory(value)`` (or of ``value``
+        if no factory is given), creating and pooling it if needed.
+        """
+        key = (factory, value)
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._data[key] = entry  # most recently used
+                self.hits += 1
+                self.saved_bytes += entry[1]
+                return entry[0]
+        result = factory(value) if factory is not None else value
+        size = sys.getsizeof(result)
+        with self._lock:
+            self.misses += 1
+            entry = self._data.get(key)
+            if entry is not None:  # raced with another thread
+                return entry[0]
+            self._data[key] = (result, size)
+            self.held_bytes += size
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    _, (_, evicted) = self._data.popitem(last=False)
+                    self.held_bytes -= evicted
+                    self.evictions += 1
+        return result
+
+    def stats(self):
+        """
+        Return the :class:`InterningStats` of this pool. ``saved_bytes`` is
+        the memory not allocated because values were found in the pool,
+        ``held_bytes`` is the memory the pool currently keeps alive.
+        """
+        with self._lock:
+            return InterningStats(len(self._data), self.maxsize,
+                                  self.hits, self.misses, self.evictions,
+                                  self.held_bytes, self.saved_bytes)
+
+    def __repr__(self):
+        return '<%s size=%s maxsize=%s>' % (self.__class__.__name__,
+                                            len(self._data), self.maxsize)
+
+
+#: The process wide interning pool
+global_pool = InterningPool()
+
+
+def get_global_pool():
+    return global_pool
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Per phase timings and counts of assessment index loads.
+
+Statistics are only gathered within :func:`index_load` and only when an
+:class:`.IQuestionIndexLoadListener` is registered or debug logging is
+enabled for this module; otherwise recording a phase costs a thread
+local lookup.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import time
+import logging
+import threading
+
+from zope import component
+
+from nti.assessment.interfaces import IQuestionIndexLoadListener
+
+logger = __import__('logging').getLogger(__name__)
+
+_local = threading.local()
+
+
+class IndexLoadStats(object):
+    """
+    The timings (in seconds) and counts of the phases of a load.
+
+    The time of a phase run within another one is only counted for the
+    inner phase, so the timings add up to at most the total wall time
+    of the load.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+        self.total = 0.0
+        self.counts = {}
+        self.timings = {}
+        self._running = []
+
+    def add_time(self, phase, seconds):
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def count(self, name, value=1):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'total': self.total,
+            'counts': dict(self.counts),
+            'timings': dict(self.timings),
+        }
+
+    def __repr__(self):
+        return '<%s %s total=%.3fs timings=%r counts=%r>' % (
+            self.__class__.__name__, self.name, self.total,
+            self.timings, self.counts)
+
+
+def current_stats():
+    return getattr(_local, 'stats', None)
+
+
+class _Phase(object):
+
+    __slots__ = ('stats', 'name', 'start', 'nested')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.start = None
+        self.nested = 0.0
+
+    def __enter__(self):
+        self.stats._running.append(self)
+        self.start = time.time()
+        return self.stats
+
+    def __exit__(self, *unused_args):
+        elapsed = time.time() - self.start
+        running = self.stats._running
+        running.pop()
+        if running:
+            running[-1].nested += elapsed
+        self.stats.add_time(self.name, elapsed - self.nested)
+
+
+class _NoPhase(object):
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *unused_args):
+        pass
+
+_no_phase = _NoPhase()
+
+
+def phase(name):
+    """
+    Return a context manager timing the named phase of the current load,
+    if its statistics are being gathered.
+    """
+    stats = current_stats()
+    if stats is None:
+        return _no_phase
+    return _Phase(stats, name)
+
+
+def count(name, value=1):
+    stats = current_stats()
+    if stats is not None:
+        stats.count(name, value)
+
+
+class index_load(object):
+    """
+    A context manager for a whole load. Once the outermost one exits, the
+    statistics are given to the registered listeners and logged at debug
+    level (with an ``index_load`` record attribute holding them as a
+    dictionary).
+    """
+
+    __slots__ = ('name', 'stats', 'listeners', 'start')
+
+    def __init__(self, name=None):
+        self.name = name
+        self.stats = None
+        self.start = None
+        self.listeners = ()
+
+    def __enter__(self):
+        if current_stats() is not None:
+            return current_stats()
+        listeners = tuple(component.getAllUtilitiesRegisteredFor(IQuestionIndexLoadListener))
+        if not listeners and not logger.isEnabledFor(logging.DEBUG):
+            return None
+        self.listeners = listeners
+        self.stats = _local.stats = IndexLoadStats(self.name)
+        self.start = time.time()
+        return self.stats
+
+    def __exit__(self, *unused_args):
+        stats = self.stats
+        if stats is None:
+            return
+        _local.stats = self.stats = None
+        stats.total = time.time() - self.start
+        for listener in self.listeners:
+            try:
+                listener.indexLoaded(stats)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Cannot notify %s", listener)
+        logger.debug("Loaded assessment index %s in %.3fs (timings=%r, counts=%r)",
+                     stats.name, stats.total, stats.timings, stats.counts,
+                     extra={'index_load': stats.as_dict()})
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+An optional index of the assessment objects looked up in a registry,
+keyed by the interface they are looked up for and their ntiid.
+
+The index is a cache of the registry: lookups missing from it go to the
+registry and their results are kept. It is dropped whenever the
+utilities of the registry, or of its bases, change (which
+``zope.interface`` tracks with a generation counter), so it never
+returns an object that is no longer registered, however it was
+unregistered.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import types
+import weakref
+import threading
+
+from zope import component
+
+from zope.interface.interfaces import ComponentLookupError
+
+logger = __import__('logging').getLogger(__name__)
+
+_indexes = weakref.WeakKeyDictionary()
+
+_lock = threading.Lock()
+
+
+class NTIIDIndex(object):
+    """
+    The objects found in a registry for the current generation of its
+    utilities.
+    """
+
+    __slots__ = ('_state', '__weakref__')
+
+    def __init__(self):
+        self._state = (None, {})
+
+    def entries(self, generation):
+        """
+        Return the map from (interface, ntiid) to object for the given
+        generation, dropping what was found in a previous one.
+        """
+        state = self._state
+        if state[0] != generation:
+            # replaced as a whole, concurrent lookups keep a consistent map
+            state = self._state = (generation, {})
+        return state[1]
+
+    def __len__(self):
+        return len(self._state[1])
+
+
+def _site_manager(registry):
+    if isinstance(registry, types.ModuleType):  # zope.component
+        return component.getSiteManager()
+    return registry
+
+
+def _generation(registry):
+    utilities = getattr(registry, 'utilities', None)
+    return getattr(utilities, '_generation', None)
+
+
+def enable_ntiid_index(registry):
+    """
+    Start indexing the assessments looked up in the given registry.
+    """
+    with _lock:
+        return _indexes.setdefault(registry, NTIIDIndex())
+
+
+def disable_ntiid_index(registry):
+    with _lock:
+        _indexes.pop(registry, None)
+
+
+def ntiid_index_for(registry):
+    """
+    Return the :class:`NTIIDIndex` of the given registry, or ``None`` if
+    it is not enabled.
+    """
+    if not _indexes:
+        return None
+    return _indexes.get(_site_manager(registry))
+
+
+def query_by_ntiid(provided, ntiid, registry=component, default=None):
+    """
+    Return the object registered in the given registry for the interface
+    and ntiid, or ``default``.
+    """
+    index = ntiid_index_for(registry)
+    if index is not None:
+        site_manager = _site_manager(registry)
+        generation = _generation(site_manager)
+        if generation is not None:
+            # read before looking up, so what is found is never kept
+            # for a later generation
+            entries = index.entries(generation)
+            key = (provided, ntiid)
+            result = entries.get(key)
+            if result is None:
+                result = site_manager.queryUtility(provided, name=ntiid)
+                if result is not None:
+                    entries[key] = result
+            return result if result is not None else default
+    return registry.queryUtility(provided, name=ntiid, default=default)
+
+
+def get_by_ntiid(provided, ntiid, registry=component):
+    """
+    Like :func:`query_by_ntiid`, raising a :class:`LookupError` if
+    nothing is registered.
+    """
+    result = query_by_ntiid(provided, ntiid, registry)
+    if result is None:
+        raise ComponentLookupError(provided, ntiid)
+    return result
@@ -9,12 +9,31 @@ from __future__ import print_function
 from __future__ import absolute_import
 
 import six
+import codecs
+import hashlib
+import threading
+import multiprocessing
 import simplejson
 
+from collections import namedtuple
+from collections import OrderedDict
+
+from zope import interface
+
 from zope.interface.registry import Components
 
 from zope.proxy import isProxy
 from zope.proxy import ProxyBase
+from zope.proxy import setProxiedObject
+from zope.proxy import getProxiedObject
+
+from nti.assessment import ASSESSMENT_INTERFACES
+
+from nti.assessment._interning import get_global_pool
+
+from nti.assessment._load_stats import count
+from nti.assessment._load_stats import phase
+from nti.assessment._load_stats import index_load
 
 from nti.assessment.common import iface_of_assessment
 
@@ -36,6 +55,43 @@ from nti.wref.interfaces import IWeakRef
 
 logger = __import__('logging').getLogger(__name__)
 
+#: The outcome of :meth:`QuestionIndex._sync_root_index`: the sets of
+#: added, changed and removed ntiids, and the new fingerprints
+IndexSyncResult = namedtuple('IndexSyncResult',
+                             ('added', 'changed', 'removed', 'fingerprints'))
+
+
+def _fingerprint(ext_obj):
+    data = simplejson.dumps(ext_obj, sort_keys=True)
+    if isinstance(data, six.text_type):
+        data = data.encode('utf-8')
+    return hashlib.sha1(data).hexdigest()
+
+
+def _iter_embedded(ext_obj):
+    """
+    Iterate over the (ntiid, external object) pairs of the objects
+    embedded in the given external object, without internalizing it.
+    """
+    stack = [ext_obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            ntiid = value.get('NTIID')
+            if ntiid and value is not ext_obj:
+                yield text_(ntiid), value
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+
+
+def _embedded_ntiids(ext_obj):
+    """
+    Return the ntiids of the objects embedded in the given external
+    object, read without internalizing it.
+    """
+    return {ntiid for ntiid, _ in _iter_embedded(ext_obj)}
+
 
 class AssessmentProxy(ProxyBase):
 
@@ -52,13 +108,264 @@ class AssessmentProxy(ProxyBase):
         self.__container__ = container
 
 
+class _AssessmentStub(object):
+    """
+    Stands for an assessment item that has not been internalized yet.
+    """
+
+    __slots__ = ('ntiid', 'mimeType', 'external')
+
+    def __init__(self, ntiid, external):
+        self.ntiid = ntiid
+        self.external = external
+        self.mimeType = external.get('MimeType')
+
+    @property
+    def mime_type(self):
+        return self.mimeType
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, self.ntiid)
+
+
+def _factory_interface(factory):
+    get_interfaces = getattr(factory, 'getInterfaces', None)
+    if get_interfaces is not None:
+        spec = get_interfaces()
+    else:
+        spec = interface.implementedBy(factory)
+    for provided in ASSESSMENT_INTERFACES:
+        if spec.isOrExtends(provided):
+            return provided
+    return None
+
+
+_materialize_lock = threading.RLock()
+
+
+def _materialize(proxy):
+    state = proxy.__dict__.get('_v_lazy')
+    if state is None:
+        return getProxiedObject(proxy)
+    with _materialize_lock:
+        state = proxy.__dict__.pop('_v_lazy', None)
+        if state is None:  # another thread did it
+            return getProxiedObject(proxy)
+        registry, question_index = state
+        stub = getProxiedObject(proxy)
+        try:
+            obj = question_index._internalize_assessment(stub.ntiid,
+                                                         stub.external)
+        except Exception:
+            proxy.__dict__['_v_lazy'] = state
+            raise
+        setProxiedObject(proxy, obj)
+        things_to_register = question_index._explode_object_to_register(proxy)
+        question_index._register_and_canonicalize(things_to_register, registry)
+        return obj
+
+
+class _LazyAssessmentProxy(AssessmentProxy):
+    """
+    An :class:`AssessmentProxy` of an :class:`_AssessmentStub`
+    that is replaced by the internalized (and canonicalized) object
+    the first time the proxy is used.
+
+    Only the attributes of the stub (its ``ntiid`` and ``mimeType``)
+    can be read without materializing the proxy; any other attribute,
+    not found on the stub, materializes it. Until then, ``__class__``
+    is the stub's, so use interfaces rather than types to check what
+    the proxy is. Lazy proxies hash by ntiid so they can be registered
+    without being materialized.
+    """
+
+    def __init__(self, stub, registry, question_index, container=None):
+        AssessmentProxy.__init__(self, stub, container)
+        self.__dict__['_v_lazy'] = (registry, question_index)
+
+    def __getattr__(self, name):
+        # Only called for what the proxied object does not have
+        if '_v_lazy' not in self.__dict__:
+            raise AttributeError(name)
+        _materialize(self)
+        return getattr(self, name)
+
+    def __hash__(self):
+        return hash(getProxiedObject(self).ntiid)
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        if other is None:
+            return False
+        return _materialize(self) == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __len__(self):
+        return len(_materialize(self))
+
+    def __iter__(self):
+        return iter(_materialize(self))
+
+    def __getitem__(self, key):
+        return _materialize(self)[key]
+
+    def __contains__(self, item):
+        return item in _materialize(self)
+
+    def __nonzero__(self):
+        return bool(_materialize(self))
+    __bool__ = __nonzero__
+
+
+class RegistrationBatch(object):
+    """
+    The assessment objects to register, deduplicated by ntiid and kept
+    in the order they were first added. The batch never hashes its
+    objects, but registering them in a component registry does, once
+    per registration.
+
+    When an ntiid is added again with a different object, the two
+    definitions are compared by the fingerprint of their external forms
+    if both are known (see :meth:`add_externals`), which the loaders
+    record; otherwise only their types and mime types are compared.
+    Different definitions are logged and recorded in :attr:`conflicts`
+    and the first one is kept.
+    """
+
+    __slots__ = ('_items', '_externals', '_fingerprints', 'conflicts')
+
+    def __init__(self, items=()):
+        self._items = OrderedDict()
+        self._externals = {}
+        self._fingerprints = {}
+        self.conflicts = []
+        self.update(items)
+
+    @staticmethod
+    def _key(obj):
+        return getattr(obj, 'ntiid', None) or id(getProxiedObject(obj))
+
+    def add(self, obj, external=None):
+        ntiid = self._key(obj)
+        existing = self._items.get(ntiid)
+        if existing is None:
+            self._items[ntiid] = obj
+            if external is not None:
+                self._externals[ntiid] = external
+        elif existing is not obj:
+            self._check_conflict(ntiid, existing, obj, external)
+
+    def update(self, items):
+        externals = getattr(items, '_externals', None) or {}
+        for obj in items:
+            self.add(obj, externals.get(self._key(obj)))
+
+    def add_externals(self, externals):
+        """
+        Record the external forms, given as (ntiid, external object)
+        pairs, of the objects of this batch.
+        """
+        for ntiid, external in externals:
+            if ntiid in self._items and ntiid not in self._externals:
+                self._externals[ntiid] = external
+
+    def _fingerprint(self, ntiid):
+        result = self._fingerprints.get(ntiid)
+        if result is None:
+            result = self._fingerprints[ntiid] = _fingerprint(self._externals[ntiid])
+        return result
+
+    def _check_conflict(self, ntiid, existing, obj, external):
+        # The same item is usually found several times (top-level,
+        # embedded in a question set and in an assignment); the first
+        # one wins.
+        existing_base = getProxiedObject(existing)
+        obj_base = getProxiedObject(obj)
+        if existing_base is obj_base:
+            return
+        if external is not None and ntiid in self._externals:
+            conflict = self._fingerprint(ntiid) != _fingerprint(external)
+        else:
+            conflict = type(existing_base) is not type(obj_base) \
+                    or getattr(existing_base, 'mimeType', None) != getattr(obj_base, 'mimeType', None)
+        if conflict:
+            logger.warning("Conflicting definitions of %s (%r and %r)",
+                           ntiid, existing_base, obj_base)
+            self.conflicts.append((ntiid, existing, obj))
+
+    def get(self, ntiid, default=None):
+        return self._items.get(ntiid, default)
+
+    def ntiids(self):
+        return list(self._items.keys())
+
+    def __contains__(self, obj):
+        ntiid = getattr(obj, 'ntiid', obj)
+        return ntiid in self._items
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, len(self._items))
+
+
+class _BatchLookup(object):
+    """
+    Resolves utilities from the canonical objects of a registration batch
+    (keyed by interface and ntiid) before falling back to the registry.
+    Interfaces are matched by specification, so (lazy) objects are not
+    asked what they provide.
+    """
+
+    __slots__ = ('canonical', 'registry')
+
+    def __init__(self, canonical, registry):
+        self.canonical = canonical
+        self.registry = registry
+
+    def getUtility(self, provided, name=u''):
+        result = self.canonical.get((provided, name))
+        if result is None:
+            for iface in ASSESSMENT_INTERFACES:
+                if iface is not provided and iface.isOrExtends(provided):
+                    result = self.canonical.get((iface, name))
+                    if result is not None:
+                        break
+        if result is None:
+            result = self.registry.getUtility(provided, name=name)
+        return result
+
+
+def _internalize_items(args):
+    # Runs in a worker process: the objects are pickled back.
+    question_index, items = args
+    return [question_index._internalize_assessment(ntiid, ext_obj)
+            for ntiid, ext_obj in items]
+
+
+def _process_pool(workers):
+    # The workers must inherit the component registrations of this
+    # process, so they are forked rather than spawned.
+    get_context = getattr(multiprocessing, 'get_context', None)
+    if get_context is not None:
+        return get_context('fork').Pool(workers)
+    return multiprocessing.Pool(workers)
+
+
 class QuestionIndex(object):
 
     @classmethod
     def explode_assignment_to_register(cls, assignment):
         if not isProxy(assignment, AssessmentProxy):
             assignment = AssessmentProxy(assignment)
-        things_to_register = set([assignment])
+        things_to_register = RegistrationBatch([assignment])
         for part in assignment.parts:
             qset = AssessmentProxy(part.question_set, assignment)
             things_to_register.update(cls._explode_object_to_register(qset))
@@ -69,7 +376,7 @@ class QuestionIndex(object):
     def explode_question_set_to_register(cls, question_set):
         if not isProxy(question_set, AssessmentProxy):
             question_set = AssessmentProxy(question_set)
-        things_to_register = set([question_set])
+        things_to_register = RegistrationBatch([question_set])
         for question in question_set.Items:
             question = AssessmentProxy(question, question_set)
             things_to_register.add(question)
@@ -80,7 +387,7 @@ class QuestionIndex(object):
     def explode_survey_to_register(cls, survey):
         if not isProxy(survey, AssessmentProxy):
             survey = AssessmentProxy(survey)
-        things_to_register = set([survey])
+        things_to_register = RegistrationBatch([survey])
         for poll in survey.Items:
             poll = AssessmentProxy(poll, survey)
             things_to_register.add(poll)
@@ -89,9 +396,19 @@ class QuestionIndex(object):
 
     @classmethod
     def explode_object_to_register(cls, obj):
+        """
+        Return a :class:`RegistrationBatch` of the given object and of
+        what it embeds, wrapped in :class:`AssessmentProxy` objects.
+
+        .. versionchanged:: 1.0.0
+           The ``explode_*_to_register`` methods return an ordered
+           :class:`RegistrationBatch` rather than a ``set``. It can be
+           iterated, sized and tested for objects or ntiids, but does
+           not support the set operators.
+        """
         if not isProxy(obj, AssessmentProxy):
             obj = AssessmentProxy(obj)
-        things_to_register = set([obj])
+        things_to_register = RegistrationBatch([obj])
         if IQAssignment.providedBy(obj):
             things_to_register.update(cls._explode_assignment_to_register(obj))
         elif IQuestionSet.providedBy(obj):
@@ -141,62 +458,103 @@ class QuestionIndex(object):
                                      event=event)
 
     def _register_and_canonicalize(self, things_to_register, registry):
-        registered = set()
-        for thing_to_register in things_to_register or ():
-            provided = iface_of_assessment(thing_to_register)
-
-            # Previously, we were very careful not to re-register things
-            # that we could find utilities for.
-            # This is wrong, because we currently don't support multiple
-            # definitions, and everything that we find in this content
-            # we do need to register, in this registry.
-
-            # We would like to cut down an churn a bit by checking for
-            # equality, but because of the hierarchy that's hard to do
-            # (if content exists both in a parent and a child, we'd find
-            # the parent, but we really need the registration to be local; this
-            # is especially an issue if the parent is global but we're persistent)
-            # ex_utility = registry.queryUtility(iface, name=thing_to_register.ntiid)
-            # if ex_utility == thing_to_register:
-            #     continue
-
-            name = thing_to_register.ntiid
-            if      not IWeakRef.providedBy(thing_to_register) \
-                and registry.queryUtility(provided, name=name) == None:
+        """
+        Register the given objects in bulk: the canonical object of every
+        (interface, ntiid) is resolved first, children are canonicalized
+        against those instead of the registry, and only then are the
+        missing registrations applied, one after the other. This way
+        registry lookups and registrations (each of which clears the
+        registry lookup caches) do not alternate.
+        """
+        canonical = {}
+        registrations = []
+        registered = RegistrationBatch()
+        with phase('resolve'):
+            for thing_to_register in things_to_register or ():
+                provided = iface_of_assessment(thing_to_register)
+
+                # Previously, we were very careful not to re-register things
+                # that we could find utilities for.
+                # This is wrong, because we currently don't support multiple
+                # definitions, and everything that we find in this content
+                # we do need to register, in this registry.
+
+                # We would like to cut down an churn a bit by checking for
+                # equality, but because of the hierarchy that's hard to do
+                # (if content exists both in a parent and a child, we'd find
+                # the parent, but we really need the registration to be local; this
+                # is especially an issue if the parent is global but we're persistent)
+                # ex_utility = registry.queryUtility(iface, name=thing_to_register.ntiid)
+                # if ex_utility == thing_to_register:
+                #     continue
+
+                name = thing_to_register.ntiid
+                key = (provided, name)
+                if      not IWeakRef.providedBy(thing_to_register) \
+                    and key not in canonical:
+                    existing = registry.queryUtility(provided, name=name)
+                    if existing is None:
+                        registrations.append((thing_to_register, provided, name))
+                        existing = thing_to_register
+                    canonical[key] = existing
+                # keep unique
+                registered.add(thing_to_register)
+
+        # Now that everything is resolved, we can canonicalize
+        # check all incoming
+        lookup = _BatchLookup(canonical, registry)
+        with phase('canonicalize'):
+            for o in things_to_register or ():
+                self._canonicalize_object(o, lookup)
+
+        with phase('register'):
+            for component, provided, name in registrations:
                 self._registry_utility(registry,
-                                       thing_to_register,
+                                       component,
                                        provided=provided,
                                        name=name,
                                        event=False)
-            # keep unique
-            registered.add(thing_to_register)
-
-        # Now that everything is in place, we can canonicalize
-        # check all incoming
-        for o in things_to_register or ():
-            self._canonicalize_object(o, registry)
+        count('objects', len(registered))
+        count('registrations', len(registrations))
         return list(registered)
 
+    def _internalize_assessment(self, ntiid, ext_obj):
+        __traceback_info__ = ntiid, ext_obj
+
+        with phase('internalize'):
+            factory = find_factory_for(ext_obj)
+            assert factory is not None
+
+            obj = factory()
+            update_from_external_object(obj, ext_obj, require_updater=True,
+                                        notify=False)
+            obj.ntiid = text_(ntiid) # ensure unicode
+        count('internalized')
+        return obj
+
+    def _explode_external(self, obj, ext_obj):
+        """
+        Explode the given object, internalized from ``ext_obj``, recording
+        the external forms of what it embeds to detect conflicts.
+        """
+        result = self._explode_object_to_register(obj)
+        result.add_externals([(obj.ntiid, ext_obj)])
+        result.add_externals(_iter_embedded(ext_obj))
+        return result
+
     def _process_assessments(self,
                              assessment_item_dict,
                              unused_containing_hierarchy_key,
                              unused_level_ntiid=None):
 
-        result = set()
+        result = RegistrationBatch()
         for k, v in assessment_item_dict.items():
-            __traceback_info__ = k, v
-
-            factory = find_factory_for(v)
-            assert factory is not None
-
-            obj = factory()
-            update_from_external_object(obj, v, require_updater=True,
-                                        notify=False)
-            obj.ntiid = text_(k) # ensure unicode
+            obj = self._internalize_assessment(k, v)
             # No matter if we got an assignment or question set first or the questions
             # first, register the question objects exactly once. Replace
             # any question children of a question set by the registered object.
-            things_to_register = self._explode_object_to_register(obj)
+            with phase('explode'):
+                things_to_register = self._explode_external(obj, v)
             result.update(things_to_register)
 
         return result
@@ -208,7 +566,7 @@ class QuestionIndex(object):
 
         key_for_this_level = nearest_containing_key
 
-        things_to_register = set()
+        things_to_register = RegistrationBatch()
         level_ntiid = index.get('NTIID') or nearest_containing_ntiid
 
         i = self._process_assessments(index.get("AssessmentItems", {}),
@@ -224,35 +582,88 @@ class QuestionIndex(object):
 
         return things_to_register
 
-    def _from_root_index(self, assessment_index_json, registry=None):
+    def _from_index_entries_in_pool(self, children, workers):
+        # Only the internalization runs in the worker processes; the
+        # internalized objects are pickled back and exploded here.
+        entries = [list(self._iter_index_entry_items(child_index))
+                   for _, child_index in children]
+        pool = _process_pool(min(workers, len(entries)))
+        try:
+            with phase('internalize'):
+                results = pool.map(_internalize_items,
+                                   [(self, items) for items in entries])
+        finally:
+            pool.close()
+            pool.join()
+
+        things_to_register = RegistrationBatch()
+        for items, objects in zip(entries, results):
+            count('internalized', len(objects))
+            with phase('explode'):
+                for (_, ext_obj), obj in zip(items, objects):
+                    things_to_register.update(self._explode_external(obj, ext_obj))
+        return things_to_register
 
+    def _from_root_index(self, assessment_index_json, registry=None, workers=None):
+        """
+        Register the assessment items of the given (loaded) index.
+
+        :param workers: If greater than one, the child entries of the root
+            are internalized by this many worker processes, forked so that
+            they have the component registrations of this process. The
+            internalized objects are pickled back, and registered and
+            canonicalized in the calling thread.
+        """
+        with index_load('from_root_index'):
+            return self._do_from_root_index(assessment_index_json, registry,
+                                            workers)
+
+    def _check_root_index(self, assessment_index_json):
+        """
+        Check the structure of the given (loaded) index and return the
+        (ntiid, entry) children of its root, or ``None`` if it has no
+        root.
+        """
         __traceback_info__ = assessment_index_json
 
-        registry = registry if registry is not None else Components()
-
         assert 'Items' in assessment_index_json, "Root must contain 'Items'"
         root_items = assessment_index_json['Items']
         if not root_items:
             logger.warn("Assessment index does not contains any assessments")
-            return
+            return None
         assert len(root_items) == 1, "Root's 'Items' must only have Root NTIID"
 
-        root_ntiid = root_items.keys()[0]
+        root_ntiid = list(root_items.keys())[0]
         assert 'Items' in assessment_index_json['Items'][root_ntiid], \
                "Root's 'Items' contains the actual section Items"
 
-        things_to_register = set()
-
-        for child_ntiid, child_index in root_items[root_ntiid]['Items'].items():
+        children = list(root_items[root_ntiid]['Items'].items())
+        for child_ntiid, child_index in children:
 
             __traceback_info__ = child_ntiid, child_index
 
             assert child_index.get('filename'), \
                    'Child must contain valid filename to contain assessments'
+        return children
 
-            i = self._from_index_entry(child_index,
-                                       nearest_containing_ntiid=child_ntiid)
-            things_to_register.update(i)
+    def _do_from_root_index(self, assessment_index_json, registry=None,
+                            workers=None):
+
+        registry = registry if registry is not None else Components()
+
+        children = self._check_root_index(assessment_index_json)
+        if children is None:
+            return
+
+        if workers and workers > 1 and len(children) > 1:
+            things_to_register = self._from_index_entries_in_pool(children,
+                                                                  workers)
+        else:
+            things_to_register = RegistrationBatch()
+            for child_ntiid, child_index in children:
+                i = self._from_index_entry(child_index,
+                                           nearest_containing_ntiid=child_ntiid)
+                things_to_register.update(i)
 
         # register assessment items
         self._register_and_canonicalize(things_to_register, registry)
@@ -260,19 +671,223 @@ class QuestionIndex(object):
         registered = {x.ntiid for x in things_to_register}
         return registered
 
+    def _from_root_index_stream(self, source, registry=None, chunk_size=None,
+                                pool=None):
+        """
+        Register the assessment items of the index read from the given
+        text or file-like ``source`` as they are parsed, so that the
+        whole index is never held in memory. Strings are interned in
+        the given :class:`.InterningPool` (by default, the global pool).
+
+        The index is validated like in :meth:`_from_root_index`, but a
+        malformed entry is only detected once it has been read, after
+        the items that precede it have been registered.
+
+        :return: The set of registered ntiids.
+        """
+        registry = registry if registry is not None else Components()
+        pool = pool if pool is not None else get_global_pool()
+
+        registered = set()
+        with index_load('from_root_index_stream') as stats, \
+                _counting_fragments(stats, pool):
+            items = _iter_question_map_items(source, chunk_size, pool)
+            while True:
+                # parsing is interleaved with registration
+                with phase('parse'):
+                    item = next(items, None)
+                if item is None:
+                    break
+                ntiid, ext_obj = item
+                obj = self._internalize_assessment(ntiid, ext_obj)
+                # Everything an item embeds is registered with it, so the
+                # item can be canonicalized right away.
+                with phase('explode'):
+                    things_to_register = self._explode_object_to_register(obj)
+                self._register_and_canonicalize(things_to_register, registry)
+                registered.update(x.ntiid for x in things_to_register)
+
+        if not registered:
+            logger.warn("Assessment index does not contains any assessments")
+        return registered
+
+    def _from_internalized(self, objects, registry=None, externals=None):
+        """
+        Register the given internalized (top-level) assessment objects,
+        e.g. from a snapshot.
 
-# We usually get two or more copies, one at the top-level, one embedded
-# in a question set, and possibly in an assignment. Although we get the
-# most reuse within a single index, we get some reuse across indexes,
-# especially in tests
-_fragment_cache = {}
+        :param externals: A map from the ntiids of the objects to their
+            external form, if known, to detect conflicting definitions.
+        :return: The set of registered ntiids.
+        """
+        registry = registry if registry is not None else Components()
+        externals = externals or {}
+        things_to_register = RegistrationBatch()
+        for obj in objects:
+            ext_obj = externals.get(obj.ntiid)
+            if ext_obj is not None:
+                things_to_register.update(self._explode_external(obj, ext_obj))
+            else:
+                things_to_register.update(self._explode_object_to_register(obj))
+        self._register_and_canonicalize(things_to_register, registry)
+        return {x.ntiid for x in things_to_register}
 
+    def _from_root_index_lazy(self, assessment_index_json, registry=None):
+        """
+        Register :class:`_LazyAssessmentProxy` objects for the
+        ``AssessmentItems`` of the given (loaded) index. Each one is only
+        internalized, and what it embeds registered and canonicalized,
+        when it is first used.
 
-def _load_question_map_json(asm_index_text):
+        :return: The set of registered ntiids.
+        """
+        registry = registry if registry is not None else Components()
+
+        registered = set()
+        things_to_register = RegistrationBatch()
+        items = list(self._iter_root_index_items(assessment_index_json))
+        for ntiid, ext_obj in items:
+            __traceback_info__ = ntiid, ext_obj
+
+            factory = find_factory_for(ext_obj)
+            assert factory is not None
+
+            provided = _factory_interface(factory)
+            if provided is None:
+                # not an item we know how to register without building it
+                obj = self._internalize_assessment(ntiid, ext_obj)
+                things_to_register.update(self._explode_external(obj, ext_obj))
+                continue
+            self._register_lazily(registry, provided, ntiid, ext_obj)
+            registered.add(ntiid)
+
+        # What is only found embedded in the items is registered up front
+        # too, so it can be looked up as if it had been loaded eagerly.
+        # The top-level definitions, registered first, win.
+        for unused_ntiid, ext_obj in items:
+            for ntiid, child in _iter_embedded(ext_obj):
+                if ntiid in registered:
+                    continue
+                factory = find_factory_for(child)
+                provided = _factory_interface(factory) if factory is not None else None
+                if provided is not None:
+                    self._register_lazily(registry, provided, ntiid, child)
+                    registered.add(ntiid)
+
+        self._register_and_canonicalize(things_to_register, registry)
+        registered.update(x.ntiid for x in things_to_register)
+        return registered
+
+    def _register_lazily(self, registry, provided, ntiid, ext_obj):
+        if registry.queryUtility(provided, name=ntiid) is None:
+            stub = _AssessmentStub(ntiid, ext_obj)
+            # register directly, checking for weak refs would
+            # materialize the proxy
+            proxy = _LazyAssessmentProxy(stub, registry, self)
+            registry.registerUtility(proxy,
+                                     provided=provided,
+                                     name=ntiid,
+                                     event=False)
+
+    def _iter_index_entry_items(self, index):
+        for ntiid, ext_obj in index.get('AssessmentItems', {}).items():
+            yield ntiid, ext_obj
+        for child_item in index.get('Items', {}).values():
+            for item in self._iter_index_entry_items(child_item):
+                yield item
+
+    def _iter_root_index_items(self, assessment_index_json):
+        for root in (assessment_index_json.get('Items') or {}).values():
+            for child_index in (root.get('Items') or {}).values():
+                for ntiid, ext_obj in self._iter_index_entry_items(child_index):
+                    yield text_(ntiid), ext_obj
+
+    def _index_items(self, assessment_index_json):
+        """
+        Return a map from the ntiid of each ``AssessmentItems`` entry
+        of the given index to its (fingerprint, external object).
+        """
+        result = {}
+        for ntiid, ext_obj in self._iter_root_index_items(assessment_index_json):
+            if ntiid not in result:
+                result[ntiid] = (_fingerprint(ext_obj), ext_obj)
+        return result
+
+    def _query_registered(self, registry, ntiid):
+        for provided in ASSESSMENT_INTERFACES:
+            result = registry.queryUtility(provided, name=ntiid)
+            if result is not None:
+                return result
+        return None
+
+    def _unregister(self, registry, ntiid):
+        registered = self._query_registered(registry, ntiid)
+        if registered is not None:
+            provided = iface_of_assessment(registered)
+            registry.unregisterUtility(registered,
+                                       provided=provided,
+                                       name=ntiid)
+        return registered
+
+    def _sync_root_index(self, assessment_index_json, registry=None,
+                         fingerprints=None):
+        """
+        Bring the registry up to date with the given (loaded) index, only
+        internalizing and registering the ``AssessmentItems`` entries
+        whose fingerprint (a hash of their external form) is not in the
+        given ``fingerprints``, and unregistering the ones no longer found.
+
+        :param fingerprints: The fingerprints of the previous sync of this
+            index, if any.
+        :return: An :class:`IndexSyncResult`.
+        """
+        registry = registry if registry is not None else Components()
+
+        fingerprints = fingerprints or {}
+        items = self._index_items(assessment_index_json)
+        current = {k: v[0] for k, v in items.items()}
+
+        added = {x for x in current if x not in fingerprints}
+        removed = {x for x in fingerprints if x not in current}
+        changed = {x for x in current
+                   if x in fingerprints and fingerprints[x] != current[x]}
+        unchanged = set(current) - added - changed
+
+        # Unregister what is gone or changed, along with what it embeds,
+        # unless that is an unchanged entry or embedded in one
+        stale = set()
+        for ntiid in removed | changed:
+            registered = self._query_registered(registry, ntiid)
+            if registered is not None:
+                stale.update(x.ntiid for x in
+                             self._explode_object_to_register(registered))
+        keep = set(unchanged)
+        for ntiid in unchanged:
+            keep.update(_embedded_ntiids(items[ntiid][1]))
+        for ntiid in stale - keep:
+            self._unregister(registry, ntiid)
+
+        things_to_register = RegistrationBatch()
+        for ntiid in sorted(added | changed):
+            obj = self._internalize_assessment(ntiid, items[ntiid][1])
+            things_to_register.update(self._explode_external(obj, items[ntiid][1]))
+        self._register_and_canonicalize(things_to_register, registry)
+
+        return IndexSyncResult(added, changed, removed, current)
+
+
+def _question_map_hook(pool=None):
+    """
+    Return an ``object_pairs_hook`` for the assessment index JSON that
+    interns its strings in the given :class:`.InterningPool` (by default,
+    the global pool).
+    """
+    # We usually get two or more copies, one at the top-level, one embedded
+    # in a question set, and possibly in an assignment. Although we get the
+    # most reuse within a single index, we get some reuse across indexes,
+    # especially in tests
+    pool = pool if pool is not None else get_global_pool()
 
-    if not asm_index_text:
-        return
-    asm_index_text = text_(asm_index_text)
     # In this one specific case, we know that these are already
     # content fragments (probably HTML content fragments)
     # If we go through the normal adapter process from string to
@@ -287,15 +902,10 @@ def _load_question_map_json(asm_index_text):
     def _as_fragment(v):
         # We also assume that HTML has already been sanitized and can
         # be trusted.
-        if v in _fragment_cache:
-            return _fragment_cache[v]
-
         factory = PlainTextContentFragment
         if '<' in v:
             factory = SanitizedHTMLContentFragment
-        result = factory(v)
-        _fragment_cache[v] = result
-        return result
+        return pool.intern(v, factory)
 
     _PLAIN_KEYS = {'NTIID', 'filename', 'href', 'Class', 'MimeType'}
 
@@ -308,9 +918,7 @@ def _load_question_map_json(asm_index_text):
             if k not in _PLAIN_KEYS:
                 v = _as_fragment(v)
             else:
-                if v not in _fragment_cache:
-                    _fragment_cache[v] = v
-                v = _fragment_cache[v]
+                v = pool.intern(v)
         return v
 
     def hook(o):
@@ -318,6 +926,202 @@ def _load_question_map_json(asm_index_text):
         for k, v in o:
             result[k] = _tx(v, k)
         return result
+    return hook
 
-    index = simplejson.loads(asm_index_text, object_pairs_hook=hook)
+
+def _load_question_map_json(asm_index_text, pool=None):
+
+    if not asm_index_text:
+        return
+    asm_index_text = text_(asm_index_text)
+    pool = pool if pool is not None else get_global_pool()
+    with index_load('load_question_map_json') as stats, \
+            _counting_fragments(stats, pool):
+        with phase('parse'):
+            index = simplejson.loads(asm_index_text,
+                                     object_pairs_hook=_question_map_hook(pool))
     return index
+
+
+class _counting_fragments(object):
+    """
+    Count the hits and misses of the given interning pool in the given
+    load statistics, if any.
+    """
+
+    __slots__ = ('stats', 'pool', 'before')
+
+    def __init__(self, stats, pool):
+        self.stats = stats
+        self.pool = pool
+        self.before = None
+
+    def __enter__(self):
+        if self.stats is not None:
+            self.before = self.pool.stats()
+
+    def __exit__(self, *unused_args):
+        if self.before is not None:
+            after = self.pool.stats()
+            self.stats.count('fragment_hits', after.hits - self.before.hits)
+            self.stats.count('fragment_misses', after.misses - self.before.misses)
+
+
+#: The number of characters (or bytes) read at once by the streaming loader
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_JSON_WHITESPACE = u' \t\n\r'
+
+_plain_decoder = simplejson.JSONDecoder()
+
+
+class _JSONStreamReader(object):
+    """
+    Reads JSON tokens and values from a text or from a (binary or text)
+    file-like object, keeping only the not yet consumed part of the
+    input in memory.
+    """
+
+    def __init__(self, source, chunk_size=None):
+        self._pos = 0
+        self._chunk_size = chunk_size or STREAM_CHUNK_SIZE
+        if hasattr(source, 'read'):
+            self._buf = u''
+            self._source = source
+            self._decoder = codecs.getincrementaldecoder('utf-8')()
+        else:
+            self._source = None
+            self._buf = text_(source or u'')
+
+    @property
+    def exhausted(self):
+        return self._source is None
+
+    def _fill(self, size=0):
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        data = self._source.read(max(size, self._chunk_size))
+        final = not data
+        if isinstance(data, bytes):
+            data = self._decoder.decode(data, final)
+        if final:
+            self._source = None
+        self._buf += data
+
+    def peek(self):
+        """
+        Skip whitespace and return the next character, or an empty string
+        at the end of the input.
+        """
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in _JSON_WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if self.exhausted:
+                return u''
+            self._fill()
+
+    def next_char(self):
+        result = self.peek()
+        if result:
+            self._pos += 1
+        return result
+
+    def expect(self, expected):
+        found = self.next_char()
+        if found != expected:
+            raise ValueError("Expected %r in assessment index, found %r"
+                             % (expected, found))
+
+    def decode(self, decoder=_plain_decoder):
+        """
+        Decode and consume the next JSON value.
+        """
+        while True:
+            self.peek()
+            try:
+                value, end = decoder.raw_decode(self._buf, self._pos)
+            except ValueError:
+                if self.exhausted:
+                    raise
+            else:
+                # a number or a literal may go on in the next chunk
+                if end < len(self._buf) or self.exhausted:
+                    self._pos = end
+                    return value
+            # at least double what we have so a large value is not
+            # decoded over and over again
+            self._fill(len(self._buf) - self._pos)
+
+    def iter_keys(self):
+        """
+        Iterate over the keys of the next JSON object. The value of each
+        key must be consumed before asking for the next one.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.next_char()
+            return
+        while True:
+            key = self.decode()
+            self.expect(':')
+            yield key
+            separator = self.next_char()
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError("Expected ',' or '}' in assessment index, found %r"
+                                 % separator)
+
+
+def _iter_index_entry(reader, decoder, depth=0):
+    # The structure is validated as in QuestionIndex._from_root_index,
+    # but, as the keys of an entry come in any order, only once the
+    # entry has been read.
+    has_items = False
+    filename = None
+    for key in reader.iter_keys():
+        # only the entries below the root NTIID hold assessments
+        if key == 'AssessmentItems' and depth > 1 and reader.peek() == '{':
+            for ntiid in reader.iter_keys():
+                yield text_(ntiid), reader.decode(decoder)
+        elif key == 'Items' and reader.peek() == '{':
+            has_items = True
+            for idx, unused_key in enumerate(reader.iter_keys()):
+                assert depth or not idx, "Root's 'Items' must only have Root NTIID"
+                if reader.peek() == '{':
+                    for item in _iter_index_entry(reader, decoder, depth + 1):
+                        yield item
+                else:
+                    reader.decode()
+        elif key == 'filename' and depth == 2:
+            filename = reader.decode()
+        else:
+            has_items = has_items or key == 'Items'
+            reader.decode()
+    if depth == 0:
+        assert has_items, "Root must contain 'Items'"
+    elif depth == 1:
+        assert has_items, "Root's 'Items' contains the actual section Items"
+    elif depth == 2:
+        assert filename, 'Child must contain valid filename to contain assessments'
+
+
+def _iter_question_map_items(source, chunk_size=None, pool=None):
+    """
+    Incrementally parse the assessment index read from the given text or
+    file-like object, yielding the (ntiid, external object) pairs of its
+    ``AssessmentItems`` as they are found. Only one item is fully
+    parsed at any time.
+    """
+    reader = _JSONStreamReader(source, chunk_size)
+    if not reader.peek():
+        return
+    hook = _question_map_hook(pool)
+    decoder = simplejson.JSONDecoder(object_pairs_hook=hook)
+    for item in _iter_index_entry(reader, decoder):
+        yield item
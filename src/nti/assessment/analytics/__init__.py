@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Cohort statistics of assessed results.
+
+The assessed values of a cohort are extracted once into a students by
+parts matrix (see :func:`assessed_matrix`) on which the statistics are
+computed with NumPy. This requires the ``analytics`` extra.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+from collections import OrderedDict
+
+import numpy
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The default fraction of the students in each of the upper and lower
+#: groups used by :meth:`AssessedMatrix.discrimination`
+DISCRIMINATION_FRACTION = 0.27
+
+
+class AssessedMatrix(object):
+    """
+    The assessed values of a cohort: one row per student (assessed
+    question set) and one column per ``(questionId, part index)``.
+
+    Parts that were not submitted or could not be assessed are ``NaN``
+    in :attr:`values`. Means and percentiles ignore them; the statistics
+    relating parts to the total scores count them as ``0.0``, as grading
+    does for unanswered parts.
+    """
+
+    def __init__(self, values, rows, columns):
+        self.values = values
+        self.rows = tuple(rows)
+        self.columns = tuple(columns)
+        self._filled = None
+        self._scores = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return '<%s %s students x %s parts>' % (self.__class__.__name__,
+                                                len(self.rows),
+                                                len(self.columns))
+
+    @property
+    def filled(self):
+        """
+        The values with ``0.0`` for the missing parts.
+        """
+        if self._filled is None:
+            self._filled = numpy.nan_to_num(self.values)
+        return self._filled
+
+    def select(self, rows):
+        """
+        Return the matrix of the given rows (a boolean mask or indices),
+        e.g. to compute the statistics of a section of the cohort.
+        """
+        rows = numpy.asarray(rows)
+        if rows.dtype == bool:
+            rows = numpy.flatnonzero(rows)
+        rows = rows.astype(int)
+        return self.__class__(self.values[rows],
+                              [self.rows[x] for x in rows],
+                              self.columns)
+
+    def scores(self):
+        """
+        The total score of each student.
+        """
+        if self._scores is None:
+            self._scores = self.filled.sum(axis=1)
+        return self._scores
+
+    def mean(self):
+        """
+        The mean assessed value of each part, i.e. its correctness rate.
+        """
+        return _nanmean(self.values, axis=0)
+    difficulty = mean
+
+    def question_means(self):
+        """
+        Return a map from question id to its mean assessed value over
+        all its parts.
+        """
+        result = OrderedDict()
+        indices = OrderedDict()
+        for idx, (question_id, _) in enumerate(self.columns):
+            indices.setdefault(question_id, []).append(idx)
+        for question_id, columns in indices.items():
+            result[question_id] = _nanmean(self.values[:, columns])
+        return result
+
+    def percentiles(self, q):
+        """
+        The given percentiles (between 0 and 100) of the total scores.
+        """
+        if not len(self.rows):
+            return numpy.full(numpy.shape(q), numpy.nan)
+        return numpy.percentile(self.scores(), q)
+
+    def discrimination(self, fraction=DISCRIMINATION_FRACTION):
+        """
+        The discrimination index of each part: the difference between its
+        mean in the upper and in the lower ``fraction`` of the students
+        ranked by total score.
+        """
+        count = len(self.rows)
+        if not count:
+            return numpy.full(len(self.columns), numpy.nan)
+        size = max(1, int(round(count * fraction)))
+        order = numpy.argsort(self.scores(), kind='mergesort')
+        filled = self.filled
+        lower = filled[order[:size]].mean(axis=0)
+        upper = filled[order[-size:]].mean(axis=0)
+        return upper - lower
+
+    def point_biserial(self, corrected=True):
+        """
+        The correlation of each part with the total scores. If
+        ``corrected``, the part itself is left out of the total it is
+        correlated with. Parts (or totals) without variance are ``NaN``.
+        """
+        if not len(self.rows):
+            return numpy.full(len(self.columns), numpy.nan)
+        filled = self.filled
+        totals = self.scores()[:, numpy.newaxis]
+        if corrected:
+            totals = totals - filled
+        parts = filled - filled.mean(axis=0)
+        totals = totals - totals.mean(axis=0)
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            return (parts * totals).sum(axis=0) \
+                 / numpy.sqrt((parts ** 2).sum(axis=0) * (totals ** 2).sum(axis=0))
+
+
+def _nanmean(values, axis=None):
+    counts = (~numpy.isnan(values)).sum(axis=axis)
+    return numpy.nansum(values, axis=axis) / numpy.where(counts, counts, numpy.nan)
+
+
+def _assessed_value(part):
+    value = getattr(part, 'assessedValue', None)
+    return numpy.nan if value is None else value
+
+
+def assessed_matrix(assessed_sets, rows=None, columns=None):
+    """
+    Extract the assessed values of the given assessed question sets, one
+    per student, into an :class:`AssessedMatrix` in a single pass.
+
+    :param rows: The labels of the rows; by default, the creators of the
+            assessed sets.
+    :param columns: The ``(questionId, part index)`` columns to extract;
+            by default, all the assessed parts in the order they are
+            first seen.
+    """
+    labels = []
+    indices = OrderedDict((x, idx) for idx, x in enumerate(columns or ()))
+    fixed = columns is not None
+    row_idx = []
+    col_idx = []
+    values = []
+    for row, assessed_set in enumerate(assessed_sets):
+        labels.append(getattr(assessed_set, 'creator', None))
+        for question in assessed_set.questions or ():
+            question_id = question.questionId
+            for idx, part in enumerate(question.parts or ()):
+                key = (question_id, idx)
+                column = indices.get(key)
+                if column is None:
+                    if fixed:
+                        continue
+                    column = indices[key] = len(indices)
+                row_idx.append(row)
+                col_idx.append(column)
+                values.append(_assessed_value(part))
+    matrix = numpy.full((len(labels), len(indices)), numpy.nan)
+    if values:
+        matrix[row_idx, col_idx] = values
+    return AssessedMatrix(matrix, labels if rows is None else rows, indices)
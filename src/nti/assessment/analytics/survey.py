@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Aggregated choice parts keeping their counts in NumPy arrays.
+
+The parts created by the factories of this module count the responses
+by choice index in an array, adding batches of responses with
+``bincount``; other responses are counted in a mapping. The counts are
+stored as a list, so the stored state does not depend on NumPy. The
+parts provide the same ``Results`` and ``total`` as the parts they
+replace. To use them, register the factories as the
+:class:`.IQAggregatedPartFactory` of the non-gradable choice parts,
+e.g. in an ``overrides.zcml``.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import numbers
+
+import numpy
+
+from zope import component
+from zope import interface
+
+from nti.assessment.interfaces import IQAggregatedPartFactory
+from nti.assessment.interfaces import IQAggregatedMultipleChoicePart
+from nti.assessment.interfaces import IQNonGradableMultipleChoicePart
+from nti.assessment.interfaces import IQNonGradableMultipleChoiceMultipleAnswerPart
+
+from nti.assessment.survey import _check_removable
+from nti.assessment.survey import ConflictResolvingCounter
+from nti.assessment.survey import QAggregatedMultipleChoicePart
+from nti.assessment.survey import QAggregatedMultipleChoiceMultipleAnswerPart
+
+logger = __import__('logging').getLogger(__name__)
+
+COUNTS_DTYPE = numpy.int64
+
+
+def _choice_index(response):
+    if     isinstance(response, bool) \
+        or not isinstance(response, numbers.Integral) \
+        or response < 0:
+        return None
+    return int(response)
+
+
+class _ColumnarChoiceCounts(object):
+
+    _counts = None
+    _overflow = None
+
+    def reset(self):
+        self.total = 0
+        self._counts = numpy.zeros(0, dtype=COUNTS_DTYPE)
+        self._overflow = ConflictResolvingCounter()
+
+    def __getstate__(self):
+        state = dict(super(_ColumnarChoiceCounts, self).__getstate__())
+        if state.get('_counts') is not None:
+            state['_counts'] = state['_counts'].tolist()
+        return state
+
+    def __setstate__(self, state):
+        if state.get('_counts') is not None:
+            state = dict(state)
+            state['_counts'] = numpy.array(state['_counts'], dtype=COUNTS_DTYPE)
+        super(_ColumnarChoiceCounts, self).__setstate__(state)
+
+    def _p_resolveConflict(self, oldState, savedState, newState):
+        # add the concurrent changes to the (stored) counts, like our total
+        states = [dict(x) for x in (oldState, savedState, newState)]
+        old, saved, new = [x.pop('_counts', None) for x in states]
+        result = super(_ColumnarChoiceCounts, self)._p_resolveConflict(*states)
+        size = max([0] + [len(x) for x in (old, saved, new) if x is not None])
+        counts = numpy.zeros(size, dtype=COUNTS_DTYPE)
+        for sign, value in ((-1, old), (1, saved), (1, new)):
+            if value is not None:
+                counts[:len(value)] += sign * numpy.asarray(value, dtype=COUNTS_DTYPE)
+        result['_counts'] = counts.tolist()
+        return result
+
+    @property
+    def results(self):
+        result = dict((idx, int(count))
+                      for idx, count in enumerate(self._counts)
+                      if count)
+        for k, v in self._overflow.items():
+            result[k] = result.get(k, 0) + v
+        return result
+
+    @property
+    def counts(self):
+        """
+        The number of responses for each choice index.
+        """
+        return self._counts.copy()
+
+    def _add(self, indices, weights=None, overflow=None, sign=1):
+        # add (or remove) the counts of the given choice indices and of
+        # the other responses, checking first that what is removed was
+        # aggregated
+        counts = self._counts
+        if len(indices):
+            counts = numpy.bincount(numpy.asarray(indices, dtype=COUNTS_DTYPE),
+                                    weights=weights,
+                                    minlength=len(counts))
+            counts = sign * counts.astype(COUNTS_DTYPE)
+            counts[:len(self._counts)] += self._counts
+            missing = numpy.flatnonzero(counts < 0)
+            if len(missing):
+                raise ValueError("Response %r was not aggregated" % int(missing[0]))
+        overflow = overflow or {}
+        if sign < 0:
+            _check_removable(self._overflow, overflow)
+        self._counts = counts
+        for k, v in overflow.items():
+            self._add_overflow(k, sign * v)
+
+    def _add_overflow(self, key, count):
+        current = (self._overflow.get(key) or 0) + count
+        if current > 0:
+            self._overflow[key] = current
+        elif key in self._overflow:
+            del self._overflow[key]
+
+    def _add_responses(self, responses, sign=1):
+        indices = []
+        overflow = {}
+        for response in responses:
+            idx = _choice_index(response)
+            if idx is not None:
+                indices.append(idx)
+            elif response is not None:
+                overflow[response] = overflow.get(response, 0) + 1
+        self._add(indices, overflow=overflow, sign=sign)
+
+    def _merge(self, results, total, sign=1):
+        if sign < 0:
+            self._check_total(total)
+        indices = []
+        weights = []
+        overflow = {}
+        for k, v in results.items():
+            idx = _choice_index(k)
+            if idx is not None:
+                indices.append(idx)
+                weights.append(v)
+            else:
+                overflow[k] = v
+        self._add(indices, weights, overflow, sign)
+        self.total += sign * total
+
+    def _unmerge(self, results, total):
+        self._merge(results, total, sign=-1)
+
+    def _combine(self, other, sign):
+        assert IQAggregatedMultipleChoicePart.providedBy(other)
+        if isinstance(other, _ColumnarChoiceCounts):
+            if sign < 0:
+                self._check_total(other.total)
+            self._add(numpy.arange(len(other._counts)), other._counts,
+                      dict(other._overflow.items()), sign)
+            self.total += sign * other.total
+        else:
+            self._merge(other.results, other.total, sign)
+        return self
+
+    def __iadd__(self, other):
+        return self._combine(other, 1)
+
+    def __isub__(self, other):
+        return self._combine(other, -1)
+
+
+class QColumnarAggregatedMultipleChoicePart(_ColumnarChoiceCounts,
+                                            QAggregatedMultipleChoicePart):
+
+    def append(self, response=None):
+        self.total += 1
+        if response is not None:
+            self._add_responses((response,))
+
+    def remove(self, response=None):
+        self._check_total(1)
+        if response is not None:
+            self._add_responses((response,), sign=-1)
+        self.total -= 1
+
+    def extend(self, responses):
+        """
+        Aggregate the given responses.
+        """
+        responses = list(responses)
+        self.total += len(responses)
+        self._add_responses(responses)
+
+
+class QColumnarAggregatedMultipleChoiceMultipleAnswerPart(_ColumnarChoiceCounts,
+                                                          QAggregatedMultipleChoiceMultipleAnswerPart):
+
+    def append(self, responses=()):  # pylint: disable=arguments-differ
+        self.total += 1
+        self._add_responses(responses or ())
+
+    def remove(self, responses=()):  # pylint: disable=arguments-differ
+        self._check_total(1)
+        self._add_responses(responses or (), sign=-1)
+        self.total -= 1
+
+    def extend(self, responses):
+        """
+        Aggregate the given responses, each a sequence of choice indices.
+        """
+        responses = list(responses)
+        self.total += len(responses)
+        self._add_responses(x for response in responses for x in response or ())
+
+
+@interface.implementer(IQAggregatedPartFactory)
+@component.adapter(IQNonGradableMultipleChoicePart)
+def ColumnarMultipleChoicePartFactory(_):
+    return QColumnarAggregatedMultipleChoicePart
+
+
+@interface.implementer(IQAggregatedPartFactory)
+@component.adapter(IQNonGradableMultipleChoiceMultipleAnswerPart)
+def ColumnarMultipleChoiceMultipleAnswerPartFactory(_):
+    return QColumnarAggregatedMultipleChoiceMultipleAnswerPart
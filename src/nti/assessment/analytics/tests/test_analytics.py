@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# disable: accessing protected members, too many methods
+# pylint: disable=W0212,R0904
+
+from hamcrest import is_
+from hamcrest import contains
+from hamcrest import close_to
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_entries
+
+import numpy
+
+from nti.assessment.analytics import assessed_matrix
+
+from nti.assessment.assessed import QAssessedPart
+from nti.assessment.assessed import QAssessedQuestion
+from nti.assessment.assessed import QAssessedQuestionSet
+
+from nti.assessment.tests import AssessmentTestCase
+
+
+def _assessed_set(*values):
+    def question(ntiid, *values):
+        parts = [QAssessedPart(assessedValue=x) for x in values]
+        return QAssessedQuestion(questionId=ntiid, parts=parts)
+    questions = [question(u'q1', *values[:2])]
+    if len(values) > 2:
+        questions.append(question(u'q2', values[2]))
+    return QAssessedQuestionSet(questionSetId=u'set', questions=questions)
+
+
+def _close_to(*values):
+    return contains(*[close_to(x, 1e-6) for x in values])
+
+
+class TestAnalytics(AssessmentTestCase):
+
+    def _matrix(self):
+        sets = [_assessed_set(1.0, 1.0, 1.0),
+                _assessed_set(1.0, 0.0, 1.0),
+                _assessed_set(0.0, 0.0, None),
+                _assessed_set(1.0, 1.0)]
+        return assessed_matrix(sets, rows=u'abcd')
+
+    def test_matrix(self):
+        matrix = self._matrix()
+        assert_that(matrix, has_length(4))
+        assert_that(matrix.rows, is_(tuple(u'abcd')))
+        assert_that(matrix.columns,
+                    contains((u'q1', 0), (u'q1', 1), (u'q2', 0)))
+        assert_that(numpy.isnan(matrix.values[2:, 2]).all(), is_(True))
+        assert_that(matrix.filled[:, 2].tolist(), is_([1.0, 1.0, 0.0, 0.0]))
+
+        matrix = assessed_matrix([_assessed_set(1.0, 0.0, 1.0)],
+                                 columns=[(u'q2', 0), (u'q1', 1)])
+        assert_that(matrix.values.tolist(), is_([[1.0, 0.0]]))
+
+        matrix = assessed_matrix(())
+        assert_that(matrix.values.shape, is_((0, 0)))
+        assert_that(numpy.isnan(matrix.percentiles(50)), is_(True))
+
+    def test_statistics(self):
+        matrix = self._matrix()
+        assert_that(matrix.scores().tolist(), is_([3.0, 2.0, 0.0, 2.0]))
+        # missing parts are not counted in the means
+        assert_that(matrix.mean().tolist(), _close_to(0.75, 0.5, 1.0))
+        assert_that(matrix.question_means(),
+                    has_entries(u'q1', close_to(0.625, 1e-6),
+                                u'q2', close_to(1.0, 1e-6)))
+        assert_that(matrix.percentiles([50, 100]).tolist(), is_([2.0, 3.0]))
+        assert_that(matrix.discrimination(0.25).tolist(), is_([1.0, 1.0, 1.0]))
+        assert_that(matrix.point_biserial().tolist(),
+                    _close_to(0.816496, 0.301511, 0.301511))
+        assert_that(matrix.point_biserial(corrected=False).tolist(),
+                    _close_to(0.927173, 0.688247, 0.688247))
+
+        # a subset reuses the extracted values
+        section = matrix.select([True, False, True, False])
+        assert_that(section.rows, is_((u'a', u'c')))
+        assert_that(section.scores().tolist(), is_([3.0, 0.0]))
+        assert_that(numpy.isnan(matrix.select([]).discrimination()).all(),
+                    is_(True))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# disable: accessing protected members, too many methods
+# pylint: disable=W0212,R0904
+
+from hamcrest import is_
+from hamcrest import has_entry
+from hamcrest import instance_of
+from hamcrest import assert_that
+from hamcrest import has_property
+
+import numpy
+
+from nti.testing.matchers import verifiably_provides
+
+from nti.assessment.analytics.survey import QColumnarAggregatedMultipleChoicePart
+from nti.assessment.analytics.survey import QColumnarAggregatedMultipleChoiceMultipleAnswerPart
+
+from nti.assessment.interfaces import IQAggregatedMultipleChoicePart
+from nti.assessment.interfaces import IQAggregatedMultipleChoiceMultipleAnswerPart
+
+from nti.assessment.survey import QAggregatedMultipleChoicePart
+
+from nti.assessment.tests import AssessmentTestCase
+
+
+class TestColumnarAggregation(AssessmentTestCase):
+
+    def test_multiple_choice(self):
+        part = QColumnarAggregatedMultipleChoicePart()
+        assert_that(part, verifiably_provides(IQAggregatedMultipleChoicePart))
+        part.append(1)
+        part.append(None)
+        part.extend([0, 3, 1, u'other'])
+        assert_that(part, has_property('Total', 6))
+        assert_that(part.Results, is_({0: 1, 1: 2, 3: 1, u'other': 1}))
+        assert_that(part.counts.tolist(), is_([1, 2, 0, 1]))
+
+        plain = QAggregatedMultipleChoicePart()
+        for response in (1, 1, 4):
+            plain.append(response)
+        part += plain
+        assert_that(part, has_property('Total', 9))
+        assert_that(part.counts.tolist(), is_([1, 4, 0, 1, 1]))
+
+        other = QColumnarAggregatedMultipleChoicePart()
+        other.extend([2, u'other'])
+        part += other
+        assert_that(part.Results,
+                    is_({0: 1, 1: 4, 2: 1, 3: 1, 4: 1, u'other': 2}))
+
+        # plain parts can aggregate columnar ones
+        plain += other
+        assert_that(plain.Results, is_({1: 2, 2: 1, 4: 1, u'other': 1}))
+
+        part.reset()
+        assert_that(part, has_property('Total', 0))
+        assert_that(part.Results, is_({}))
+
+    def test_multiple_answer(self):
+        part = QColumnarAggregatedMultipleChoiceMultipleAnswerPart()
+        assert_that(part,
+                    verifiably_provides(IQAggregatedMultipleChoiceMultipleAnswerPart))
+        part.append((0, 2))
+        part.extend([(1, 2), None, (2,)])
+        assert_that(part, has_property('Total', 4))
+        assert_that(part.Results, is_({0: 1, 1: 1, 2: 3}))
+
+    def test_state(self):
+        part = QColumnarAggregatedMultipleChoicePart()
+        part.extend([0, 2, 2])
+        state = part.__getstate__()
+        assert_that(state, has_entry('_counts', [1, 0, 2]))
+        assert_that(type(state['_counts'][0]), is_(int))
+        assert_that(part._counts, instance_of(numpy.ndarray))
+
+        copy = QColumnarAggregatedMultipleChoicePart.__new__(QColumnarAggregatedMultipleChoicePart)
+        copy.__setstate__(state)
+        assert_that(copy._counts, instance_of(numpy.ndarray))
+        assert_that(copy.counts.tolist(), is_([1, 0, 2]))
+        assert_that(copy.Results, is_({0: 1, 2: 2}))
+
+    def test_conflict_resolution(self):
+        part = QColumnarAggregatedMultipleChoicePart()
+        old = {'total': 1, '_counts': [1]}
+        saved = {'total': 2, '_counts': [1, 1]}
+        new = {'total': 3, '_counts': [2, 0, 1]}
+        result = part._p_resolveConflict(old, saved, new)
+        assert_that(result, has_entry('total', 4))
+        assert_that(result, has_entry('_counts', [2, 1, 1]))
+
+    def test_subtraction(self):
+        part = QColumnarAggregatedMultipleChoicePart()
+        part.extend([0, 1, 1, u'other'])
+        part.remove(1)
+        part.remove(u'other')
+        assert_that(part, has_property('Total', 2))
+        assert_that(part.Results, is_({0: 1, 1: 1}))
+
+        plain = QAggregatedMultipleChoicePart()
+        plain.append(0)
+        part -= plain
+        assert_that(part, has_property('Total', 1))
+        assert_that(part.counts.tolist(), is_([0, 1]))
+
+        part = QColumnarAggregatedMultipleChoiceMultipleAnswerPart()
+        part.extend([(0, 1), (1,)])
+        part.remove((0, 1))
+        assert_that(part.Results, is_({1: 1}))
+
+    def test_remove_missing(self):
+        part = QColumnarAggregatedMultipleChoicePart()
+        part.extend([0, u'other'])
+        for response in (1, u'missing'):
+            with self.assertRaises(ValueError):
+                part.remove(response)
+        plain = QAggregatedMultipleChoicePart()
+        plain.append(0)
+        plain.append(0)
+        with self.assertRaises(ValueError):
+            part -= plain
+        assert_that(part, has_property('Total', 2))
+        assert_that(part.counts.tolist(), is_([1]))
+        assert_that(part.Results, is_({0: 1, u'other': 1}))
+
+        part.remove(0)
+        part.remove(u'other')
+        with self.assertRaises(ValueError):
+            part.remove(None)
+        assert_that(part, has_property('Total', 0))
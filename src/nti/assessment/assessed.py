@@ -11,6 +11,8 @@ from __future__ import print_function
 from __future__ import absolute_import
 
 import time
+from itertools import islice
+from collections import namedtuple
 
 from zope import component
 from zope import interface
@@ -21,6 +23,8 @@ from persistent import Persistent
 
 from persistent.list import PersistentList
 
+from nti.assessment._ntiid_index import get_by_ntiid
+
 from nti.assessment._util import CreatorMixin
 from nti.assessment._util import make_sublocations as _make_sublocations
 from nti.assessment._util import dctimes_property_fallback as _dctimes_property_fallback
@@ -28,11 +32,16 @@ from nti.assessment._util import dctimes_property_fallback as _dctimes_property_
 from nti.assessment.common import QSubmittedPart
 
 from nti.assessment.interfaces import IQuestion
+from nti.assessment.interfaces import IQSolution
 from nti.assessment.interfaces import IQuestionSet
 from nti.assessment.interfaces import IQAssessedPart
 from nti.assessment.interfaces import IQAssessedQuestion
 from nti.assessment.interfaces import IQuestionSubmission
 from nti.assessment.interfaces import IQAssessedQuestionSet
+from nti.assessment.interfaces import IQuestionSetSubmission
+from nti.assessment.interfaces import IQAssignmentSubmission
+
+from nti.assessment.randomized import randomization_scope
 
 from nti.assessment.randomized.interfaces import IRandomizedPartsContainer
 
@@ -97,6 +106,134 @@ class QAssessedQuestion(SchemaConfigured,
     sublocations = _make_sublocations()
 
 
+@WithRepr
+@interface.implementer(IQAssessedPart)
+@EqHash('assessedValue', 'submittedResponse', superhash=True)
+class _CompactAssessedPart(object):
+    """
+    A view of a part of a :class:`QCompactAssessedQuestion`.
+    """
+
+    __name__ = None
+
+    __external_can_create__ = False
+    __external_class_name__ = 'AssessedPart'
+
+    mimeType = mime_type = QAssessedPart.mimeType
+
+    def __init__(self, question, index):
+        self.__parent__ = question
+        self._index = index
+
+    def _get_assessedValue(self):
+        return self.__parent__._values[self._index]
+
+    def _set_assessedValue(self, value):
+        self.__parent__._set_part_value('_values', self._index, value)
+    assessedValue = property(_get_assessedValue, _set_assessedValue)
+
+    def _get_submittedResponse(self):
+        return self.__parent__._responses[self._index]
+
+    def _set_submittedResponse(self, value):
+        self.__parent__._set_part_value('_responses', self._index, value)
+    submittedResponse = property(_get_submittedResponse, _set_submittedResponse)
+
+    @property
+    def creator(self):
+        return self.__parent__.creator
+
+
+@WithRepr
+@interface.implementer(IQAssessedQuestion,
+                       ICreated,
+                       ILastModified,
+                       ISublocations)
+@EqHash('questionId', 'parts', superhash=True)
+class QCompactAssessedQuestion(SchemaConfigured,
+                               ContainedMixin,
+                               CreatorMixin,
+                               Persistent):
+    """
+    An assessed question storing the assessed values and submitted
+    responses of all its parts in its own record rather than in one
+    persistent object per part. Its ``parts`` are views providing
+    :class:`.IQAssessedPart`.
+    """
+    createDirectFieldProperties(IQAssessedQuestion, omit=('parts',))
+
+    __external_can_create__ = False
+    __external_class_name__ = 'AssessedQuestion'
+
+    creator = None
+    createdTime = _dctimes_property_fallback('createdTime', 'Date.Modified')
+    lastModified = _dctimes_property_fallback('lastModified', 'Date.Created')
+
+    mimeType = mime_type = QAssessedQuestion.mimeType
+
+    _values = ()
+    _responses = ()
+
+    def __init__(self, *args, **kwargs):
+        super(QCompactAssessedQuestion, self).__init__(*args, **kwargs)
+        self.lastModified = self.createdTime = time.time()
+
+    def updateLastMod(self, t=None):
+        self.lastModified = (
+            t if t is not None and t > self.lastModified else time.time()
+        )
+        return self.lastModified
+
+    def _get_parts(self):
+        parts = getattr(self, '_v_parts', None)
+        if parts is None or len(parts) != len(self._values):
+            parts = tuple(_CompactAssessedPart(self, idx)
+                          for idx in range(len(self._values)))
+            self._v_parts = parts
+        return parts
+
+    def _set_parts(self, parts):
+        parts = tuple(parts or ())
+        self._values = tuple(x.assessedValue for x in parts)
+        self._responses = tuple(x.submittedResponse for x in parts)
+        for part, response in zip(parts, self._responses):
+            # take ownership from the parts we replace
+            if getattr(response, '__parent__', None) is part:
+                response.__parent__ = self
+        self._v_parts = None
+    parts = property(_get_parts, _set_parts)
+
+    def _set_part_value(self, attr, index, value):
+        values = list(getattr(self, attr))
+        values[index] = value
+        setattr(self, attr, tuple(values))
+
+    def sublocations(self):
+        for part in self.parts:
+            yield part
+        for response in self._responses:
+            if hasattr(response, '__parent__'):
+                if response.__parent__ is None:
+                    response.__parent__ = self
+                if response.__parent__ is self:
+                    yield response
+
+
+def compact_assessed_question(assessed_question):
+    """
+    Return a :class:`QCompactAssessedQuestion` with the question id,
+    parts, creator and times of the given assessed question.
+    """
+    result = QCompactAssessedQuestion(questionId=assessed_question.questionId,
+                                      parts=assessed_question.parts)
+    creator = getattr(assessed_question, 'creator', None)
+    if creator is not None:
+        result.creator = creator
+    result.createdTime = assessed_question.createdTime
+    result.lastModified = assessed_question.lastModified
+    return result
+
+
 @WithRepr
 @interface.implementer(IQAssessedQuestionSet,
                        ICreated,
@@ -129,6 +266,42 @@ class QAssessedQuestionSet(SchemaConfigured,
     sublocations = _make_sublocations('questions')
 
 
+def _question_to_grade(question_id, question_set, registry):
+    question = None
+    if question_set is not None:
+        # This will return a randomized parts proxy, if applicable.
+        question = question_set.get_question_by_ntiid(question_id)
+
+    registered_question = get_by_ntiid(IQuestion, question_id, registry)
+    if question is None:
+        # If question_set is None or does not contain our question is probably only
+        # a test scenario.
+        question = registered_question
+
+    # According to tests, the registered question takes precedence. If those
+    # are unequal, we must make sure the question/parts are dynamically
+    # randomized, if necessary.
+    if question != registered_question:
+        question = registered_question
+        if IRandomizedPartsContainer.providedBy(question_set):
+            question = QuestionRandomizedPartsProxy(question)
+    return question
+
+
+def _grade_part(sub_part, q_part, creator):
+    # Grade what they submitted, if they submitted something. If they didn't
+    # submit anything, it's automatically "wrong."
+    try:
+        if sub_part is not None:
+            return q_part.grade(sub_part, creator)
+        return 0.0
+    except (LookupError, ValueError):
+        # We couldn't grade the part because the submission was in the wrong
+        # format. Translate this error to something more useful.
+        __traceback_info__ = sub_part, q_part
+        raise InvalidValue(value=sub_part, field=IQuestionSubmission['parts'])
+
+
 def assess_question_submission(submission, question_set=None, registry=component):
     """
     Assess the given question submission.
@@ -153,25 +326,7 @@ def assess_question_submission(submission, question_set=None, registry=component
     :raises Invalid: If a submitted part has the wrong kind of input
             to be graded.
     """
-    question = None
-    if question_set is not None:
-        # This will return a randomized parts proxy, if applicable.
-        question = question_set.get_question_by_ntiid(submission.questionId)
-
-    registered_question = registry.getUtility(IQuestion, name=submission.questionId)
-    if question is None:
-        # If question_set is None or does not contain our question is probably only
-        # a test scenario.
-        question = registered_question
-
-    # According to tests, the registered question takes precedence. If those
-    # are unequal, we must make sure the question/parts are dynamically
-    # randomized, if necessary.
-    if question != registered_question:
-        question = registered_question
-        if IRandomizedPartsContainer.providedBy(question_set):
-            question = QuestionRandomizedPartsProxy(question)
-
+    question = _question_to_grade(submission.questionId, question_set, registry)
     if len(question.parts) != len(submission.parts):
         raise ValueError(
             "Question (%s) and submission (%s) have different numbers of parts." %
@@ -179,21 +334,9 @@ def assess_question_submission(submission, question_set=None, registry=component
 
     creator = getattr(submission, 'creator', None)
     assessed_parts = PersistentList()
-    for sub_part, q_part in zip(submission.parts, question.parts):
-        # Grade what they submitted, if they submitted something. If they didn't
-        # submit anything, it's automatically "wrong."
-        try:
-            if sub_part is not None:
-                grade = q_part.grade(sub_part, creator)
-            else:
-                grade = 0.0
-        except (LookupError, ValueError):
-            # We couldn't grade the part because the submission was in the wrong
-            # format. Translate this error to something more useful.
-            __traceback_info__ = sub_part, q_part
-            raise InvalidValue(
-                value=sub_part, field=IQuestionSubmission['parts'])
-        else:
+    with randomization_scope():
+        for sub_part, q_part in zip(submission.parts, question.parts):
+            grade = _grade_part(sub_part, q_part, creator)
             apart = QAssessedPart(submittedResponse=sub_part,
                                   assessedValue=grade)
             assessed_parts.append(apart)
@@ -202,8 +345,15 @@ def assess_question_submission(submission, question_set=None, registry=component
     return result
 
 
+def _question_set_ntiids(question_set):
+    positions = getattr(question_set, '_question_positions', None)
+    if positions is not None:
+        return positions()
+    return {q.ntiid for q in question_set.Items}
+
+
 def _do_assess_question_set_submission(question_set, set_submission, registry):
-    questions_ntiids = {q.ntiid for q in question_set.Items}
+    questions_ntiids = _question_set_ntiids(question_set)
 
     # NOTE: At this point we need to decide what to do for missing values
     # We are currently not really grading them at all, which is what we
@@ -211,11 +361,10 @@ def _do_assess_question_set_submission(question_set, set_submission, registry):
 
     assessed = PersistentList()
     for sub_question in set_submission.questions:
-        question = registry.getUtility(IQuestion,
-                                       name=sub_question.questionId)
+        question = get_by_ntiid(IQuestion, sub_question.questionId, registry)
         ntiid = getattr(question, 'ntiid', None)
         if     ntiid in questions_ntiids \
-            or question in question_set.Items:
+            or (ntiid is None and question in question_set.Items):
             # Important to use our context when grading
             sub_assessed = component.queryMultiAdapter((sub_question, question_set),
                                                        IQAssessedQuestion)
@@ -224,7 +373,7 @@ def _do_assess_question_set_submission(question_set, set_submission, registry):
             assessed.append(sub_assessed)
         else:  # pragma: no cover
             logger.warn("Bad input, question (%s) not in question set (%s) (known: %s)",
-                        question, question_set, questions_ntiids)
+                        question, question_set, list(questions_ntiids))
 
     # NOTE: We're not really creating some sort of aggregate grade here
     result = QAssessedQuestionSet(questionSetId=set_submission.questionSetId,
@@ -243,9 +392,164 @@ def assess_question_set_submission(set_submission, registry=component):
             Used to look up the question set and question by id.
     :raises LookupError: If no question can be found for the submission.
     """
-    question_set = registry.getUtility(IQuestionSet,
-                                       name=set_submission.questionSetId)
-    result = _do_assess_question_set_submission(question_set,
-                                                set_submission,
-                                                registry)
+    question_set = get_by_ntiid(IQuestionSet, set_submission.questionSetId,
+                                registry)
+    # every randomized part in the set is graded for the same principal
+    with randomization_scope():
+        result = _do_assess_question_set_submission(question_set,
+                                                    set_submission,
+                                                    registry)
     return result
+
+
+#: An assessed part whose value was changed by
+#: :func:`regrade_assessed_question_set`.
+RegradedPart = namedtuple('RegradedPart',
+                          ('questionId', 'index', 'part', 'oldValue', 'newValue'))
+
+
+def _affected_part_indices(question, changed):
+    if IQSolution.providedBy(changed):
+        # solutions have no ntiid; find the parts holding it, either
+        # the (possibly edited in place) solution itself or one of
+        # equal value
+        return [idx for idx, part in enumerate(question.parts)
+                if any(x is changed or x == changed
+                       for x in getattr(part, 'solutions', None) or ())]
+    if getattr(question, 'ntiid', None) == changed:
+        return range(len(question.parts))
+    return [idx for idx, part in enumerate(question.parts)
+            if getattr(part, 'ntiid', None) == changed]
+
+
+def regrade_assessed_question_set(assessed_set, changed, question_set=None,
+                                  creator=None, registry=component):
+    """
+    Regrade, in place, the parts of the given assessed question set
+    affected by a change to a question, part or solution. The other
+    parts are left alone.
+
+    :param assessed_set: An :class:`.interfaces.IQAssessedQuestionSet`.
+    :param changed: The ntiid of the changed question or part, or the
+            changed :class:`.interfaces.IQSolution` itself. Solutions
+            have no ntiid; the parts holding the solution, or one of
+            equal value, are regraded.
+    :param question_set: The :class:`.interfaces.IQuestionSet` that was
+            assessed; looked up by id if not given.
+    :param creator: The principal the set was assessed for, used to
+            grade randomized parts; defaults to the creator of the
+            assessed set.
+    :return: A list of :class:`RegradedPart`, one for each part whose
+            assessed value changed.
+    :raises LookupError: If an assessed question cannot be found.
+    :raises Invalid: If a submitted part has the wrong kind of input
+            to be graded.
+    """
+    if question_set is None:
+        question_set = get_by_ntiid(IQuestionSet, assessed_set.questionSetId,
+                                    registry)
+    if creator is None:
+        creator = getattr(assessed_set, 'creator', None)
+    result = []
+    with randomization_scope():
+        for assessed_question in assessed_set.questions or ():
+            question_id = assessed_question.questionId
+            registered = get_by_ntiid(IQuestion, question_id, registry)
+            indices = _affected_part_indices(registered, changed)
+            if not indices:
+                continue
+            question = _question_to_grade(question_id, question_set, registry)
+            if len(question.parts) != len(assessed_question.parts):
+                raise ValueError(
+                    "Question (%s) and assessment (%s) have different numbers of parts." %
+                    (len(question.parts), len(assessed_question.parts)))
+            modified = False
+            for idx in indices:
+                apart = assessed_question.parts[idx]
+                grade = _grade_part(apart.submittedResponse,
+                                    question.parts[idx],
+                                    creator)
+                if grade != apart.assessedValue:
+                    result.append(RegradedPart(question_id, idx, apart,
+                                               apart.assessedValue, grade))
+                    apart.assessedValue = grade
+                    modified = True
+            if modified:
+                assessed_question.updateLastMod()
+    if result:
+        assessed_set.updateLastMod()
+    return result
+
+
+#: The default number of submissions assessed together by
+#: :func:`iter_assessed_submissions`.
+DEFAULT_CHUNK_SIZE = 100
+
+#: An assessed submission, as produced by :func:`iter_assessed_submissions`.
+#: ``assessed`` is ``None`` if assessing the submission raised ``error``.
+AssessedSubmission = namedtuple('AssessedSubmission',
+                                ('submission', 'assessed', 'error'))
+
+
+def _assess_submission(submission, registry):
+    if IQuestionSetSubmission.providedBy(submission):
+        question_set = get_by_ntiid(IQuestionSet, submission.questionSetId,
+                                    registry)
+        return _do_assess_question_set_submission(question_set,
+                                                  submission,
+                                                  registry)
+    if IQAssignmentSubmission.providedBy(submission):
+        return tuple(_assess_submission(part, registry)
+                     for part in submission.parts or ())
+    raise TypeError("Cannot assess %r" % (submission,))
+
+
+def iter_assessed_submissions(submissions, registry=component,
+                              chunk_size=DEFAULT_CHUNK_SIZE,
+                              progress=None, errors=(Exception,)):
+    """
+    Lazily assess the given submissions, e.g. to regrade them.
+
+    The submissions are consumed ``chunk_size`` at a time; a chunk is
+    assessed within a single :func:`.randomization_scope` before its
+    results are yielded, so memory use is bound by the chunk size and
+    not by the number of submissions.
+
+    :param submissions: An iterable of :class:`.IQuestionSetSubmission`
+            or :class:`.IQAssignmentSubmission` objects. The parts of an
+            assignment submission are assessed as question set
+            submissions; its ``assessed`` result is the tuple of their
+            :class:`.IQAssessedQuestionSet`.
+    :param progress: If given, a callable invoked after each chunk with
+            the number of submissions assessed so far and the number of
+            those that failed.
+    :param errors: The exceptions caught when assessing a submission;
+            they are logged and returned as the ``error`` of its result
+            instead of stopping the pipeline.
+    :return: An iterator of :class:`AssessedSubmission`, in the order of
+            ``submissions``.
+    """
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk size", chunk_size)
+    done = failed = 0
+    submissions = iter(submissions)
+    while True:
+        chunk = list(islice(submissions, chunk_size))
+        if not chunk:
+            break
+        results = []
+        with randomization_scope():
+            for submission in chunk:
+                try:
+                    assessed = _assess_submission(submission, registry)
+                except errors as e:
+                    logger.warning("Cannot assess %r: %r", submission, e)
+                    failed += 1
+                    results.append(AssessedSubmission(submission, None, e))
+                else:
+                    results.append(AssessedSubmission(submission, assessed, None))
+        done += len(results)
+        if progress is not None:
+            progress(done, failed)
+        for result in results:
+            yield result
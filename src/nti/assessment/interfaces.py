@@ -1961,6 +1961,20 @@ class IEvaluationImporterUpdater(interface.Interface):
         """
 
 
+class IQuestionIndexLoadListener(interface.Interface):
+    """
+    A utility notified with the statistics of each assessment index load.
+    """
+
+    def indexLoaded(stats):
+        """
+        Called once a load is done.
+
+        :param stats: The :class:`nti.assessment._load_stats.IndexLoadStats`
+            with the per phase timings and counts of the load.
+        """
+
+
 class IAvoidSolutionDecoration(interface.Interface):
     pass
 
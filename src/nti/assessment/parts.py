@@ -73,6 +73,8 @@ from nti.assessment.interfaces import IQModeledContentResponse
 
 from nti.assessment.interfaces import convert_response_for_solution
 
+from nti.assessment.randomized import clear_randomized_solutions_cache
+
 from nti.assessment.randomized.interfaces import ISha224RandomizedMatchingPart
 from nti.assessment.randomized.interfaces import ISha224RandomizedOrderingPart
 from nti.assessment.randomized.interfaces import ISha224RandomizedMultipleChoicePart
@@ -103,6 +105,9 @@ from nti.schema.schema import SchemaConfigured
 
 logger = __import__('logging').getLogger(__name__)
 
+#: Part attributes the shuffled external solutions are computed from
+_RANDOMIZED_SOLUTIONS_ATTRS = ('solutions', 'choices', 'values')
+
 
 @WithRepr
 @interface.implementer(IQNonGradablePart, IContained)
@@ -243,6 +248,9 @@ class QPart(QNonGradablePart):
 
     def __setattr__(self, name, value):
         super(QPart, self).__setattr__(name, value)
+        if name in _RANDOMIZED_SOLUTIONS_ATTRS:
+            # shuffled external solutions depend on these
+            clear_randomized_solutions_cache(self)
         if name == "solutions":
             for x in self.solutions or ():
                 try:
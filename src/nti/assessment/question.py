@@ -28,6 +28,8 @@ from zope.interface.common.sequence import IFiniteSequence
 
 from zope.mimetype.interfaces import IContentTypeAware
 
+from zope.proxy import getProxiedObject
+
 from nti.assessment.common import get_containerId
 
 from nti.assessment.common import VersionedMixin
@@ -165,15 +167,36 @@ class _ProxyQuestionIterableWrapper(_QuestionIterableWrapper):
     """
     Used by :class:`IRandomizedPartsContainer` question sets, this will
     return :class:`QuestionRandomizedPartsProxy` question objects.
+
+    Proxies are reused from the given ``proxies`` mapping (keyed by
+    question ntiid) as long as they still wrap the same question object.
     """
 
+    __slots__ = ('_proxies',)
+
+    def __init__(self, questions, proxies=None):
+        super(_ProxyQuestionIterableWrapper, self).__init__(questions)
+        self._proxies = proxies if proxies is not None else {}
+
     def _transform(self, question):
         result = super(_ProxyQuestionIterableWrapper, self)._transform(question)
         if result is not None:
-            result = QuestionRandomizedPartsProxy(result)
+            key = getattr(result, 'ntiid', None) or id(result)
+            proxy = self._proxies.get(key)
+            if proxy is None or getProxiedObject(proxy) is not result:
+                proxy = QuestionRandomizedPartsProxy(result)
+                self._proxies[key] = proxy
+            result = proxy
         return result
 
 
+def _set_positions(questions, positions):
+    try:
+        questions._v_positions = positions
+    except AttributeError:  # not a persistent list
+        pass
+
+
 @interface.implementer(IQuestionSet)
 class QQuestionSet(QBaseMixin, RecordableContainerMixin):
 
@@ -193,6 +216,15 @@ class QQuestionSet(QBaseMixin, RecordableContainerMixin):
     def _questions(self, val):
         self.__dict__['questions'] = PersistentList(val or ())
         self._p_changed = True
+        self._v_question_proxies = None
+
+    def _question_proxies(self):
+        # randomized parts proxies of our questions, see
+        # _ProxyQuestionIterableWrapper
+        result = getattr(self, '_v_question_proxies', None)
+        if result is None:
+            result = self._v_question_proxies = {}
+        return result
     
     @property
     def questions(self):
@@ -208,7 +240,8 @@ class QQuestionSet(QBaseMixin, RecordableContainerMixin):
         """
         result = self._questions or ()
         if IRandomizedPartsContainer.providedBy(self):
-            result = _ProxyQuestionIterableWrapper(result)
+            result = _ProxyQuestionIterableWrapper(result,
+                                                   self._question_proxies())
         else:
             result = _QuestionIterableWrapper(result)
         return result
@@ -224,25 +257,59 @@ class QQuestionSet(QBaseMixin, RecordableContainerMixin):
     def __getitem__(self, index):
         return self.questions[index]
 
+    def _question_positions(self):
+        """
+        Return a map from the ntiid of each of our questions to its
+        (first) position. It is cached on our list of questions, so it
+        is dropped when the list is invalidated, and until the number of
+        questions changes.
+        """
+        questions = self._questions or ()
+        cached = getattr(questions, '_v_positions', None)
+        if cached is None or cached[0] != len(questions):
+            positions = {}
+            for idx, question in enumerate(questions):
+                ntiid = getattr(question, 'ntiid', None)
+                if ntiid is not None and ntiid not in positions:
+                    positions[ntiid] = idx
+            cached = (len(questions), positions)
+            _set_positions(questions, cached)
+        return cached[1]
+
+    def _clear_question_positions(self):
+        _set_positions(self._questions, None)
+
+    def _question_position(self, ntiid):
+        idx = self._question_positions().get(ntiid)
+        if      idx is not None \
+            and getattr(self._questions[idx], 'ntiid', None) != ntiid:
+            # reordered in place, keeping the same length
+            self._clear_question_positions()
+            idx = self._question_positions().get(ntiid)
+        return idx
+
     def get_question_by_ntiid(self, ntiid):
-        for question in self.questions or ():
-            if ntiid == question.ntiid:
-                return question
+        idx = self._question_position(ntiid)
+        if idx is not None:
+            return self.questions[idx]
+        return None
 
     def __len__(self):
         return len(self.questions or ())
 
     def pop(self, index):
         try:
-            return self._questions.pop(index)
+            result = self._questions.pop(index)
         except (TypeError, AttributeError):
             raise IndexError()
+        self._clear_question_positions()
+        return result
 
     def remove(self, question):
         ntiid = getattr(question, 'ntiid', question)
-        for idx, question in enumerate(tuple(self.questions or ())):  # mutating
-            if question.ntiid == ntiid:
-                return self.pop(idx)
+        idx = self._question_position(ntiid)
+        if idx is not None:
+            return self.pop(idx)
         return None
 
     def _validate_insert(self, item):
@@ -253,6 +320,7 @@ class QQuestionSet(QBaseMixin, RecordableContainerMixin):
         if 'questions' not in self.__dict__:
             self._questions = PersistentList()
         self._questions.append(item)
+        self._clear_question_positions()
     add = append
 
     def insert(self, index, item):
@@ -269,6 +337,7 @@ class QQuestionSet(QBaseMixin, RecordableContainerMixin):
             self.append(item)
         else:
             self._questions.insert(index, item)
+            self._clear_question_positions()
 
     @property
     def question_count(self):
@@ -10,6 +10,11 @@ from __future__ import absolute_import
 
 import random
 import hashlib
+import threading
+
+from contextlib import contextmanager
+
+from repoze.lru import LRUCache
 
 from zope import component
 
@@ -18,13 +23,88 @@ from nti.assessment.randomized.interfaces import IPrincipalSeedSelector
 
 logger = __import__('logging').getLogger(__name__)
 
+#: The number of seeds whose shuffled external solutions are kept per part
+SOLUTIONS_CACHE_SIZE = 250
 
-def get_seed(context=None):
+#: The volatile part attribute holding the shuffled external solutions
+SOLUTIONS_CACHE_ATTR = '_v_randomized_external_solutions'
+
+#: The number of seeds whose draw plans are kept per question bank
+DRAW_PLANS_CACHE_SIZE = 1000
+
+#: The volatile question bank attribute holding the draw plans
+DRAW_PLANS_CACHE_ATTR = '_v_questionbank_draw_plans'
+
+
+class RandomizationScope(object):
+    """
+    Memoizes the seed selected for a principal and the unshuffle decision
+    for a (question, principal) pair. See :func:`randomization_scope`.
+    """
+
+    def __init__(self):
+        self.seeds = {}
+        self.unshuffled = {}
+
+    def seed_for(self, context, factory):
+        try:
+            return self.seeds[context]
+        except KeyError:
+            result = self.seeds[context] = factory(context)
+            return result
+        except TypeError:  # unhashable principal
+            return factory(context)
+
+    def needs_unshuffled(self, question, creator, factory):
+        try:
+            # keep the question alive so its id cannot be reused
+            return self.unshuffled[(id(question), creator)][1]
+        except KeyError:
+            result = factory(question, creator)
+            self.unshuffled[(id(question), creator)] = (question, result)
+            return result
+        except TypeError:  # unhashable principal
+            return factory(question, creator)
+
+
+_scopes = threading.local()
+
+
+def current_randomization_scope():
+    return getattr(_scopes, 'current', None)
+
+
+@contextmanager
+def randomization_scope():
+    """
+    A context manager within which the seed of each principal and each
+    unshuffle decision are computed only once, no matter how many parts
+    are graded or externalized. Nested scopes share the outermost scope.
+    """
+    scope = current_randomization_scope()
+    if scope is not None:
+        yield scope
+        return
+    scope = _scopes.current = RandomizationScope()
+    try:
+        yield scope
+    finally:
+        _scopes.current = None
+
+
+def _select_seed(context=None):
     selector = component.queryUtility(IPrincipalSeedSelector)
     result = selector(context) if selector is not None else None
     return result
 
 
+def get_seed(context=None):
+    scope = current_randomization_scope()
+    if scope is not None:
+        return scope.seed_for(context, _select_seed)
+    return _select_seed(context)
+
+
 def randomize(user=None, context=None, seed=None):
     if seed is None:
         seed = get_seed(user)
@@ -50,27 +130,71 @@ def questionbank_random(context, user=None):
     return generator
 
 
-def questionbank_question_index_chooser(context, questions=None, user=None):
-    result = ()
-    questions = questions or context.questions
-    generator = questionbank_random(context, user=user)
-    if generator and questions and context.draw and context.draw < len(questions):
-        ranges = context.ranges or ()
-        if not ranges:
-            result = generator.sample(range(0, len(questions)), context.draw)
-        else:
-            result = []
-            for r in ranges:
-                indices = range(r.start, r.end + 1)
-                generated = generator.sample(indices, r.draw)
-                result.extend(generated)
-                generator = questionbank_random(context, user=user)
-        result.sort()
+def _draw_plan(generator, count, draw, ranges):
+    if not ranges:
+        result = generator.sample(range(0, count), draw)
     else:
-        result = range(len(questions))
+        result = []
+        # every range is drawn with a generator in its initial state
+        state = generator.getstate()
+        for start, end, range_draw in ranges:
+            generator.setstate(state)
+            result.extend(generator.sample(range(start, end + 1), range_draw))
+    result.sort()
+    return tuple(result)
+
+
+def questionbank_draw_plans_cache(context):
+    """
+    Return the (per-seed) cache of draw plans for the given question bank.
+    The cache is a volatile attribute so it is discarded whenever the bank
+    is invalidated or ghosted.
+    """
+    cache = getattr(context, DRAW_PLANS_CACHE_ATTR, None)
+    if cache is None:
+        cache = LRUCache(DRAW_PLANS_CACHE_SIZE)
+        setattr(context, DRAW_PLANS_CACHE_ATTR, cache)
+    return cache
+
+
+def clear_questionbank_draw_plans_cache(context):
+    if getattr(context, DRAW_PLANS_CACHE_ATTR, None) is not None:
+        delattr(context, DRAW_PLANS_CACHE_ATTR)
+
+
+def questionbank_draw_plan(context, count, user=None, seed=None):
+    """
+    Return the sorted tuple of the question indices drawn from a bank
+    of ``count`` questions for the given user (or seed), or ``None`` if
+    all questions are to be used.
+    """
+    draw = context.draw
+    if not count or not draw or draw >= count:
+        return None
+    if seed is None:
+        seed = get_seed(user)
+        if seed is None:
+            return None
+    seed = int(seed)
+    ranges = tuple((r.start, r.end, r.draw) for r in context.ranges or ())
+    key = (seed, ISha224Randomized.providedBy(context), count, draw, ranges)
+    cache = questionbank_draw_plans_cache(context)
+    result = cache.get(key)
+    if result is None:
+        generator = randomize(context=context, seed=seed)
+        result = _draw_plan(generator, count, draw, ranges)
+        cache.put(key, result)
     return result
 
 
+def questionbank_question_index_chooser(context, questions=None, user=None):
+    questions = questions or context.questions
+    plan = questionbank_draw_plan(context, len(questions), user=user)
+    if plan is None:
+        return list(range(len(questions)))
+    return list(plan)
+
+
 def questionbank_question_chooser(context, questions=None, user=None):
     questions = questions or context.questions
     idxs = questionbank_question_index_chooser(context, questions, user)
@@ -81,6 +205,24 @@ def questionbank_question_chooser(context, questions=None, user=None):
     return result
 
 
+def questionbank_draw_plans(context, users, questions=None):
+    """
+    Compute the question indices drawn from the given question bank for
+    each of the given users (e.g. a course roster).
+
+    :return: A list with the sorted question indices of each user, in the
+        order of ``users``.
+    """
+    result = []
+    questions = questions or context.questions
+    count = len(questions)
+    with randomization_scope():
+        for user in users:
+            plan = questionbank_draw_plan(context, count, user=user)
+            result.append(list(range(count)) if plan is None else list(plan))
+    return result
+
+
 def shuffle_matching_part_solutions(generator, values, ext_solutions):
     if not ext_solutions:
         return
@@ -124,3 +266,21 @@ def shuffle_multiple_choice_multiple_answer_part_solutions(generator,
             idx = int(v)
             uidx = shuffled[original[idx]]
             value[pos] = uidx
+
+
+def randomized_solutions_cache(part):
+    """
+    Return the (per-seed) cache of shuffled external solutions for
+    the given part. The cache is a volatile attribute so it is discarded
+    whenever the part is invalidated or ghosted.
+    """
+    cache = getattr(part, SOLUTIONS_CACHE_ATTR, None)
+    if cache is None:
+        cache = LRUCache(SOLUTIONS_CACHE_SIZE)
+        setattr(part, SOLUTIONS_CACHE_ATTR, cache)
+    return cache
+
+
+def clear_randomized_solutions_cache(part):
+    if getattr(part, SOLUTIONS_CACHE_ATTR, None) is not None:
+        delattr(part, SOLUTIONS_CACHE_ATTR)
@@ -8,16 +8,21 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
 
+import copy
+
 from zope import component
 from zope import interface
 
 from nti.assessment.interfaces import IQPartSolutionsExternalizer
 
+from nti.assessment.randomized import get_seed
 from nti.assessment.randomized import randomize
+from nti.assessment.randomized import randomized_solutions_cache
 from nti.assessment.randomized import shuffle_matching_part_solutions
 from nti.assessment.randomized import shuffle_multiple_choice_part_solutions
 from nti.assessment.randomized import shuffle_multiple_choice_multiple_answer_part_solutions
 
+from nti.assessment.randomized.interfaces import ISha224Randomized
 from nti.assessment.randomized.interfaces import IQRandomizedMatchingPart
 from nti.assessment.randomized.interfaces import IQRandomizedOrderingPart
 from nti.assessment.randomized.interfaces import IQRandomizedMultipleChoicePart
@@ -28,6 +33,52 @@ from nti.externalization.externalization import to_external_object
 logger = __import__('logging').getLogger(__name__)
 
 
+def _shuffled_external_solutions(part, name, shuffler, seed=None):
+    # CS: 20150815 make sure we skip the externalization cache
+    # since this method may be called from a decorator and the state
+    # cache may have been set
+    solutions = to_external_object(part.solutions, useCache=False)
+    generator = randomize(context=part, seed=seed)
+    if generator is not None:
+        values = to_external_object(getattr(part, name), useCache=False)
+        shuffler(generator, values, solutions)
+    return solutions
+
+
+def _solutions_fingerprint(part, name):
+    # the solutions and the shuffled values can be changed in place (or
+    # in another connection) without the part being set, so the cached
+    # structures are keyed by what they are computed from
+    solutions = [(type(x).__name__, getattr(x, 'value', None), getattr(x, 'weight', None))
+                 for x in part.solutions or ()]
+    return repr((solutions, getattr(part, name, None)))
+
+
+def cached_shuffled_external_solutions(part, name, shuffler):
+    """
+    Return the externalized solutions of the randomized part shuffled for
+    the current principal.
+
+    The shuffled structures are cached on the part by seed and by a
+    fingerprint of the solutions and shuffled values, so repeated
+    externalization of the same part for the same principal does not
+    externalize and shuffle again. A copy is always returned since callers
+    are free to modify it.
+    """
+    seed = get_seed()
+    if seed is None:
+        # no seed, nothing to cache on
+        return _shuffled_external_solutions(part, name, shuffler, seed)
+    key = (int(seed), name, ISha224Randomized.providedBy(part),
+           _solutions_fingerprint(part, name))
+    cache = randomized_solutions_cache(part)
+    result = cache.get(key)
+    if result is None:
+        result = _shuffled_external_solutions(part, name, shuffler, seed)
+        cache.put(key, result)
+    return copy.deepcopy(result)
+
+
 @component.adapter(IQRandomizedMatchingPart)
 @interface.implementer(IQPartSolutionsExternalizer)
 class _RandomizedMatchingPartSolutionsExternalizer(object):
@@ -38,15 +89,9 @@ class _RandomizedMatchingPartSolutionsExternalizer(object):
         self.part = part
 
     def to_external_object(self):
-        # CS: 20150815 make sure we skip the externalization cache
-        # since this method may be called from a decorator and the state
-        # cache may have been set
-        solutions = to_external_object(self.part.solutions, useCache=False)
-        generator = randomize(context=self.part)
-        if generator is not None:
-            values = to_external_object(self.part.values, useCache=False)
-            shuffle_matching_part_solutions(generator, values, solutions)
-        return solutions
+        return cached_shuffled_external_solutions(self.part,
+                                                  'values',
+                                                  shuffle_matching_part_solutions)
 
 
 @component.adapter(IQRandomizedOrderingPart)
@@ -65,14 +110,9 @@ class _RandomizedMultipleChoicePartSolutionsExternalizer(object):
         self.part = part
 
     def to_external_object(self):
-        solutions = to_external_object(self.part.solutions, useCache=False)
-        generator = randomize(context=self.part)
-        if generator is not None:
-            choices = to_external_object(self.part.choices, useCache=False)
-            shuffle_multiple_choice_part_solutions(generator, 
-                                                   choices, 
-                                                   solutions)
-        return solutions
+        return cached_shuffled_external_solutions(self.part,
+                                                  'choices',
+                                                  shuffle_multiple_choice_part_solutions)
 
 
 @interface.implementer(IQPartSolutionsExternalizer)
@@ -85,11 +125,6 @@ class _RandomizedMultipleChoiceMultipleAnswerPartSolutionsExternalizer(object):
         self.part = part
 
     def to_external_object(self):
-        solutions = to_external_object(self.part.solutions, useCache=False)
-        generator = randomize(context=self.part)
-        if generator is not None:
-            choices = to_external_object(self.part.choices, useCache=False)
-            shuffle_multiple_choice_multiple_answer_part_solutions(generator, 
-																   choices,
-																   solutions)
-        return solutions
+        return cached_shuffled_external_solutions(self.part,
+                                                  'choices',
+                                                  shuffle_multiple_choice_multiple_answer_part_solutions)
@@ -17,6 +17,7 @@ from nti.assessment.graders import MultipleChoiceMultipleAnswerGrader
 
 from nti.assessment.randomized import randomize
 from nti.assessment.randomized import shuffle_list
+from nti.assessment.randomized import current_randomization_scope
 
 from nti.assessment.randomized.interfaces import IQRandomizedMatchingPartGrader
 from nti.assessment.randomized.interfaces import IQRandomizedOrderingPartGrader
@@ -27,13 +28,21 @@ from nti.assessment.randomized.interfaces import IQRandomizedMultipleChoiceMulti
 logger = __import__('logging').getLogger(__name__)
 
 
+def _query_needs_unshuffled(question, creator):
+    utility = component.queryUtility(IRandomizedPartGraderUnshuffleValidator)
+    return utility is None or utility.needs_unshuffled(question, creator)
+
+
 def _needs_unshuffled(grader, creator):
     """
     Check if our response should be unshuffled (only for students).
     """
-    utility = component.queryUtility(IRandomizedPartGraderUnshuffleValidator)
     question = grader.part.question
-    return utility is None or utility.needs_unshuffled(question, creator)
+    scope = current_randomization_scope()
+    if scope is not None:
+        return scope.needs_unshuffled(question, creator,
+                                      _query_needs_unshuffled)
+    return _query_needs_unshuffled(question, creator)
 
 
 class RandomizedConnectingPartGrader(ConnectingPartGrader):
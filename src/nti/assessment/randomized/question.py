@@ -17,6 +17,8 @@ from nti.assessment.interfaces import RANDOMIZED_QUESTION_SET_MIME_TYPE
 
 from nti.assessment.question import QQuestionSet
 
+from nti.assessment.randomized import clear_questionbank_draw_plans_cache
+
 from nti.assessment.randomized.interfaces import IQuestionBank
 from nti.assessment.randomized.interfaces import IQuestionIndexRange
 from nti.assessment.randomized.interfaces import IRandomizedQuestionSet
@@ -31,6 +33,9 @@ from nti.schema.schema import SchemaConfigured
 
 logger = __import__('logging').getLogger(__name__)
 
+#: Attributes whose change invalidates the cached draw plans of a bank
+_DRAW_PLAN_ATTRS = ('questions', 'draw', 'ranges')
+
 
 @interface.implementer(IRandomizedQuestionSet)
 class QRandomizedQuestionSet(QQuestionSet):
@@ -49,6 +54,11 @@ class QQuestionBank(QQuestionSet):
     __external_class_name__ = "QuestionSet"
     mimeType = mime_type = QUESTION_BANK_MIME_TYPE
 
+    def __setattr__(self, name, value):
+        super(QQuestionBank, self).__setattr__(name, value)
+        if name in _DRAW_PLAN_ATTRS:
+            clear_questionbank_draw_plans_cache(self)
+
     def _copy(self, result, questions=None, ranges=None):
         result.draw = self.draw
         result.title = self.title
@@ -9,6 +9,7 @@ from __future__ import absolute_import
 # pylint: disable=W0212,R0904
 
 from hamcrest import is_
+from hamcrest import none
 from hamcrest import is_not
 from hamcrest import not_none
 from hamcrest import equal_to
@@ -21,12 +22,34 @@ import os
 import json
 import fudge
 
+from zope import component
+from zope import interface
+
+from nti.assessment.interfaces import IQPartSolutionsExternalizer
+
+from nti.assessment.parts import QMultipleChoicePart
+
+from nti.assessment.randomized import get_seed
 from nti.assessment.randomized import randomize
 from nti.assessment.randomized import shuffle_list
+from nti.assessment.randomized import shuffle_multiple_choice_part_solutions
+from nti.assessment.randomized import SOLUTIONS_CACHE_ATTR
+from nti.assessment.randomized import randomized_solutions_cache
+from nti.assessment.randomized import randomization_scope
+from nti.assessment.randomized import DRAW_PLANS_CACHE_ATTR
+from nti.assessment.randomized import questionbank_draw_plan
+from nti.assessment.randomized import questionbank_draw_plans
 from nti.assessment.randomized import questionbank_question_chooser
+from nti.assessment.randomized import questionbank_question_index_chooser
+
+from nti.assessment.randomized.externalization import _solutions_fingerprint
+from nti.assessment.randomized.externalization import _shuffled_external_solutions
 
 from nti.assessment.randomized.interfaces import IQRandomizedPart
 from nti.assessment.randomized.interfaces import IQuestionIndexRange
+from nti.assessment.randomized.interfaces import IPrincipalSeedSelector
+
+from nti.assessment.solution import QMultipleChoiceSolution
 
 from nti.externalization import internalization
 
@@ -127,3 +150,123 @@ class TestRandomized(AssessmentTestCase):
 
         assert_that(questions_1[-1], is_(same_instance(questions_2[-1])))
         assert_that(questions_1[0:-1], is_not(equal_to(questions_2[0:-1])))
+
+    @fudge.patch('nti.assessment.randomized.get_seed')
+    def test_question_bank_draw_plans(self, mock_gs):
+        path = os.path.join(os.path.dirname(__file__), "question_bank_1.json")
+        with open(path, "r") as fp:
+            ext_obj = json.load(fp)
+        internal = internalization.find_factory_for(ext_obj)()
+        internalization.update_from_external_object(internal, ext_obj,
+                                                    require_updater=True)
+        seeds = {'user1@nti.com': 100, 'user2@nti.com': 500}
+        mock_gs.is_callable().calls(lambda user: seeds[user])
+
+        def expected(seed):
+            generator = randomize(context=internal, seed=seed)
+            if not internal.ranges:
+                return sorted(generator.sample(range(0, 20), internal.draw))
+            result = []
+            for r in internal.ranges:
+                result.extend(generator.sample(range(r.start, r.end + 1), r.draw))
+                generator = randomize(context=internal, seed=seed)
+            return sorted(result)
+
+        plan = questionbank_draw_plan(internal, 20, user='user1@nti.com')
+        assert_that(list(plan), is_(expected(100)))
+        assert_that(questionbank_draw_plan(internal, 20, user='user1@nti.com'),
+                    is_(same_instance(plan)))
+        assert_that(questionbank_question_index_chooser(internal, user='user1@nti.com'),
+                    is_(expected(100)))
+
+        internal.draw = 2
+        assert_that(getattr(internal, DRAW_PLANS_CACHE_ATTR, None), is_(none()))
+        internal.ranges = [
+            IQuestionIndexRange([0, 5]),
+            IQuestionIndexRange([6, 10])
+        ]
+        plans = questionbank_draw_plans(internal, sorted(seeds))
+        assert_that(plans, is_([expected(100), expected(500)]))
+
+        # everything is drawn
+        internal.draw = 20
+        internal.ranges = None
+        assert_that(questionbank_draw_plan(internal, 20, user='user1@nti.com'),
+                    is_(none()))
+        assert_that(questionbank_draw_plans(internal, ['user1@nti.com']),
+                    is_([list(range(20))]))
+
+    @fudge.patch('nti.assessment.randomized.externalization.get_seed')
+    def test_cached_external_solutions(self, mock_gs):
+        mock_gs.is_callable().with_args().returns(100)
+        part = QMultipleChoicePart(solutions=(QMultipleChoiceSolution(1),),
+                                   choices=[u'A', u'B', u'C', u'D', u'E'])
+        part.randomized = True
+
+        externalizer = IQPartSolutionsExternalizer(part)
+        ext_solutions = externalizer.to_external_object()
+        key = (100, 'choices', False, _solutions_fingerprint(part, 'choices'))
+        cached = randomized_solutions_cache(part).get(key)
+        assert_that(cached, is_(ext_solutions))
+        assert_that(cached, is_not(same_instance(ext_solutions)))
+
+        again = externalizer.to_external_object()
+        assert_that(again, is_(ext_solutions))
+        assert_that(again, is_not(same_instance(ext_solutions)))
+
+        # modifying the part drops the cache
+        part.choices = [u'A', u'B', u'C']
+        assert_that(getattr(part, SOLUTIONS_CACHE_ATTR, None), is_(none()))
+
+    @fudge.patch('nti.assessment.randomized.externalization.get_seed')
+    def test_cached_external_solutions_changed_in_place(self, mock_gs):
+        mock_gs.is_callable().with_args().returns(100)
+        solution = QMultipleChoiceSolution(1)
+        part = QMultipleChoicePart(solutions=(solution,),
+                                   choices=[u'A', u'B', u'C', u'D', u'E'])
+        part.randomized = True
+
+        externalizer = IQPartSolutionsExternalizer(part)
+        ext_solutions = externalizer.to_external_object()
+        solution.value = 2
+        changed = externalizer.to_external_object()
+        assert_that(changed, is_not(ext_solutions))
+        part.solutions = (QMultipleChoiceSolution(2),)
+        assert_that(externalizer.to_external_object(), is_(changed))
+
+        # as are the choices
+        part.choices.append(u'F')
+        assert_that(externalizer.to_external_object(),
+                    is_(_shuffled_external_solutions(part, 'choices',
+                                                     shuffle_multiple_choice_part_solutions,
+                                                     100)))
+
+    def test_randomization_scope(self):
+        selected = []
+
+        @interface.implementer(IPrincipalSeedSelector)
+        class _Selector(object):
+
+            def __call__(self, principal):
+                selected.append(principal)
+                return 42
+
+        selector = _Selector()
+        gsm = component.getGlobalSiteManager()
+        gsm.registerUtility(selector, IPrincipalSeedSelector)
+        try:
+            with randomization_scope() as scope:
+                assert_that(get_seed('ichigo@nti.com'), is_(42))
+                assert_that(get_seed('ichigo@nti.com'), is_(42))
+                with randomization_scope() as nested:
+                    assert_that(nested, is_(same_instance(scope)))
+                    assert_that(get_seed('ichigo@nti.com'), is_(42))
+                assert_that(get_seed('aizen@nti.com'), is_(42))
+            assert_that(selected, is_(['ichigo@nti.com', 'aizen@nti.com']))
+
+            # outside of a scope every call selects
+            get_seed('ichigo@nti.com')
+            get_seed('ichigo@nti.com')
+            assert_that(selected, has_length(4))
+        finally:
+            gsm.unregisterUtility(selector, IPrincipalSeedSelector)
@@ -36,15 +36,28 @@ class QuestionRandomizedPartsProxy(SpecificationDecoratorBase):
     def __init__(self, base):
         ProxyBase.__init__(self, base)
 
+    @non_overridable
+    def _part_proxies(self):
+        # The part proxies are built once for each sequence of parts
+        # of the wrapped question and kept in our own dictionary; they
+        # are rebuilt if any of the parts was replaced.
+        wrapped = getProxiedObject(self)
+        parts = tuple(wrapped.parts or ())
+        cached = self.__dict__.get('_v_part_proxies')
+        if     cached is None \
+            or len(cached[0]) != len(parts) \
+            or any(x is not y for x, y in zip(cached[0], parts)):
+            cached = (parts, tuple(RandomizedPartProxy(x) for x in parts))
+            self.__dict__['_v_part_proxies'] = cached
+        return cached[1]
+
     @non_overridable
     @property
     def parts(self):
-        wrapped = getProxiedObject(self)
-        return [RandomizedPartProxy(x) for x in wrapped.parts]
+        return list(self._part_proxies())
 
     def __getitem__(self, index):
-        wrapped = getProxiedObject(self)
-        return RandomizedPartProxy(wrapped.parts[index])
+        return self._part_proxies()[index]
 
 
 @NoPickle
@@ -8,10 +8,18 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
 
+import random
+import numbers
+
+from collections import OrderedDict
+
+from persistent import Persistent
+
 from persistent.list import PersistentList
 
 from persistent.mapping import PersistentMapping
 
+from ZODB.POSException import ConflictError
 from ZODB.POSException import ConnectionStateError
 
 from zope import component
@@ -25,6 +33,8 @@ from zope.interface.common.sequence import IFiniteSequence
 
 from zope.location.interfaces import ISublocations
 
+from nti.assessment._ntiid_index import get_by_ntiid
+
 from nti.assessment._util import make_sublocations as _make_sublocations
 
 from nti.assessment.common import get_containerId
@@ -289,6 +299,91 @@ class QSurveySubmission(ContainedMixin,
 # Aggregation
 
 
+class ConflictResolvingCounter(Persistent):
+    """
+    A mapping from keys to counts. Concurrent changes to the counts are
+    merged when committing instead of raising a conflict error, so
+    aggregating responses in parallel transactions does not serialize
+    on the counter.
+    """
+
+    def __init__(self):
+        Persistent.__init__(self)
+        self._counts = {}
+
+    def get(self, key, default=None):
+        return self._counts.get(key, default)
+
+    def __getitem__(self, key):
+        return self._counts[key]
+
+    def __setitem__(self, key, value):
+        self._counts[key] = value
+        self._p_changed = True
+
+    def __delitem__(self, key):
+        del self._counts[key]
+        self._p_changed = True
+
+    def __contains__(self, key):
+        return key in self._counts
+
+    def __iter__(self):
+        return iter(self._counts)
+
+    def __len__(self):
+        return len(self._counts)
+
+    def keys(self):
+        return self._counts.keys()
+
+    def values(self):
+        return self._counts.values()
+
+    def items(self):
+        return self._counts.items()
+
+    def _p_resolveConflict(self, oldState, savedState, newState):
+        old = oldState.get('_counts', {})
+        new = newState.get('_counts', {})
+        result = dict(savedState.get('_counts', {}))
+        for key in set(old).union(new):
+            delta = new.get(key, 0) - old.get(key, 0)
+            if delta:
+                count = result.get(key, 0) + delta
+                if count:
+                    result[key] = count
+                else:
+                    result.pop(key, None)
+        state = dict(newState)
+        state['_counts'] = result
+        return state
+
+
+_marker = object()
+
+
+def _check_removable(results, counts):
+    for key, count in counts.items():
+        if (results.get(key) or 0) < count:
+            raise ValueError("Response %r was not aggregated" % (key,))
+
+
+def _decrement(results, key, count=1):
+    current = (results.get(key) or 0) - count
+    if current > 0:
+        results[key] = current
+    elif key in results:
+        del results[key]
+
+
+def _response_counts(responses):
+    result = {}
+    for response in responses:
+        result[response] = result.get(response, 0) + 1
+    return result
+
+
 @WithRepr
 @interface.implementer(IQAggregatedPart)
 class QAggregatedPart(ContainedMixin,
@@ -308,12 +403,101 @@ class QAggregatedPart(ContainedMixin,
         PersistentCreatedModDateTrackingObject.__init__(self)
         self.reset()
 
+    def _p_resolveConflict(self, oldState, savedState, newState):
+        # Concurrent appends only change our total (and our results,
+        # which resolve their own conflicts when they can): add the
+        # totals and keep the latest modification time.
+        result = dict(newState)
+        for key in set(oldState).union(savedState, newState):
+            old = oldState.get(key, _marker)
+            saved = savedState.get(key, _marker)
+            new = newState.get(key, _marker)
+            if key == 'total':
+                result[key] = (saved if saved is not _marker else 0) \
+                            + (new if new is not _marker else 0) \
+                            - (old if old is not _marker else 0)
+            elif key == 'lastModified' and saved is not _marker and new is not _marker:
+                result[key] = max(saved, new)
+            elif saved == new or saved == old:
+                pass
+            elif new == old:
+                if saved is _marker:
+                    result.pop(key, None)
+                else:
+                    result[key] = saved
+            else:
+                raise ConflictError("Conflicting changes to %s" % key)
+        return result
+
+    #: The factory of the plain results accumulated by :meth:`_accumulate`
+    _plain_results_factory = dict
+
     def reset(self):
         raise NotImplementedError()
 
-    def append(self, response):
+    @classmethod
+    def _accumulate(cls, results, response):
+        """
+        Add the given response to the results, either our persistent
+        results or plain ones.
+        """
+        raise NotImplementedError()
+
+    def _merge(self, results, total):
+        """
+        Add the given results, accumulated from ``total`` responses.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def _check_unaccumulate(cls, results, response):
+        """
+        Raise a :class:`ValueError` if the given response cannot be
+        removed from the results.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def _unaccumulate(cls, results, response):
+        """
+        Remove the given response, checked by :meth:`_check_unaccumulate`,
+        from the results.
+        """
+        raise NotImplementedError()
+
+    def _unmerge(self, results, total):
+        """
+        Remove the given results, accumulated from ``total`` responses.
+        """
         raise NotImplementedError()
 
+    def _check_total(self, total):
+        if total > self.total:
+            raise ValueError("Cannot remove %s of %s responses" % (total, self.total))
+
+    def _check_remove(self, response=None):
+        """
+        Raise a :class:`ValueError` if the given response cannot be
+        removed, changing nothing.
+        """
+        self._check_total(1)
+        self._check_unaccumulate(self.results, response)
+
+    def append(self, response=None):
+        self.total += 1
+        self._accumulate(self.results, response)
+
+    def remove(self, response=None):
+        """
+        Remove a response previously appended.
+
+        :raises ValueError: If the response was not aggregated, in which
+                case nothing is removed.
+        """
+        self._check_remove(response)
+        self._unaccumulate(self.results, response)
+        self.total -= 1
+
 
 @interface.implementer(IQAggregatedMultipleChoicePart)
 class QAggregatedMultipleChoicePart(QAggregatedPart):
@@ -329,20 +513,45 @@ class QAggregatedMultipleChoicePart(QAggregatedPart):
 
     def reset(self):
         self.total = 0
-        self.results = PersistentMapping()
+        self.results = ConflictResolvingCounter()
 
-    def append(self, response=None):
-        self.total += 1
+    @classmethod
+    def _accumulate(cls, results, response):
         if response is not None:
-            current = self.results.get(response) or 0
-            self.results[response] = current + 1
+            current = results.get(response) or 0
+            results[response] = current + 1
 
-    def __iadd__(self, other):
-        assert IQAggregatedMultipleChoicePart.providedBy(other)
-        for k, v in other.results.items():
+    def _merge(self, results, total):
+        for k, v in results.items():
             current = v + (self.results.get(k) or 0)
             self.results[k] = current
-        self.total += other.total
+        self.total += total
+
+    @classmethod
+    def _check_unaccumulate(cls, results, response):
+        if response is not None:
+            _check_removable(results, {response: 1})
+
+    @classmethod
+    def _unaccumulate(cls, results, response):
+        if response is not None:
+            _decrement(results, response)
+
+    def _unmerge(self, results, total):
+        self._check_total(total)
+        _check_removable(self.results, results)
+        for k, v in results.items():
+            _decrement(self.results, k, v)
+        self.total -= total
+
+    def __iadd__(self, other):
+        assert IQAggregatedMultipleChoicePart.providedBy(other)
+        self._merge(other.results, other.total)
+        return self
+
+    def __isub__(self, other):
+        assert IQAggregatedMultipleChoicePart.providedBy(other)
+        self._unmerge(other.results, other.total)
         return self
 
 
@@ -358,18 +567,85 @@ class QAggregatedMultipleChoiceMultipleAnswerPart(QAggregatedMultipleChoicePart)
     def Results(self, nv):
         pass
 
-    def append(self, responses=()):  # pylint: disable=arguments-differ
-        self.total += 1
+    @classmethod
+    def _accumulate(cls, results, responses):  # pylint: disable=arguments-differ
         for response in responses or ():
-            current = self.results.get(response) or 0
-            self.results[response] = current + 1
+            current = results.get(response) or 0
+            results[response] = current + 1
+
+    @classmethod
+    def _check_unaccumulate(cls, results, responses):  # pylint: disable=arguments-differ
+        _check_removable(results, _response_counts(responses or ()))
+
+    @classmethod
+    def _unaccumulate(cls, results, responses):  # pylint: disable=arguments-differ
+        for response, count in _response_counts(responses or ()).items():
+            _decrement(results, response, count)
+
+    def append(self, responses=()):  # pylint: disable=arguments-differ
+        super(QAggregatedMultipleChoiceMultipleAnswerPart, self).append(responses)
+
+    def remove(self, responses=()):  # pylint: disable=arguments-differ
+        super(QAggregatedMultipleChoiceMultipleAnswerPart, self).remove(responses)
 QMultipleChoiceMultipleAnswerAggregatedPart = QAggregatedMultipleChoiceMultipleAnswerPart  # BWC
 
 
+def _check_sketch_size(size):
+    if size is None:
+        return
+    if isinstance(size, bool) or not isinstance(size, numbers.Integral) or size < 1:
+        raise ValueError("Sketch size must be a positive integer, not %r" % (size,))
+
+
+def _sketch_floor(counts, size):
+    # the most that a response missing from a full sketch can have had
+    if len(counts) < size:
+        return 0
+    return min(counts.values())
+
+
+def _merge_sketches(counts, errors, floor,
+                    other_counts, other_errors, other_floor, size):
+    """
+    Merge two Space-Saving sketches (or exact counts, with no errors
+    and a zero floor) into the ``size`` most frequent responses,
+    returning their counts and errors.
+    """
+    merged = {}
+    for key in set(counts).union(other_counts):
+        count = counts.get(key, floor) + other_counts.get(key, other_floor)
+        error = errors.get(key, floor) + other_errors.get(key, other_floor)
+        merged[key] = (count, error)
+    kept = sorted(merged.items(), key=lambda x: x[1][0], reverse=True)[:size]
+    return (dict((k, v[0]) for k, v in kept),
+            dict((k, v[1]) for k, v in kept))
+
+
 @interface.implementer(IQAggregatedFreeResponsePart)
 class QAggregatedFreeResponsePart(QAggregatedPart):
+    """
+    Counts every distinct response or, if it has a ``sketch_size``,
+    keeps approximate counts of at most that many responses with the
+    Space-Saving algorithm. The count of a response in a sketch
+    overestimates its actual count by at most its error. Responses
+    cannot be removed from a sketch.
+    """
     createDirectFieldProperties(IQAggregatedFreeResponsePart)
 
+    #: If set, the number of responses counted
+    sketch_size = None
+
+    #: The overestimation of the count of each response in a sketch
+    errors = None
+
+    def __init__(self, *args, **kwargs):
+        sketch_size = kwargs.pop('sketch_size', None)
+        _check_sketch_size(sketch_size)
+        super(QAggregatedFreeResponsePart, self).__init__(*args, **kwargs)
+        if sketch_size is not None:
+            self.sketch_size = sketch_size
+            self.reset()
+
     @property
     def Results(self):
         return dict(self.results)
@@ -380,27 +656,174 @@ class QAggregatedFreeResponsePart(QAggregatedPart):
 
     def reset(self):
         self.total = 0
-        self.results = PersistentMapping()
+        if self.sketch_size is None:
+            self.results = ConflictResolvingCounter()
+        else:
+            # the counts of a sketch depend on each other, so concurrent
+            # changes to them must conflict
+            self.results = PersistentMapping()
+            self.errors = PersistentMapping()
+
+    def top(self, n=10):
+        """
+        Return the ``n`` most frequent responses, as (response, count,
+        error) tuples in decreasing order of count.
+        """
+        errors = self.errors or {}
+        items = sorted(self.results.items(), key=lambda x: x[1], reverse=True)
+        return [(k, v, errors.get(k, 0)) for k, v in items[:n]]
+
+    @classmethod
+    def _accumulate(cls, results, response):
+        if response is not None:
+            current = results.get(response) or 0
+            results[response] = current + 1
+
+    def _count(self, response):
+        if response in self.results or len(self.results) < self.sketch_size:
+            self._accumulate(self.results, response)
+            return
+        # replace the least frequent response
+        evicted = min(self.results.items(), key=lambda x: x[1])[0]
+        floor = self.results[evicted]
+        del self.results[evicted]
+        self.errors.pop(evicted, None)
+        self.results[response] = floor + 1
+        self.errors[response] = floor
+
+    def _replace(self, counts, errors):
+        for k in list(self.results):
+            del self.results[k]
+        for k, v in counts.items():
+            self.results[k] = v
+        self.errors.clear()
+        self.errors.update(dict((k, v) for k, v in errors.items() if v))
+
+    def _merge(self, results, total, errors=None, floor=0):
+        self.total += total
+        if self.sketch_size is None:
+            for k, v in results.items():
+                current = v + (self.results.get(k) or 0)
+                self.results[k] = current
+            return
+        self._replace(*_merge_sketches(self.results, self.errors,
+                                       _sketch_floor(self.results, self.sketch_size),
+                                       results, errors or {}, floor,
+                                       self.sketch_size))
+
+    @classmethod
+    def _check_unaccumulate(cls, results, response):
+        if response is not None:
+            _check_removable(results, {response: 1})
+
+    @classmethod
+    def _unaccumulate(cls, results, response):
+        if response is not None:
+            _decrement(results, response)
+
+    def _check_unsketched(self, responses):
+        if self.sketch_size is not None and responses:
+            raise ValueError("Cannot remove responses from a sketch")
+
+    def _unmerge(self, results, total):
+        self._check_unsketched(results)
+        self._check_total(total)
+        _check_removable(self.results, results)
+        for k, v in results.items():
+            _decrement(self.results, k, v)
+        self.total -= total
 
     def append(self, response=None):
-        self.total += 1
+        if self.sketch_size is None:
+            super(QAggregatedFreeResponsePart, self).append(response)
+        else:
+            self.total += 1
+            if response is not None:
+                self._count(response)
+
+    def _check_remove(self, response=None):
         if response is not None:
-            current = self.results.get(response) or 0
-            self.results[response] = current + 1
+            self._check_unsketched((response,))
+        super(QAggregatedFreeResponsePart, self)._check_remove(response)
+
+    def _check_exact(self, other):
+        if self.sketch_size is None and getattr(other, 'sketch_size', None) is not None:
+            raise ValueError("Cannot combine a sketch with exact counts")
 
     def __iadd__(self, other):
         assert IQAggregatedFreeResponsePart.providedBy(other)
-        for k, v in other.results.items():
-            current = v + (self.results.get(k) or 0)
-            self.results[k] = current
-        self.total += other.total
+        self._check_exact(other)
+        size = getattr(other, 'sketch_size', None)
+        if size is None:
+            self._merge(other.results, other.total)
+        else:
+            self._merge(other.results, other.total, other.errors,
+                        _sketch_floor(other.results, size))
+        return self
+
+    def __isub__(self, other):
+        assert IQAggregatedFreeResponsePart.providedBy(other)
+        self._check_exact(other)
+        self._unmerge(other.results, other.total)
         return self
 
 
+def _merge_samples(first, first_seen, second, second_seen, size):
+    """
+    Return a uniform sample of at most ``size`` of the union of the
+    populations of ``first_seen`` and ``second_seen`` items of which
+    ``first`` and ``second`` are uniform samples.
+
+    :raises ValueError: If a sample has fewer than ``size`` items of a
+            larger population, as it cannot provide every draw.
+    """
+    for sample, seen in ((first, first_seen), (second, second_seen)):
+        if len(sample) < min(size, seen):
+            raise ValueError("Cannot merge a sample of %s of %s responses into %s" %
+                             (len(sample), seen, size))
+    first = list(first)
+    second = list(second)
+    result = []
+    while len(result) < size and first_seen + second_seen:
+        # draw from each population in proportion to what remains of it
+        if random.randrange(first_seen + second_seen) < first_seen:
+            source = first
+            first_seen -= 1
+        else:
+            source = second
+            second_seen -= 1
+        result.append(source.pop(random.randrange(len(source))))
+    return result
+
+
+def _response_key(response):
+    # modeled content is a list of parts
+    if isinstance(response, (list, tuple)):
+        return tuple(_response_key(x) for x in response)
+    return response
+
+
 @interface.implementer(IQAggregatedModeledContentPart)
 class QAggregatedModeledContentPart(QAggregatedPart):
+    """
+    Keeps all the (non-null) responses or, if it has a
+    ``reservoir_size``, a uniform sample of at most that many of them.
+    Responses cannot be removed from a sample.
+    """
     createDirectFieldProperties(IQAggregatedModeledContentPart)
 
+    #: If set, the size of the sample of the responses kept
+    reservoir_size = None
+
+    #: The number of (non-null) responses sampled
+    seen = 0
+
+    def __init__(self, *args, **kwargs):
+        reservoir_size = kwargs.pop('reservoir_size', None)
+        super(QAggregatedModeledContentPart, self).__init__(*args, **kwargs)
+        if reservoir_size is not None:
+            self.reservoir_size = reservoir_size
+
     @property
     def Results(self):
         return list(self.results)
@@ -409,19 +832,175 @@ class QAggregatedModeledContentPart(QAggregatedPart):
     def Results(self, nv):
         pass
 
+    _plain_results_factory = list
+
+    #: A map from the key of each response to its positions in our
+    #: results, see :meth:`_positions`
+    _v_positions = None
+
     def reset(self):
         self.total = 0
+        self.seen = 0
         self.results = PersistentList()
+        self._v_positions = None
+
+    def _population(self):
+        return self.seen if self.reservoir_size is not None else len(self.results)
+
+    def _positions(self):
+        """
+        Return a map from the key of each response to its positions in
+        our results, or None if a response is unhashable. The map is
+        built the first time it is needed after we are loaded and then
+        kept up to date, so that removing a response does not scan our
+        results.
+        """
+        if self._v_positions is None:
+            positions = {}
+            try:
+                for idx, response in enumerate(self.results):
+                    positions.setdefault(_response_key(response), set()).add(idx)
+            except TypeError:  # unhashable content
+                return None
+            self._v_positions = positions
+        return self._v_positions
+
+    def _index_from(self, start):
+        positions = self._v_positions
+        if positions is not None:
+            try:
+                for idx in range(start, len(self.results)):
+                    key = _response_key(self.results[idx])
+                    positions.setdefault(key, set()).add(idx)
+            except TypeError:  # unhashable content
+                self._v_positions = None
+
+    def _check_take(self, responses):
+        """
+        Raise a :class:`ValueError` if one of the given responses is
+        missing from our results.
+        """
+        positions = self._positions()
+        if positions is None:
+            remaining = list(self.results)
+            for response in responses:
+                if response not in remaining:
+                    raise ValueError("Response %r was not aggregated" % (response,))
+                remaining.remove(response)
+            return
+        try:
+            counts = _response_counts(_response_key(x) for x in responses)
+        except TypeError:  # unhashable content, which we do not hold
+            raise ValueError("Response was not aggregated")
+        for key, count in counts.items():
+            if len(positions.get(key, ())) < count:
+                raise ValueError("Response %r was not aggregated" % (key,))
+
+    def _take(self, responses):
+        """
+        Remove the given responses, checked by :meth:`_check_take`, from
+        our results, moving the last results in their places.
+        """
+        positions = self._positions()
+        if positions is None:
+            remaining = list(self.results)
+            for response in responses:
+                remaining.remove(response)
+            self.results[:] = remaining
+            return
+        for response in responses:
+            key = _response_key(response)
+            idx = positions[key].pop()
+            if not positions[key]:
+                del positions[key]
+            last = len(self.results) - 1
+            if idx != last:
+                moved = positions[_response_key(self.results[last])]
+                moved.discard(last)
+                moved.add(idx)
+                self.results[idx] = self.results[last]
+            self.results.pop()
+
+    @classmethod
+    def _accumulate(cls, results, response):
+        if response is not None:
+            results.append(response)
+
+    def _sample(self, response):
+        # Algorithm R
+        self.seen += 1
+        if len(self.results) < self.reservoir_size:
+            self.results.append(response)
+        else:
+            idx = random.randrange(self.seen)
+            if idx < self.reservoir_size:
+                self.results[idx] = response
+
+    def _merge(self, results, total, seen=None):
+        seen = len(results) if seen is None else seen
+        if self.reservoir_size is None:
+            if seen != len(results):
+                raise ValueError("Cannot merge a sample into all the responses")
+            start = len(self.results)
+            self.results.extend(results)
+            self._index_from(start)
+        else:
+            self.results[:] = _merge_samples(self.results, self.seen,
+                                             results, seen,
+                                             self.reservoir_size)
+            self.seen += seen
+        self.total += total
+
+    def _check_unsampled(self, responses):
+        if self.reservoir_size is not None and responses:
+            raise ValueError("Cannot remove responses from a sample")
+
+    def _unmerge(self, results, total):
+        self._check_unsampled(results)
+        self._check_total(total)
+        self._check_take(results)
+        self._take(results)
+        self.total -= total
 
     def append(self, response=None):
-        self.total += 1
+        if self.reservoir_size is None:
+            super(QAggregatedModeledContentPart, self).append(response)
+            if response is not None:
+                self._index_from(len(self.results) - 1)
+        else:
+            self.total += 1
+            if response is not None:
+                self._sample(response)
+
+    def _check_remove(self, response=None):
         if response is not None:
-            self.results.append(response)
+            self._check_unsampled((response,))
+        self._check_total(1)
+        if response is not None:
+            self._check_take((response,))
+
+    def remove(self, response=None):
+        """
+        Remove a response previously appended, moving the last response
+        in its place.
+
+        :raises ValueError: If the response was not aggregated or if we
+                keep a sample, in which case nothing is removed.
+        """
+        self._check_remove(response)
+        if response is not None:
+            self._take((response,))
+        self.total -= 1
 
     def __iadd__(self, other):
         assert IQAggregatedModeledContentPart.providedBy(other)
-        self.results.extend(other.results)
-        self.total += other.total
+        seen = other._population() if hasattr(other, '_population') else None
+        self._merge(other.results, other.total, seen)
+        return self
+
+    def __isub__(self, other):
+        assert IQAggregatedModeledContentPart.providedBy(other)
+        self._unmerge(other.results, other.total)
         return self
 
 
@@ -429,7 +1008,7 @@ class QAggregatedConnectingPart(QAggregatedPart):
 
     @property
     def Results(self):
-        return dict(self.results)
+        return dict((k, dict(v)) for k, v in self.results.items())
 
     @Results.setter
     def Results(self, nv):
@@ -442,25 +1021,62 @@ class QAggregatedConnectingPart(QAggregatedPart):
     def _entry(self, k):
         m = self.results.get(k)
         if m is None:
-            self.results[k] = m = PersistentMapping()
+            self.results[k] = m = ConflictResolvingCounter()
         return m
 
-    def append(self, responses=None):  # pylint: disable=arguments-differ
-        self.total += 1
+    @classmethod
+    def _accumulate(cls, results, responses):  # pylint: disable=arguments-differ
         if responses is not None:
+            # our persistent results hold persistent entries
+            factory = ConflictResolvingCounter if isinstance(results, PersistentMapping) else dict
             for k, v in responses.items():
-                m = self._entry(k)
+                m = results.get(k)
+                if m is None:
+                    results[k] = m = factory()
                 current = m.get(v) or 0
                 m[v] = current + 1
 
-    def __iadd__(self, other):
-        assert IQAggregatedConnectingPart.providedBy(other)
-        for k, m in other.results.items():
+    def _merge(self, results, total):
+        for k, m in results.items():
             entry = self._entry(k)
             for v, count in m.items():
                 current = count + (entry.get(v) or 0)
                 entry[v] = current
-        self.total += other.total
+        self.total += total
+
+    @classmethod
+    def _check_unaccumulate(cls, results, responses):  # pylint: disable=arguments-differ
+        for k, v in (responses or {}).items():
+            _check_removable(results.get(k) or {}, {v: 1})
+
+    @classmethod
+    def _unaccumulate(cls, results, responses):  # pylint: disable=arguments-differ
+        for k, v in (responses or {}).items():
+            _decrement(results[k], v)
+
+    def _unmerge(self, results, total):
+        self._check_total(total)
+        for k, m in results.items():
+            _check_removable(self.results.get(k) or {}, m)
+        for k, m in results.items():
+            for v, count in m.items():
+                _decrement(self.results[k], v, count)
+        self.total -= total
+
+    def append(self, responses=None):  # pylint: disable=arguments-differ
+        super(QAggregatedConnectingPart, self).append(responses)
+
+    def remove(self, responses=None):  # pylint: disable=arguments-differ
+        super(QAggregatedConnectingPart, self).remove(responses)
+
+    def __iadd__(self, other):
+        assert IQAggregatedConnectingPart.providedBy(other)
+        self._merge(other.results, other.total)
+        return self
+
+    def __isub__(self, other):
+        assert IQAggregatedConnectingPart.providedBy(other)
+        self._unmerge(other.results, other.total)
         return self
 
 
@@ -507,10 +1123,53 @@ class QAggregatedPoll(ContainedMixin,
 
     def __iadd__(self, other):
         assert IQAggregatedPoll.providedBy(other) and self.pollId == other.pollId
-        for idx, part in enumerate(other.parts):
-            self.parts[idx] += part
+        # merge into each part in place; writing it back to our list
+        # would conflict with concurrent merges
+        for idx, other_part in enumerate(other.parts):
+            part = self.parts[idx]
+            part += other_part
         return self
 
+    def __isub__(self, other):
+        assert IQAggregatedPoll.providedBy(other) and self.pollId == other.pollId
+        for idx, other_part in enumerate(other.parts):
+            part = self.parts[idx]
+            part -= other_part
+        return self
+
+    def _responses(self, submission, registry):
+        assert self.pollId == submission.pollId
+        poll = get_by_ntiid(IQPoll, submission.pollId, registry)
+        return [normalized for _, normalized in _normalized_responses(poll, submission)]
+
+    def _check_remove(self, responses):
+        for part, response in zip(self.parts, responses):
+            part._check_remove(response)
+
+    def _remove(self, responses):
+        for part, response in zip(self.parts, responses):
+            part.remove(response)
+
+    def add(self, submission, registry=component):
+        """
+        Aggregate the given :class:`.IQPollSubmission`, without creating
+        an aggregated poll for it.
+        """
+        for part, response in zip(self.parts, self._responses(submission, registry)):
+            part.append(response)
+
+    def remove(self, submission, registry=component):
+        """
+        Remove the given, previously aggregated, :class:`.IQPollSubmission`.
+
+        :raises ValueError: If one of its responses was not aggregated,
+                in which case nothing is removed.
+        """
+        responses = self._responses(submission, registry)
+        # check every part first, so that nothing is removed if one fails
+        self._check_remove(responses)
+        self._remove(responses)
+
 
 @interface.implementer(IQAggregatedSurvey, ISublocations)
 class QAggregatedSurvey(ContainedMixin,
@@ -540,44 +1199,113 @@ class QAggregatedSurvey(ContainedMixin,
                 this_poll += agg_poll
         return self
 
+    def __isub__(self, other):
+        assert IQAggregatedSurvey.providedBy(other) and self.surveyId == other.surveyId
+        for agg_poll in other.questions:
+            this_poll = self.get(agg_poll.pollId)
+            if this_poll is not None:
+                this_poll -= agg_poll
+        return self
+
+    def _poll_ntiids(self, registry):
+        survey = get_by_ntiid(IQSurvey, self.surveyId, registry)
+        return {q.ntiid for q in survey.questions}
+
+    def add(self, submission, registry=component):
+        """
+        Aggregate the given :class:`.IQSurveySubmission`, without
+        creating an aggregated survey for it.
+        """
+        assert self.surveyId == submission.surveyId
+        for sub_poll in submission.questions:
+            this_poll = self.get(sub_poll.pollId)
+            if this_poll is not None:
+                this_poll.add(sub_poll, registry)
+            elif sub_poll.pollId in self._poll_ntiids(registry):
+                self.append(aggregate_poll_submission(sub_poll, registry))
+            else:  # pragma: no cover
+                logger.warning("Bad input, poll (%s) not in survey (%s)",
+                               sub_poll.pollId, self.surveyId)
+
+    def remove(self, submission, registry=component):
+        """
+        Remove the given, previously aggregated, :class:`.IQSurveySubmission`.
+
+        :raises ValueError: If one of its responses was not aggregated,
+                in which case nothing is removed.
+        """
+        assert self.surveyId == submission.surveyId
+        removals = []
+        for sub_poll in submission.questions:
+            this_poll = self.get(sub_poll.pollId)
+            if this_poll is not None:
+                responses = this_poll._responses(sub_poll, registry)
+                # check every poll first, so that nothing is removed if one fails
+                this_poll._check_remove(responses)
+                removals.append((this_poll, responses))
+        for this_poll, responses in removals:
+            this_poll._remove(responses)
+
 
 def aggregated_part_factory(part):
     return IQAggregatedPartFactory(part)
 
 
-def aggregate_poll_submission(submission, registry=component):
-    """
-    aggregte the given poll submission.
+def _part_sizes(factory, reservoir_size=None, sketch_size=None):
+    # the arguments bounding the parts created by the given factory
+    result = {}
+    if reservoir_size is not None and hasattr(factory, 'reservoir_size'):
+        result['reservoir_size'] = reservoir_size
+    if sketch_size is not None and hasattr(factory, 'sketch_size'):
+        result['sketch_size'] = sketch_size
+    return result
 
-    :return: An :class:`.interfaces.IQAggregatedPoll`.
-    :param submission: An :class:`.interfaces.IQPollSubmission`.
-            The ``parts`` of this submission must be the same length
-            as the parts of the poll being submitted.
-    :param registry: If given, an :class:`.IComponents`. If
-            not given, the current component registry will be used.
-            Used to look up the poll by id.
-    :raises LookupError: If no poll can be found for the submission.
-    :raises Invalid: If a submitted part has the wrong kind of input
-    """
 
-    pollId = submission.pollId
-    poll = registry.getUtility(IQPoll, name=pollId)
+def _normalized_responses(poll, submission):
     if len(poll.parts) != len(submission.parts):
         raise ValueError("Poll (%s) and submission (%s) have different numbers of parts." %
                          (len(poll.parts), len(submission.parts)))
 
-    aggregated_parts = PersistentList()
     for sub_part, q_part in zip(submission.parts, poll.parts):
         # pylint: disable=unused-variable
         __traceback_info__ = sub_part, q_part
         if sub_part is None:  # null responses
             logger.debug("Null response for part (%s) in poll (%s)",
-                         q_part, pollId)
+                         q_part, submission.pollId)
         response = IQResponse(sub_part) if sub_part is not None else None
         normalized = response
         if response is not None:
             normalized = normalize_response(q_part, response)
-        aggregated_part = aggregated_part_factory(q_part)()
+        yield q_part, normalized
+
+
+def aggregate_poll_submission(submission, registry=component,
+                              reservoir_size=None, sketch_size=None):
+    """
+    aggregte the given poll submission.
+
+    :return: An :class:`.interfaces.IQAggregatedPoll`.
+    :param submission: An :class:`.interfaces.IQPollSubmission`.
+            The ``parts`` of this submission must be the same length
+            as the parts of the poll being submitted.
+    :param registry: If given, an :class:`.IComponents`. If
+            not given, the current component registry will be used.
+            Used to look up the poll by id.
+    :param reservoir_size: If given, the aggregated modeled content
+            parts keep a sample of at most that many responses.
+    :param sketch_size: If given, the aggregated free response parts
+            count at most that many responses.
+    :raises LookupError: If no poll can be found for the submission.
+    :raises Invalid: If a submitted part has the wrong kind of input
+    :raises ValueError: If ``sketch_size`` is not a positive integer.
+    """
+    _check_sketch_size(sketch_size)
+    pollId = submission.pollId
+    poll = get_by_ntiid(IQPoll, pollId, registry)
+    aggregated_parts = PersistentList()
+    for q_part, normalized in _normalized_responses(poll, submission):
+        factory = aggregated_part_factory(q_part)
+        aggregated_part = factory(**_part_sizes(factory, reservoir_size, sketch_size))
         aggregated_part.append(normalized)
         aggregated_parts.append(aggregated_part)
 
@@ -585,7 +1313,8 @@ def aggregate_poll_submission(submission, registry=component):
     return aggregated
 
 
-def aggregate_survey_submission(submission, registry=component):
+def aggregate_survey_submission(submission, registry=component,
+                                reservoir_size=None, sketch_size=None):
     """
     Assess the given survey submission.
 
@@ -594,17 +1323,22 @@ def aggregate_survey_submission(submission, registry=component):
     :param registry: If given, an :class:`.IComponents`. If
             not given, the current component registry will be used.
             Used to look up the survey and pools by id.
+    :param reservoir_size: See :func:`aggregate_poll_submission`.
+    :param sketch_size: See :func:`aggregate_poll_submission`.
     :raises LookupError: If no poll/survey can be found for the submission.
+    :raises ValueError: If ``sketch_size`` is not a positive integer.
     """
+    _check_sketch_size(sketch_size)
     surveyId = submission.surveyId
-    survey = registry.getUtility(IQSurvey, name=surveyId)
+    survey = get_by_ntiid(IQSurvey, surveyId, registry)
     poll_ntiids = {q.ntiid for q in survey.questions}
 
     assessed = PersistentList()
     for sub_poll in submission.questions:
-        poll = registry.getUtility(IQPoll, name=sub_poll.pollId)
+        poll = get_by_ntiid(IQPoll, sub_poll.pollId, registry)
         if poll.ntiid in poll_ntiids or poll in survey.questions:
-            sub_aggregated = IQAggregatedPoll(sub_poll)
+            sub_aggregated = aggregate_poll_submission(sub_poll, registry,
+                                                       reservoir_size, sketch_size)
             assessed.append(sub_aggregated)
         else:  # pragma: no cover
             logger.warning("Bad input, poll (%s) not in survey (%s) (known: %s)",
@@ -612,3 +1346,178 @@ def aggregate_survey_submission(submission, registry=component):
 
     result = QAggregatedSurvey(surveyId=surveyId, questions=assessed)
     return result
+
+
+def update_aggregated_inquiry(aggregated, old_submission=None,
+                              new_submission=None, registry=component):
+    """
+    Update the given aggregated poll or survey for a submission that was
+    changed from ``old_submission`` to ``new_submission``; either may be
+    ``None`` when a submission is made or withdrawn.
+
+    :return: The updated aggregate.
+    :raises LookupError: If no poll can be found for the submissions.
+    :raises ValueError: If the responses of ``old_submission`` cannot be
+            removed, because they were not aggregated or are kept in
+            samples or sketches.
+    """
+    if old_submission is not None:
+        aggregated.remove(old_submission, registry)
+    if new_submission is not None:
+        aggregated.add(new_submission, registry)
+    return aggregated
+
+
+class _PartAccumulator(object):
+
+    __slots__ = ('factory', 'total', 'results')
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.total = 0
+        self.results = factory._plain_results_factory()
+
+    def append(self, response):
+        self.total += 1
+        self.factory._accumulate(self.results, response)
+
+    def materialize(self):
+        # pylint: disable=protected-access
+        result = self.factory()
+        result._merge(self.results, self.total)
+        return result
+
+
+class _BoundedPartAccumulator(object):
+
+    __slots__ = ('factory', 'sizes', 'part')
+
+    def __init__(self, factory, sizes):
+        # bounded parts aggregate in such a part, staying bounded
+        self.factory = factory
+        self.sizes = sizes
+        self.part = factory(**sizes)
+
+    def append(self, response):
+        self.part.append(response)
+
+    def materialize(self):
+        result = self.factory(**self.sizes)
+        result += self.part
+        return result
+
+
+def _part_accumulator(factory, reservoir_size=None, sketch_size=None):
+    sizes = _part_sizes(factory, reservoir_size, sketch_size)
+    if sizes:
+        return _BoundedPartAccumulator(factory, sizes)
+    return _PartAccumulator(factory)
+
+
+class _PollAccumulator(object):
+
+    __slots__ = ('poll', 'parts')
+
+    def __init__(self, poll, reservoir_size=None, sketch_size=None):
+        self.poll = poll
+        self.parts = [_part_accumulator(aggregated_part_factory(x),
+                                        reservoir_size, sketch_size)
+                      for x in poll.parts]
+
+    def append(self, submission):
+        responses = _normalized_responses(self.poll, submission)
+        for accumulator, (_, normalized) in zip(self.parts, responses):
+            accumulator.append(normalized)
+
+    def materialize(self, pollId):
+        parts = PersistentList(x.materialize() for x in self.parts)
+        return QAggregatedPoll(pollId=pollId, parts=parts)
+
+
+class SurveyAggregator(object):
+    """
+    Aggregates a stream of poll and survey submissions in plain counters,
+    creating the persistent :class:`QAggregatedPoll` and
+    :class:`QAggregatedSurvey` objects only when asked for them, e.g. to
+    add them to the stored aggregates.
+
+    The aggregated parts must be created by the factories of this module.
+    If given a ``reservoir_size``, the aggregated modeled content parts
+    keep a sample of at most that many responses, and if given a
+    ``sketch_size``, which must be a positive integer, the aggregated
+    free response parts count at most that many responses.
+    """
+
+    def __init__(self, registry=component, reservoir_size=None, sketch_size=None):
+        _check_sketch_size(sketch_size)
+        self.registry = registry
+        self.reservoir_size = reservoir_size
+        self.sketch_size = sketch_size
+        self.reset()
+
+    def reset(self):
+        self._polls = OrderedDict()
+        self._surveys = OrderedDict()
+
+    def _poll_accumulator(self, polls, pollId):
+        result = polls.get(pollId)
+        if result is None:
+            poll = get_by_ntiid(IQPoll, pollId, self.registry)
+            result = polls[pollId] = _PollAccumulator(poll, self.reservoir_size,
+                                                      self.sketch_size)
+        return result
+
+    def _survey_polls(self, surveyId):
+        result = self._surveys.get(surveyId)
+        if result is None:
+            survey = get_by_ntiid(IQSurvey, surveyId, self.registry)
+            poll_ntiids = {q.ntiid for q in survey.questions}
+            result = self._surveys[surveyId] = (survey, poll_ntiids, OrderedDict())
+        return result
+
+    def add(self, submission):
+        """
+        Aggregate the given :class:`.IQPollSubmission` or
+        :class:`.IQSurveySubmission`.
+
+        :raises LookupError: If no poll/survey can be found for the submission.
+        """
+        if IQSurveySubmission.providedBy(submission):
+            survey, poll_ntiids, polls = self._survey_polls(submission.surveyId)
+            for sub_poll in submission.questions:
+                if sub_poll.pollId in poll_ntiids:
+                    self._poll_accumulator(polls, sub_poll.pollId).append(sub_poll)
+                else:  # pragma: no cover
+                    logger.warning("Bad input, poll (%s) not in survey (%s) (known: %s)",
+                                   sub_poll.pollId, survey, survey.questions)
+        else:
+            self._poll_accumulator(self._polls, submission.pollId).append(submission)
+
+    def extend(self, submissions):
+        for submission in submissions:
+            self.add(submission)
+
+    def materialize(self):
+        """
+        Return the aggregates of the submissions added so far: a
+        :class:`QAggregatedSurvey` for each survey followed by a
+        :class:`QAggregatedPoll` for each poll submitted on its own.
+        """
+        result = []
+        for surveyId, (_, _, polls) in self._surveys.items():
+            questions = PersistentList(accumulator.materialize(pollId)
+                                       for pollId, accumulator in polls.items())
+            result.append(QAggregatedSurvey(surveyId=surveyId,
+                                            questions=questions))
+        for pollId, accumulator in self._polls.items():
+            result.append(accumulator.materialize(pollId))
+        return result
+
+    def flush(self):
+        """
+        Return the aggregates of the submissions added so far, like
+        :meth:`materialize`, and start over.
+        """
+        result = self.materialize()
+        self.reset()
+        return result
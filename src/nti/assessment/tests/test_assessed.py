@@ -18,6 +18,8 @@ from hamcrest import assert_that
 from hamcrest import has_entries
 from hamcrest import greater_than
 from hamcrest import has_property
+from hamcrest import same_instance
+from hamcrest import has_properties
 
 import fudge
 
@@ -29,6 +31,10 @@ from zope import interface
 from nti.assessment.assessed import QAssessedPart
 from nti.assessment.assessed import QAssessedQuestion
 from nti.assessment.assessed import QAssessedQuestionSet
+from nti.assessment.assessed import QCompactAssessedQuestion
+from nti.assessment.assessed import compact_assessed_question
+from nti.assessment.assessed import iter_assessed_submissions
+from nti.assessment.assessed import regrade_assessed_question_set
 
 from nti.assessment.common import has_submitted_file
 
@@ -57,6 +63,7 @@ from nti.assessment.solution import QFreeResponseSolution
 from nti.assessment.solution import QMultipleChoiceSolution
 
 from nti.assessment.submission import QuestionSubmission
+from nti.assessment.submission import AssignmentSubmission
 from nti.assessment.submission import QuestionSetSubmission
 
 from nti.base.interfaces import DEFAULT_CONTENT_TYPE
@@ -281,6 +288,49 @@ class TestAssessedQuestion(AssessmentTestCase):
                                                         assessedValue=None))))
 
 
+class TestCompactAssessedQuestion(AssessmentTestCase):
+
+    def test_externalizes(self):
+        assert_that(QCompactAssessedQuestion(),
+                    verifiably_provides(IQAssessedQuestion))
+        assert_that(QCompactAssessedQuestion(),
+                    externalizes(has_entries('Class', 'AssessedQuestion',
+                                             'MimeType', QAssessedQuestion.mimeType)))
+        assert_that(find_factory_for(toExternalObject(QCompactAssessedQuestion())),
+                    is_(none()))
+
+    def test_compact(self):
+        part = QFreeResponsePart(solutions=(QFreeResponseSolution(value=u'correct'),))
+        question = QQuestion(parts=(part, part))
+        component.provideUtility(question, provides=IQuestion,
+                                 name="1")
+
+        sub = QuestionSubmission(questionId=u"1", parts=(u'correct', u'wrong'))
+        assessed = IQAssessedQuestion(sub)
+        result = compact_assessed_question(assessed)
+        assert_that(result, has_property('questionId', "1"))
+        assert_that(result, has_property('createdTime', assessed.createdTime))
+        assert_that(result.parts, has_length(2))
+        assert_that(result.parts, is_(same_instance(result.parts)))
+        assert_that(result.parts[0], verifiably_provides(IQAssessedPart))
+        assert_that(result.parts,
+                    contains(has_properties('submittedResponse', u'correct',
+                                            'assessedValue', 1.0,
+                                            '__parent__', same_instance(result)),
+                             has_properties('submittedResponse', u'wrong',
+                                            'assessedValue', 0.0)))
+        assert_that(result.parts[1],
+                    externalizes(has_entries('Class', 'AssessedPart',
+                                             'submittedResponse', u'wrong')))
+
+        # writes go to the question
+        result.parts[1].assessedValue = 1.0
+        assert_that(result._values, is_((1.0, 1.0)))
+
+        ext_obj = toExternalObject(result)
+        assert_that(ext_obj, has_entry('parts', has_length(2)))
+
+
 class TestAssessedQuestionSet(AssessmentTestCase):
 
     def test_externalizes(self):
@@ -338,6 +388,147 @@ class TestAssessedQuestionSet(AssessmentTestCase):
                 assert_that(parents, has_length(greater_than(2)))
                 assert_that(parents[-1], is_(result))
 
+    def test_regrade(self):
+        part1 = QFreeResponsePart(solutions=(QFreeResponseSolution(value=u'correct'),))
+        part2 = QFreeResponsePart(solutions=(QFreeResponseSolution(value=u'correct'),))
+        part1.ntiid = u'tag:nextthought.com,2011-10:NTI-NAQPart-temp.naq.q.0'
+        part2.ntiid = u'tag:nextthought.com,2011-10:NTI-NAQPart-temp.naq.q.1'
+        question = QQuestion(parts=(part1, part2))
+        question.ntiid = u'tag:nextthought.com,2011-10:NTI-NAQ-temp.naq.q'
+        question_set = QQuestionSet(questions=(question,))
+
+        component.provideUtility(question,
+                                 provides=IQuestion,
+                                 name=question.ntiid)
+        component.provideUtility(question_set,
+                                 provides=IQuestionSet,
+                                 name="2")
+
+        sub = QuestionSubmission(questionId=question.ntiid,
+                                 parts=(u'other', u'other'))
+        set_sub = QuestionSetSubmission(questionSetId=u"2", questions=(sub,))
+        result = IQAssessedQuestionSet(set_sub)
+        apart1, apart2 = result.questions[0].parts
+
+        # both solutions change, only the second part is regraded
+        part1.solutions = part2.solutions = (QFreeResponseSolution(value=u'other'),)
+        changes = regrade_assessed_question_set(result, part2.ntiid)
+        assert_that(changes, has_length(1))
+        assert_that(changes[0], has_properties('questionId', question.ntiid,
+                                               'index', 1,
+                                               'part', same_instance(apart2),
+                                               'oldValue', 0.0,
+                                               'newValue', 1.0))
+        assert_that(result.questions[0].parts,
+                    contains(same_instance(apart1), same_instance(apart2)))
+        assert_that(apart1, has_property('assessedValue', 0.0))
+        assert_that(apart2, has_property('assessedValue', 1.0))
+
+        # nothing else changes
+        assert_that(regrade_assessed_question_set(result, part2.ntiid,
+                                                  question_set=question_set),
+                    has_length(0))
+        assert_that(regrade_assessed_question_set(result, u'other'),
+                    has_length(0))
+
+        # the whole question
+        changes = regrade_assessed_question_set(result, question.ntiid)
+        assert_that(changes, has_length(1))
+        assert_that(changes[0], has_property('index', 0))
+        assert_that(apart1, has_property('assessedValue', 1.0))
+
+    def test_regrade_solution(self):
+        solution = QFreeResponseSolution(value=u'correct')
+        part1 = QFreeResponsePart(solutions=(solution,))
+        part2 = QFreeResponsePart(solutions=(QFreeResponseSolution(value=u'correct'),))
+        question = QQuestion(parts=(part1, part2))
+        question.ntiid = u'tag:nextthought.com,2011-10:NTI-NAQ-temp.naq.q.solution'
+        question_set = QQuestionSet(questions=(question,))
+
+        component.provideUtility(question,
+                                 provides=IQuestion,
+                                 name=question.ntiid)
+        component.provideUtility(question_set,
+                                 provides=IQuestionSet,
+                                 name="3")
+
+        sub = QuestionSubmission(questionId=question.ntiid,
+                                 parts=(u'other', u'other'))
+        set_sub = QuestionSetSubmission(questionSetId=u"3", questions=(sub,))
+        result = IQAssessedQuestionSet(set_sub)
+        apart1, apart2 = result.questions[0].parts
+
+        # only the value of the first solution changes, in place
+        solution.value = u'other'
+        changes = regrade_assessed_question_set(result, solution)
+        assert_that(changes, has_length(1))
+        assert_that(changes[0], has_properties('questionId', question.ntiid,
+                                               'index', 0,
+                                               'part', same_instance(apart1),
+                                               'oldValue', 0.0,
+                                               'newValue', 1.0))
+        assert_that(apart1, has_property('assessedValue', 1.0))
+        assert_that(apart2, has_property('assessedValue', 0.0))
+
+        # a solution that no part holds changes nothing
+        assert_that(regrade_assessed_question_set(result,
+                                                  QFreeResponseSolution(value=u'none')),
+                    has_length(0))
+
+        # the second solution is replaced by one of equal value
+        part2.solutions = (QFreeResponseSolution(value=u'other'),)
+        changes = regrade_assessed_question_set(result,
+                                                QFreeResponseSolution(value=u'other'))
+        assert_that(changes, has_length(1))
+        assert_that(changes[0], has_property('index', 1))
+        assert_that(apart2, has_property('assessedValue', 1.0))
+
+    def test_iter_assessed_submissions(self):
+        part = QFreeResponsePart(solutions=(QFreeResponseSolution(value=u'correct'),))
+        question = QQuestion(parts=(part,))
+        question_set = QQuestionSet(questions=(question,))
+
+        component.provideUtility(question,
+                                 provides=IQuestion,
+                                 name="1")
+        component.provideUtility(question_set,
+                                 provides=IQuestionSet,
+                                 name="2")
+
+        def set_sub(value, ntiid=u"2"):
+            sub = QuestionSubmission(questionId=u"1", parts=(value,))
+            return QuestionSetSubmission(questionSetId=ntiid, questions=(sub,))
+
+        submissions = [set_sub(u'correct'),
+                       set_sub(u'wrong'),
+                       set_sub(u'correct', ntiid=u"missing"),
+                       AssignmentSubmission(assignmentId=u'asg',
+                                            parts=(set_sub(u'correct'),))]
+        calls = []
+        results = iter_assessed_submissions(submissions, chunk_size=3,
+                                            progress=lambda *args: calls.append(args))
+        first = next(results)
+        # assessed lazily, one chunk at a time
+        assert_that(calls, is_([(3, 1)]))
+        assert_that(first, has_property('submission', submissions[0]))
+        assert_that(first, has_property('error', none()))
+        assert_that(first.assessed.questions[0].parts[0],
+                    has_property('assessedValue', 1.0))
+
+        results = [first] + list(results)
+        assert_that(calls, is_([(3, 1), (4, 1)]))
+        assert_that(results, has_length(4))
+        assert_that(results[1].assessed.questions[0].parts[0],
+                    has_property('assessedValue', 0.0))
+        assert_that(results[2], has_property('assessed', none()))
+        assert_that(results[2].error, is_(LookupError))
+        assert_that(results[3].assessed, has_length(1))
+        assert_that(results[3].assessed[0],
+                    verifiably_provides(IQAssessedQuestionSet))
+
+        with self.assertRaises(LookupError):
+            list(iter_assessed_submissions(submissions, errors=()))
+
     def test_assess_not_same_instance_question_but_id_matches(self):
         part = QFreeResponsePart(solutions=(QFreeResponseSolution(value=u'correct'),))
         question = QQuestion(parts=(part,))
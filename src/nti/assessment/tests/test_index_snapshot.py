@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# disable: accessing protected members, too many methods
+# pylint: disable=W0212,R0904
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import is_not
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import same_instance
+
+import os
+import shutil
+import tempfile
+
+import simplejson
+
+from zope.interface.registry import Components
+
+from nti.assessment.interfaces import IQuestion
+from nti.assessment.interfaces import IQAssignment
+from nti.assessment.interfaces import IQuestionSet
+
+from nti.assessment._index_snapshot import register_index
+from nti.assessment._index_snapshot import load_index_snapshot
+from nti.assessment._index_snapshot import compile_index_snapshot
+
+from nti.assessment._question_index import QuestionIndex
+
+from nti.assessment.tests import AssessmentTestCase
+
+from nti.assessment.tests.test_question_index import _assignment_index
+
+
+class _CountingQuestionIndex(QuestionIndex):
+
+    internalized = 0
+
+    def _internalize_assessment(self, ntiid, ext_obj):
+        self.internalized += 1
+        return super(_CountingQuestionIndex, self)._internalize_assessment(ntiid, ext_obj)
+
+
+class TestIndexSnapshot(AssessmentTestCase):
+
+    def setUp(self):
+        super(TestIndexSnapshot, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'assessment_index.snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, True)
+        super(TestIndexSnapshot, self).tearDown()
+
+    def test_compile_and_register(self):
+        text = simplejson.dumps(_assignment_index())
+        ntiids = compile_index_snapshot(text, self.path)
+        assert_that(ntiids, has_length(3))
+
+        items = load_index_snapshot(self.path, text)
+        assert_that(items, has_length(3))
+
+        registry = Components()
+        registered = register_index(text, self.path, registry=registry)
+        assert_that(registered, has_length(3))
+
+        asg = registry.queryUtility(IQAssignment, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.asg.assignment')
+        qset = registry.queryUtility(IQuestionSet, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.set.set')
+        q = registry.queryUtility(IQuestion, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion')
+        assert_that(q, is_not(none()))
+        assert_that(asg.parts[0].question_set, is_(same_instance(qset)))
+        assert_that(qset.questions[0], is_(same_instance(q)))
+
+    def test_fallback(self):
+        text = simplejson.dumps(_assignment_index())
+        # no snapshot: loaded from JSON and compiled, internalizing
+        # each item once
+        question_index = _CountingQuestionIndex()
+        registered = register_index(text, self.path, registry=Components(),
+                                    question_index=question_index)
+        assert_that(registered, has_length(3))
+        assert_that(question_index.internalized, is_(3))
+        assert_that(load_index_snapshot(self.path, text), has_length(3))
+
+        # stale
+        changed = text.replace('Main Title', 'Other Title')
+        assert_that(load_index_snapshot(self.path, changed), is_(none()))
+        registry = Components()
+        assert_that(register_index(changed, self.path, registry=registry),
+                    has_length(3))
+        asg = registry.queryUtility(IQAssignment, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.asg.assignment')
+        assert_that(asg.title, is_('Other Title'))
+        assert_that(load_index_snapshot(self.path, changed), has_length(3))
+
+        # corrupt
+        with open(self.path, 'wb') as fp:
+            fp.write(b'garbage')
+        assert_that(load_index_snapshot(self.path, text), is_(none()))
+        assert_that(register_index(text, self.path, registry=Components(),
+                                   compile_snapshot=False),
+                    has_length(3))
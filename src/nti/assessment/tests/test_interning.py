@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# disable: accessing protected members, too many methods
+# pylint: disable=W0212,R0904
+
+from hamcrest import is_
+from hamcrest import is_not
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import instance_of
+from hamcrest import same_instance
+from hamcrest import greater_than
+from hamcrest import has_properties
+
+import simplejson
+
+from nti.contentfragments.interfaces import PlainTextContentFragment
+from nti.contentfragments.interfaces import SanitizedHTMLContentFragment
+
+from nti.assessment._interning import InterningPool
+
+from nti.assessment._question_index import _load_question_map_json
+
+from nti.assessment.tests import AssessmentTestCase
+
+
+class TestInterning(AssessmentTestCase):
+
+    def test_pool(self):
+        pool = InterningPool(maxsize=2)
+        a = pool.intern(u'a', PlainTextContentFragment)
+        assert_that(a, instance_of(PlainTextContentFragment))
+        assert_that(pool.intern(u'a', PlainTextContentFragment),
+                    is_(same_instance(a)))
+        # keyed by factory
+        assert_that(pool.intern(u'a'), is_not(instance_of(PlainTextContentFragment)))
+
+        pool.intern(u'b')
+        assert_that(pool, has_length(2))
+        assert_that(pool.stats(),
+                    has_properties('hits', 1,
+                                   'misses', 3,
+                                   'evictions', 1,
+                                   'maxsize', 2))
+        assert_that(pool.stats().saved_bytes, is_(greater_than(0)))
+
+        # the least recently used was evicted
+        assert_that(pool.intern(u'a', PlainTextContentFragment),
+                    is_not(same_instance(a)))
+
+        pool.clear()
+        assert_that(pool, has_length(0))
+        assert_that(pool.stats(), has_properties('hits', 0, 'held_bytes', 0))
+
+    def test_load_scope(self):
+        text = simplejson.dumps({'a': u'<b>text</b>',
+                                 'b': [u'<b>text</b>', u'plain'],
+                                 'NTIID': u'plain'})
+        pool = InterningPool(maxsize=None)
+        index = _load_question_map_json(text, pool=pool)
+        assert_that(index['a'], instance_of(SanitizedHTMLContentFragment))
+        assert_that(index['b'][0], is_(same_instance(index['a'])))
+        assert_that(index['b'][1], instance_of(PlainTextContentFragment))
+        assert_that(index['NTIID'], is_not(instance_of(PlainTextContentFragment)))
+        assert_that(pool, has_length(3))
+        assert_that(pool.stats().hits, is_(1))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# disable: accessing protected members, too many methods
+# pylint: disable=W0212,R0904
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import same_instance
+
+from zope.interface.registry import Components
+
+from nti.assessment._ntiid_index import get_by_ntiid
+from nti.assessment._ntiid_index import query_by_ntiid
+from nti.assessment._ntiid_index import ntiid_index_for
+from nti.assessment._ntiid_index import enable_ntiid_index
+from nti.assessment._ntiid_index import disable_ntiid_index
+
+from nti.assessment._question_index import QuestionIndex
+
+from nti.assessment.interfaces import IQuestion
+from nti.assessment.interfaces import IQAssessment
+
+from nti.assessment.question import QQuestion
+
+from nti.assessment.tests import AssessmentTestCase
+
+from nti.assessment.tests.test_question_index import _assignment_index
+
+QUESTION_NTIID = u'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion'
+
+
+class TestNTIIDIndex(AssessmentTestCase):
+
+    def test_index(self):
+        registry = Components()
+        assert_that(ntiid_index_for(registry), is_(none()))
+        enable_ntiid_index(registry)
+        try:
+            index = QuestionIndex()
+            result = index._sync_root_index(_assignment_index(), registry=registry)
+
+            ntiid_index = ntiid_index_for(registry)
+            assert_that(ntiid_index, has_length(0))
+
+            question = query_by_ntiid(IQuestion, QUESTION_NTIID, registry)
+            assert_that(question,
+                        is_(same_instance(registry.getUtility(IQuestion, name=QUESTION_NTIID))))
+            assert_that(ntiid_index, has_length(1))
+            assert_that(query_by_ntiid(IQuestion, QUESTION_NTIID, registry),
+                        is_(same_instance(question)))
+
+            # lookups by a base interface are found in the registry
+            # and indexed too
+            assert_that(query_by_ntiid(IQAssessment, QUESTION_NTIID, registry),
+                        is_(same_instance(question)))
+            assert_that(ntiid_index, has_length(2))
+
+            # registrations made elsewhere are found in the registry
+            other = QQuestion(content=u'other')
+            registry.registerUtility(other, IQuestion, name=u'other')
+            assert_that(get_by_ntiid(IQuestion, u'other', registry),
+                        is_(same_instance(other)))
+            with self.assertRaises(LookupError):
+                get_by_ntiid(IQuestion, u'missing', registry)
+            assert_that(query_by_ntiid(IQuestion, u'missing', registry, default=1),
+                        is_(1))
+
+            # as are unregistrations
+            registry.unregisterUtility(other, IQuestion, name=u'other')
+            assert_that(query_by_ntiid(IQuestion, u'other', registry),
+                        is_(none()))
+
+            # and unregistrations by the question index
+            the_map = _assignment_index()
+            section = the_map['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.0']['Items'] \
+                ['tag:nextthought.com,2011-10:testing-HTML-temp.chapter_one']['Items'] \
+                ['tag:nextthought.com,2011-10:testing-HTML-temp.section_one']
+            section['AssessmentItems'] = {}
+            index._sync_root_index(the_map, registry=registry,
+                                   fingerprints=result.fingerprints)
+            assert_that(query_by_ntiid(IQuestion, QUESTION_NTIID, registry),
+                        is_(none()))
+            assert_that(ntiid_index, has_length(0))
+
+            # changes to the bases of the registry are seen
+            base = Components()
+            registry.__bases__ = (base,)
+            assert_that(query_by_ntiid(IQuestion, u'base', registry), is_(none()))
+            base.registerUtility(other, IQuestion, name=u'base')
+            assert_that(query_by_ntiid(IQuestion, u'base', registry),
+                        is_(same_instance(other)))
+            base.unregisterUtility(other, IQuestion, name=u'base')
+            assert_that(query_by_ntiid(IQuestion, u'base', registry), is_(none()))
+        finally:
+            disable_ntiid_index(registry)
+        assert_that(ntiid_index_for(registry), is_(none()))
+        assert_that(query_by_ntiid(IQuestion, QUESTION_NTIID, registry),
+                    is_(none()))
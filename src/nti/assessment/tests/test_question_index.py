@@ -7,22 +7,111 @@ __docformat__ = "restructuredtext en"
 # disable: accessing protected members, too many methods
 # pylint: disable=W0212,R0904
 
+import time
+import simplejson
+
+from io import BytesIO
+
 from hamcrest import is_
 from hamcrest import none
 from hamcrest import is_not
+from hamcrest import raises
+from hamcrest import calling
+from hamcrest import has_key
+from hamcrest import less_than
+from hamcrest import has_length
+from hamcrest import has_entries
 from hamcrest import assert_that
+from hamcrest import instance_of
 from hamcrest import same_instance
+from hamcrest import greater_than_or_equal_to
+
+from zope import component
+from zope import interface
 
 from zope.interface.registry import Components
 
+from zope.proxy import getProxiedObject
+
 from nti.assessment.interfaces import IQuestion
 from nti.assessment.interfaces import IQAssignment
 from nti.assessment.interfaces import IQuestionSet
+from nti.assessment.interfaces import IQuestionIndexLoadListener
+
+from nti.assessment._load_stats import phase
+from nti.assessment._load_stats import index_load
 
 from nti.assessment._question_index import QuestionIndex
+from nti.assessment._question_index import AssessmentProxy
+from nti.assessment._question_index import _AssessmentStub
+from nti.assessment._question_index import RegistrationBatch
+from nti.assessment._question_index import _LazyAssessmentProxy
+from nti.assessment._question_index import _load_question_map_json
+from nti.assessment._question_index import _iter_question_map_items
+
+from nti.assessment.question import QQuestion
+from nti.assessment.question import QQuestionSet
 
 from nti.assessment.tests import AssessmentTestCase
 
+
+def _assignment_index():
+	question = {'Class': 'Question',
+				'MimeType': 'application/vnd.nextthought.naquestion',
+				'NTIID': 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion',
+				'content': '<a name="testquestion"></a> Arbitrary content goes here.',
+				'parts': [{'Class': 'FilePart',
+						   'MimeType': 'application/vnd.nextthought.assessment.filepart',
+						   'allowed_extensions': [],
+						   'allowed_mime_types': ['application/pdf'],
+						   'content': 'Arbitrary content goes here.',
+						   'explanation': u'',
+						   'hints': [],
+						   'max_file_size': None,
+						   'solutions': []}]}
+
+
+	the_map = {'Items':
+	 {'tag:nextthought.com,2011-10:testing-HTML-temp.0':
+	  {'AssessmentItems': {},
+	   'Items': {'tag:nextthought.com,2011-10:testing-HTML-temp.chapter_one':
+				 {'AssessmentItems': {},
+				  'Items': {'tag:nextthought.com,2011-10:testing-HTML-temp.section_one':
+							{'AssessmentItems': {'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.asg.assignment':
+												 {'Class': 'Assignment',
+												  'MimeType': 'application/vnd.nextthought.assessment.assignment',
+												  'NTIID': 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.asg.assignment',
+												  'available_for_submission_beginning': '2014-01-13T00:00:00',
+												  'available_for_submission_ending': None,
+												  'content': 'Assignment content.',
+												  'parts': [{'Class': 'AssignmentPart',
+															 'MimeType': 'application/vnd.nextthought.assessment.assignmentpart',
+															 'auto_grade': True,
+															 'content': 'Some content.',
+															 'question_set': {'Class': 'QuestionSet',
+																			  'MimeType': 'application/vnd.nextthought.naquestionset',
+																			  'NTIID': 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.set.set',
+																			  'questions': [question]},
+															 'title': 'Part Title'}],
+												  'title': 'Main Title'},
+												 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.set.set': {'Class': 'QuestionSet',
+																											  'MimeType': 'application/vnd.nextthought.naquestionset',
+																											  'NTIID': 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.set.set',
+																											  'questions': [question]},
+												 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion': question},
+							 'NTIID': 'tag:nextthought.com,2011-10:testing-HTML-temp.section_one',
+							 'filename': 'tag_nextthought_com_2011-10_testing-HTML-temp_section_one.html',
+							 'href': 'tag_nextthought_com_2011-10_testing-HTML-temp_section_one.html'}},
+				  'NTIID': 'tag:nextthought.com,2011-10:testing-HTML-temp.chapter_one',
+				  'filename': 'tag_nextthought_com_2011-10_testing-HTML-temp_chapter_one.html',
+				  'href': 'tag_nextthought_com_2011-10_testing-HTML-temp_chapter_one.html'}},
+	   'NTIID': 'tag:nextthought.com,2011-10:testing-HTML-temp.0',
+	   'filename': 'index.html',
+	   'href': 'index.html'}},
+			'href': 'index.html'}
+	return the_map
+
+
 class TestQuestionIndex(AssessmentTestCase):
 
 	def test_create_with_assignment(self):
@@ -97,3 +186,378 @@ class TestQuestionIndex(AssessmentTestCase):
 
 		assert_that( asg.parts[0].question_set, is_( same_instance( qset )))
 		assert_that( qset.questions[0], is_( same_instance(q)) )
+
+	def test_create_from_stream(self):
+		text = simplejson.dumps(_assignment_index())
+		for source in (text, BytesIO(text.encode('utf-8'))):
+			registry = Components()
+			registered = QuestionIndex()._from_root_index_stream(source, registry=registry,
+																 chunk_size=16)
+			assert_that(registered, has_length(3))
+
+			asg = registry.queryUtility(IQAssignment, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.asg.assignment')
+			qset = registry.queryUtility(IQuestionSet, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.set.set')
+			q = registry.queryUtility(IQuestion, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion')
+			assert_that(q, is_not(none()))
+			assert_that(asg.parts[0].question_set, is_(same_instance(qset)))
+			assert_that(qset.questions[0], is_(same_instance(q)))
+
+		items = list(_iter_question_map_items(text, chunk_size=7))
+		assert_that(items, has_length(3))
+		assert_that(list(_iter_question_map_items('')), is_([]))
+
+		# malformed indexes are rejected like by the eager loader
+		def load(the_map):
+			return QuestionIndex()._from_root_index_stream(simplejson.dumps(the_map))
+
+		assert_that(calling(load).with_args({'href': 'index.html'}),
+					raises(AssertionError, "Root must contain 'Items'"))
+
+		the_map = _assignment_index()
+		the_map['Items']['other'] = {'Items': {}}
+		assert_that(calling(load).with_args(the_map),
+					raises(AssertionError, "only have Root NTIID"))
+
+		the_map = _assignment_index()
+		del the_map['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.0']['Items']
+		assert_that(calling(load).with_args(the_map),
+					raises(AssertionError, "actual section Items"))
+
+		the_map = _assignment_index()
+		root = the_map['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.0']
+		del root['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.chapter_one']['filename']
+		assert_that(calling(load).with_args(the_map),
+					raises(AssertionError, "valid filename"))
+
+	def test_sync(self):
+		registry = Components()
+		index = QuestionIndex()
+		result = index._sync_root_index(_assignment_index(), registry=registry)
+		assert_that(result.added, has_length(3))
+		assert_that(result.changed, has_length(0))
+		q_ntiid = 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion'
+		q = registry.queryUtility(IQuestion, name=q_ntiid)
+		assert_that(q, is_not(none()))
+
+		# nothing to do
+		same = index._sync_root_index(_assignment_index(), registry=registry,
+									  fingerprints=result.fingerprints)
+		assert_that(same.added | same.changed | same.removed, has_length(0))
+		assert_that(registry.queryUtility(IQuestion, name=q_ntiid), is_(same_instance(q)))
+
+		# a typo fixed in the question changes everything embedding it
+		text = simplejson.dumps(_assignment_index())
+		text = text.replace('Arbitrary content goes here.', 'Arbitrary content went here.')
+		fixed = simplejson.loads(text)
+		result = index._sync_root_index(fixed, registry=registry,
+										fingerprints=result.fingerprints)
+		assert_that(result.changed, has_length(3))
+		new_q = registry.queryUtility(IQuestion, name=q_ntiid)
+		assert_that(new_q, is_not(same_instance(q)))
+		qset = registry.queryUtility(IQuestionSet, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.set.set')
+		assert_that(qset.questions[0], is_(same_instance(new_q)))
+
+		# removal
+		section = fixed['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.0']['Items'] \
+			['tag:nextthought.com,2011-10:testing-HTML-temp.chapter_one']['Items'] \
+			['tag:nextthought.com,2011-10:testing-HTML-temp.section_one']
+		asg_ntiid = 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.asg.assignment'
+		del section['AssessmentItems'][asg_ntiid]
+		result = index._sync_root_index(fixed, registry=registry,
+										fingerprints=result.fingerprints)
+		assert_that(result.removed, is_({asg_ntiid}))
+		assert_that(registry.queryUtility(IQAssignment, name=asg_ntiid), is_(none()))
+		assert_that(registry.queryUtility(IQuestionSet, name=qset.ntiid), is_(same_instance(qset)))
+
+	def test_sync_keeps_embedded(self):
+		# the question is only embedded, in the set and in the assignment
+		the_map = _assignment_index()
+		section = the_map['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.0']['Items'] \
+			['tag:nextthought.com,2011-10:testing-HTML-temp.chapter_one']['Items'] \
+			['tag:nextthought.com,2011-10:testing-HTML-temp.section_one']
+		q_ntiid = 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion'
+		del section['AssessmentItems'][q_ntiid]
+
+		registry = Components()
+		index = QuestionIndex()
+		result = index._sync_root_index(the_map, registry=registry)
+		assert_that(result.added, has_length(2))
+		q = registry.queryUtility(IQuestion, name=q_ntiid)
+		assert_that(q, is_not(none()))
+
+		# changing, then removing, the assignment keeps what the
+		# unchanged question set embeds
+		asg_ntiid = 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.asg.assignment'
+		section['AssessmentItems'][asg_ntiid]['title'] = 'New Title'
+		result = index._sync_root_index(the_map, registry=registry,
+										fingerprints=result.fingerprints)
+		assert_that(result.changed, is_({asg_ntiid}))
+		assert_that(registry.queryUtility(IQuestion, name=q_ntiid), is_(same_instance(q)))
+
+		del section['AssessmentItems'][asg_ntiid]
+		result = index._sync_root_index(the_map, registry=registry,
+										fingerprints=result.fingerprints)
+		assert_that(result.removed, is_({asg_ntiid}))
+		assert_that(registry.queryUtility(IQuestion, name=q_ntiid), is_(same_instance(q)))
+		qset = registry.queryUtility(IQuestionSet, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.set.set')
+		assert_that(qset.questions[0], is_(same_instance(q)))
+
+	def test_create_with_workers(self):
+		the_map = _assignment_index()
+		root = the_map['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.0']
+		chapter_one = root['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.chapter_one']
+		question = dict(chapter_one['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.section_one']
+						['AssessmentItems']['tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion'])
+		question['NTIID'] = 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion2'
+		root['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.chapter_two'] = \
+			{'AssessmentItems': {question['NTIID']: question},
+			 'Items': {},
+			 'NTIID': 'tag:nextthought.com,2011-10:testing-HTML-temp.chapter_two',
+			 'filename': 'tag_nextthought_com_2011-10_testing-HTML-temp_chapter_two.html',
+			 'href': 'tag_nextthought_com_2011-10_testing-HTML-temp_chapter_two.html'}
+
+		registry = Components()
+		registered = QuestionIndex()._from_root_index(the_map, registry=registry, workers=2)
+		assert_that(registered, has_length(4))
+
+		qset = registry.queryUtility(IQuestionSet, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.set.set')
+		q = registry.queryUtility(IQuestion, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion')
+		assert_that(qset.questions[0], is_(same_instance(q)))
+		q2 = registry.queryUtility(IQuestion, name=question['NTIID'])
+		assert_that(q2, is_not(none()))
+		assert_that(q2, is_not(same_instance(q)))
+
+		# the same as internalizing in this process
+		expected = Components()
+		QuestionIndex()._from_root_index(the_map, registry=expected)
+		assert_that(set(registered), is_({x.name for x in expected.registeredUtilities()}))
+
+	def test_create_lazily(self):
+		registry = Components()
+		registered = QuestionIndex()._from_root_index_lazy(_assignment_index(), registry=registry)
+		assert_that(registered, has_length(3))
+
+		q = registry.queryUtility(IQuestion, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion')
+		assert_that(getProxiedObject(q), instance_of(_AssessmentStub))
+		assert_that(q.ntiid, is_('tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion'))
+		assert_that(getProxiedObject(q), instance_of(_AssessmentStub))
+
+		asg = registry.queryUtility(IQAssignment, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.asg.assignment')
+		qset = registry.queryUtility(IQuestionSet, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.set.set')
+		assert_that(asg.parts[0].question_set, is_(same_instance(qset)))
+		assert_that(qset.questions[0], is_(same_instance(q)))
+		assert_that(q.parts, has_length(1))
+		assert_that(getProxiedObject(q), is_not(instance_of(_AssessmentStub)))
+		assert_that(getattr(q, 'missing', None), is_(none()))
+
+	def test_create_lazily_embedded(self):
+		# the question is only embedded, in the set and in the assignment
+		the_map = _assignment_index()
+		section = the_map['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.0']['Items'] \
+			['tag:nextthought.com,2011-10:testing-HTML-temp.chapter_one']['Items'] \
+			['tag:nextthought.com,2011-10:testing-HTML-temp.section_one']
+		q_ntiid = 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion'
+		del section['AssessmentItems'][q_ntiid]
+
+		registry = Components()
+		registered = QuestionIndex()._from_root_index_lazy(the_map, registry=registry)
+		assert_that(registered, has_length(3))
+
+		q = registry.queryUtility(IQuestion, name=q_ntiid)
+		assert_that(getProxiedObject(q), instance_of(_AssessmentStub))
+
+		qset = registry.queryUtility(IQuestionSet, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.set.set')
+		assert_that(hash(qset), is_(hash(qset.ntiid)))
+		assert_that(getProxiedObject(qset), instance_of(_AssessmentStub))
+		assert_that(qset == qset, is_(True))
+		assert_that(qset != None, is_(True))
+		assert_that(bool(qset), is_(True))
+		assert_that(getProxiedObject(qset), is_not(instance_of(_AssessmentStub)))
+		assert_that(qset == getProxiedObject(qset), is_(True))
+		assert_that(qset, has_length(1))
+		assert_that(qset[0], is_(same_instance(q)))
+		assert_that(list(qset), is_([q]))
+		assert_that(q in qset, is_(True))
+
+	def test_lazy_materialization_error(self):
+		class FailingIndex(QuestionIndex):
+
+			failures = 1
+
+			def _internalize_assessment(self, ntiid, ext_obj):
+				if self.failures:
+					self.failures -= 1
+					raise ValueError(ntiid)
+				return QuestionIndex._internalize_assessment(self, ntiid, ext_obj)
+
+		ntiid = 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion'
+		ext_obj = {'Class': 'Question',
+				   'MimeType': 'application/vnd.nextthought.naquestion',
+				   'NTIID': ntiid,
+				   'content': 'Arbitrary content goes here.',
+				   'parts': []}
+		proxy = _LazyAssessmentProxy(_AssessmentStub(ntiid, ext_obj),
+									 Components(), FailingIndex())
+		assert_that(calling(getattr).with_args(proxy, 'content'),
+					raises(ValueError))
+		# still lazy, so it can be tried again
+		assert_that(getProxiedObject(proxy), instance_of(_AssessmentStub))
+		assert_that(proxy.content, is_('Arbitrary content goes here.'))
+		assert_that(getProxiedObject(proxy), instance_of(QQuestion))
+
+	def test_registration_batch(self):
+		ntiid = 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion'
+		question = QQuestion(content='content')
+		question.ntiid = ntiid
+		other = QQuestion(content='other content')
+		other.ntiid = ntiid
+
+		batch = RegistrationBatch([AssessmentProxy(question)])
+		batch.add_externals([(ntiid, {'NTIID': ntiid, 'content': 'content'})])
+		batch.add(AssessmentProxy(question))
+		assert_that(batch, has_length(1))
+		assert_that(batch.conflicts, has_length(0))
+		assert_that(getProxiedObject(batch.get(ntiid)), is_(same_instance(question)))
+		assert_that(ntiid in batch, is_(True))
+
+		# copies of the same definition are not conflicts, other ones are
+		copy = QQuestion(content='content')
+		copy.ntiid = ntiid
+		batch.add(copy, {'NTIID': ntiid, 'content': 'content'})
+		assert_that(batch.conflicts, has_length(0))
+		batch.add(other, {'NTIID': ntiid, 'content': 'other content'})
+		assert_that(batch, has_length(1))
+		assert_that(batch.conflicts, has_length(1))
+
+		# without external forms, only the kinds of objects are compared
+		question_set = QQuestionSet()
+		question_set.ntiid = ntiid
+		batch.add(other)
+		batch.add(question_set)
+		assert_that(batch, has_length(1))
+		assert_that(batch.conflicts, has_length(2))
+
+		merged = RegistrationBatch()
+		merged.update(batch)
+		merged.add(other, {'NTIID': ntiid, 'content': 'other content'})
+		assert_that(merged.conflicts, has_length(1))
+
+		exploded = QuestionIndex.explode_object_to_register(QQuestionSet(questions=(question,)))
+		assert_that(exploded, has_length(2))
+
+	def test_conflicting_definitions(self):
+		the_map = _assignment_index()
+		section = the_map['Items']['tag:nextthought.com,2011-10:testing-HTML-temp.0']['Items'] \
+			['tag:nextthought.com,2011-10:testing-HTML-temp.chapter_one']['Items'] \
+			['tag:nextthought.com,2011-10:testing-HTML-temp.section_one']
+		items = section['AssessmentItems']
+		q_ntiid = 'tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion'
+		batch = QuestionIndex()._process_assessments(items, None)
+		assert_that(batch, has_length(3))
+		assert_that(batch.conflicts, has_length(0))
+
+		# the question set embeds another definition of the question
+		items[q_ntiid] = dict(items[q_ntiid], content='Other content.')
+		batch = QuestionIndex()._process_assessments(items, None)
+		assert_that(batch, has_length(3))
+		assert_that(batch.conflicts, has_length(1))
+		assert_that(batch.conflicts[0][0], is_(q_ntiid))
+
+	def test_bulk_registration(self):
+		calls = []
+
+		class RecordingComponents(Components):
+
+			def queryUtility(self, *args, **kwargs):
+				calls.append('query')
+				return Components.queryUtility(self, *args, **kwargs)
+
+			def getUtility(self, *args, **kwargs):
+				calls.append('query')
+				return Components.getUtility(self, *args, **kwargs)
+
+			def registerUtility(self, *args, **kwargs):
+				calls.append('register')
+				return Components.registerUtility(self, *args, **kwargs)
+
+		registry = RecordingComponents()
+		QuestionIndex()._from_root_index(_assignment_index(), registry=registry)
+		assert_that(calls.count('register'), is_(3))
+		# every lookup happens before the first registration
+		assert_that(calls[calls.index('register'):], is_(['register'] * 3))
+
+		qset = registry.queryUtility(IQuestionSet, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.set.set')
+		q = registry.queryUtility(IQuestion, name='tag:nextthought.com,2011-10:testing-NAQ-temp.naq.testquestion')
+		assert_that(qset.questions[0], is_(same_instance(q)))
+
+	def test_load_stats(self):
+		loads = []
+
+		@interface.implementer(IQuestionIndexLoadListener)
+		class Listener(object):
+
+			def indexLoaded(self, stats):
+				loads.append(stats)
+
+		listener = Listener()
+		gsm = component.getGlobalSiteManager()
+		gsm.registerUtility(listener, IQuestionIndexLoadListener)
+		try:
+			with index_load('test'):
+				the_map = _load_question_map_json(simplejson.dumps(_assignment_index()))
+				QuestionIndex()._from_root_index(the_map, registry=Components())
+		finally:
+			gsm.unregisterUtility(listener, IQuestionIndexLoadListener)
+
+		assert_that(loads, has_length(1))
+		stats = loads[0]
+		assert_that(stats.name, is_('test'))
+		assert_that(stats.timings, has_entries('parse', greater_than_or_equal_to(0),
+											   'internalize', greater_than_or_equal_to(0),
+											   'explode', greater_than_or_equal_to(0),
+											   'resolve', greater_than_or_equal_to(0),
+											   'canonicalize', greater_than_or_equal_to(0),
+											   'register', greater_than_or_equal_to(0)))
+		assert_that(stats.counts, has_entries('internalized', 3,
+											  'registrations', 3))
+		assert_that(stats.counts, has_key('fragment_hits'))
+		assert_that(stats.total, greater_than_or_equal_to(sum(stats.timings.values())))
+
+	def test_stream_load_stats(self):
+		loads = []
+
+		@interface.implementer(IQuestionIndexLoadListener)
+		class Listener(object):
+
+			def indexLoaded(self, stats):
+				loads.append(stats)
+
+		listener = Listener()
+		gsm = component.getGlobalSiteManager()
+		gsm.registerUtility(listener, IQuestionIndexLoadListener)
+		try:
+			QuestionIndex()._from_root_index_stream(simplejson.dumps(_assignment_index()),
+													registry=Components())
+			# the time of nested phases is only counted once
+			with index_load('nested'):
+				with phase('outer'):
+					with phase('inner'):
+						time.sleep(0.02)
+		finally:
+			gsm.unregisterUtility(listener, IQuestionIndexLoadListener)
+
+		assert_that(loads, has_length(2))
+		stats = loads[0]
+		assert_that(stats.name, is_('from_root_index_stream'))
+		assert_that(stats.timings, has_entries('parse', greater_than_or_equal_to(0),
+											   'internalize', greater_than_or_equal_to(0),
+											   'register', greater_than_or_equal_to(0)))
+		assert_that(stats.counts, has_entries('internalized', 3,
+											  'fragment_hits', greater_than_or_equal_to(0),
+											  'fragment_misses', greater_than_or_equal_to(0)))
+		assert_that(stats.total, greater_than_or_equal_to(sum(stats.timings.values())))
+
+		stats = loads[1]
+		assert_that(stats.timings['inner'], greater_than_or_equal_to(0.02))
+		assert_that(stats.timings['outer'], less_than(0.02))
+		assert_that(stats.total, greater_than_or_equal_to(sum(stats.timings.values())))
@@ -8,8 +8,10 @@ from __future__ import absolute_import
 from hamcrest import is_
 from hamcrest import none
 from hamcrest import is_not
+from hamcrest import has_length
 from hamcrest import assert_that
 from hamcrest import instance_of
+from hamcrest import same_instance
 
 from zope import interface
 
@@ -113,3 +115,91 @@ class TestQuestionSet(AssessmentTestCase):
         check_elements(randomized=True)
         interface.noLongerProvides(question_set, IRandomizedPartsContainer)
         check_elements(randomized=False)
+
+    def test_proxy_reuse(self):
+        part = QMultipleChoicePart(solutions=(QMultipleChoiceSolution(value=1),))
+        question = QQuestion(parts=(part,))
+        question.ntiid = u'tag:nextthought.com,2015-11-30:Test'
+        question_set = QQuestionSet(questions=(question,))
+        interface.alsoProvides(question_set, IRandomizedPartsContainer)
+
+        proxy = question_set.questions[0]
+        assert_that(question_set.questions[0], is_(same_instance(proxy)))
+        assert_that(tuple(question_set.Items)[0],
+                    is_(same_instance(proxy)))
+        assert_that(proxy.parts[0], is_(same_instance(proxy[0])))
+        assert_that(proxy.parts[0], is_(same_instance(proxy.parts[0])))
+
+        # new parts get new proxies
+        part_proxy = proxy[0]
+        part2 = QMultipleChoicePart(solutions=(QMultipleChoiceSolution(value=2),))
+        question.parts = (part2,)
+        assert_that(proxy[0], is_not(same_instance(part_proxy)))
+        assert_that(proxy[0].solutions[0].value, is_(2))
+
+        # as do parts replaced in place
+        question.parts = [part2, part]
+        part_proxy = proxy[1]
+        assert_that(proxy.parts[1], is_(same_instance(part_proxy)))
+        question.parts[1] = part2
+        assert_that(proxy[1], is_not(same_instance(part_proxy)))
+        assert_that(proxy[1].solutions[0].value, is_(2))
+
+        # replacing the questions drops the proxies
+        question2 = QQuestion(parts=(part,))
+        question2.ntiid = question.ntiid
+        question_set.questions = (question2,)
+        found = question_set.questions[0]
+        assert_that(found, is_not(same_instance(proxy)))
+        assert_that(found, instance_of(QuestionRandomizedPartsProxy))
+
+    def test_question_positions(self):
+        questions = []
+        for idx in range(3):
+            question = QQuestion(content=u'content %s' % idx)
+            question.ntiid = u'tag:nextthought.com,2015-11-30:Test%s' % idx
+            questions.append(question)
+        question_set = QQuestionSet(questions=questions[:2])
+        assert_that(question_set._question_positions(),
+                    is_({questions[0].ntiid: 0, questions[1].ntiid: 1}))
+
+        question_set.insert(0, questions[2])
+        assert_that(question_set.get_question_by_ntiid(questions[2].ntiid),
+                    is_(same_instance(questions[2])))
+        assert_that(question_set._question_positions()[questions[0].ntiid],
+                    is_(1))
+
+        question_set.remove(questions[0])
+        assert_that(question_set.get_question_by_ntiid(questions[0].ntiid),
+                    none())
+        question_set.append(questions[0])
+        assert_that(question_set._question_positions()[questions[0].ntiid],
+                    is_(2))
+
+        question_set.questions = questions[1:2]
+        assert_that(question_set._question_positions(),
+                    is_({questions[1].ntiid: 0}))
+
+    def test_question_positions_reordered(self):
+        questions = []
+        for idx in range(3):
+            question = QQuestion(content=u'content %s' % idx)
+            question.ntiid = u'tag:nextthought.com,2015-11-30:Test%s' % idx
+            questions.append(question)
+        question_set = QQuestionSet(questions=questions)
+        assert_that(question_set._question_positions(), has_length(3))
+
+        # reordered in place, e.g. by another connection, with the same length
+        question_set._questions.append(question_set._questions.pop(0))
+        assert_that(question_set.get_question_by_ntiid(questions[0].ntiid),
+                    is_(same_instance(questions[0])))
+        assert_that(question_set.get_question_by_ntiid(questions[1].ntiid),
+                    is_(same_instance(questions[1])))
+        assert_that(question_set._question_positions()[questions[0].ntiid],
+                    is_(2))
+
+        question_set._questions.reverse()
+        assert_that(question_set.remove(questions[2]),
+                    is_(same_instance(questions[2])))
+        assert_that(list(question_set.questions),
+                    is_([questions[0], questions[1]]))
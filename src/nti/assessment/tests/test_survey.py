@@ -11,6 +11,7 @@ from hamcrest import is_
 from hamcrest import none
 from hamcrest import is_not
 from hamcrest import contains
+from hamcrest import close_to
 from hamcrest import has_entry
 from hamcrest import has_length
 from hamcrest import assert_that
@@ -18,6 +19,11 @@ from hamcrest import has_entries
 from hamcrest import instance_of
 from hamcrest import greater_than
 from hamcrest import has_property
+from hamcrest import has_properties
+
+import random
+
+import fudge
 
 from nose.tools import assert_raises
 
@@ -28,6 +34,14 @@ from zope import component
 
 from zope.schema.interfaces import WrongContainedType
 
+import transaction
+
+from ZODB import DB
+from ZODB.DemoStorage import DemoStorage
+
+from persistent.list import PersistentList
+from persistent.mapping import PersistentMapping
+
 from nti.assessment.common import has_submitted_file
 
 from nti.assessment.interfaces import IQPoll
@@ -37,11 +51,13 @@ from nti.assessment.interfaces import IQSurveySubmission
 from nti.assessment.interfaces import IQNonGradableMultipleChoicePart
 
 from nti.assessment.interfaces import IQAggregatedPoll
+from nti.assessment.interfaces import IQAggregatedSurvey
 from nti.assessment.interfaces import IQAggregatedMultipleChoicePart
 from nti.assessment.interfaces import IQAggregatedMultipleChoiceMultipleAnswerPart
 
 from nti.assessment.parts import QNonGradableFreeResponsePart
 from nti.assessment.parts import QNonGradableMultipleChoicePart
+from nti.assessment.parts import QNonGradableModeledContentPart
 
 from nti.assessment.response import QModeledContentResponse
 
@@ -49,6 +65,16 @@ from nti.assessment.survey import QPoll
 from nti.assessment.survey import QSurvey
 from nti.assessment.survey import QPollSubmission
 from nti.assessment.survey import QSurveySubmission
+from nti.assessment.survey import QAggregatedPoll
+from nti.assessment.survey import QAggregatedMatchingPart
+from nti.assessment.survey import QAggregatedFreeResponsePart
+from nti.assessment.survey import QAggregatedModeledContentPart
+from nti.assessment.survey import update_aggregated_inquiry
+from nti.assessment.survey import aggregate_poll_submission
+from nti.assessment.survey import aggregate_survey_submission
+from nti.assessment.survey import ConflictResolvingCounter
+from nti.assessment.survey import SurveyAggregator
+from nti.assessment.survey import QAggregatedSurvey
 from nti.assessment.survey import QAggregatedMultipleChoicePart
 from nti.assessment.survey import QAggregatedMultipleChoiceMultipleAnswerPart
 
@@ -277,3 +303,477 @@ class TestAggregation(AssessmentTestCase):
         aggregated += aggregated_2
         assert_that(aggregated.parts[0],
                     has_property('Results', has_entry(1, 2)))
+
+    def test_survey_aggregator(self):
+        choice = QNonGradableMultipleChoicePart(choices=[u'a', u'b', u'c'],
+                                                content=u'here')
+        poll = QPoll(parts=(choice,))
+        poll.ntiid = u'tag:nextthought.com,2011-10:AOPS-HTML-poll.1'
+        free = QNonGradableFreeResponsePart(content=u'there')
+        other = QPoll(parts=(free,))
+        other.ntiid = u'tag:nextthought.com,2011-10:AOPS-HTML-poll.2'
+        survey = QSurvey(questions=[poll, other])
+        survey.ntiid = u'tag:nextthought.com,2011-10:AOPS-HTML-survey.1'
+        for inquiry, provided in ((poll, IQPoll), (other, IQPoll), (survey, IQSurvey)):
+            component.globalSiteManager.registerUtility(inquiry, provided,
+                                                        name=inquiry.ntiid)
+
+        def submission(choice, text):
+            polls = [QPollSubmission(pollId=poll.ntiid, parts=(choice,)),
+                     QPollSubmission(pollId=other.ntiid, parts=(text,))]
+            return QSurveySubmission(surveyId=survey.ntiid, questions=polls)
+
+        aggregator = SurveyAggregator()
+        aggregator.extend(submission(x % 3, u'text') for x in range(10))
+        aggregator.add(QPollSubmission(pollId=poll.ntiid, parts=(None,)))
+
+        survey_agg, poll_agg = aggregator.flush()
+        assert_that(survey_agg, instance_of(QAggregatedSurvey))
+        assert_that(survey_agg, has_property('surveyId', survey.ntiid))
+        assert_that(survey_agg.questions, has_length(2))
+        assert_that(survey_agg[poll.ntiid].parts[0],
+                    has_properties('Total', 10,
+                                   'Results', is_({0: 4, 1: 3, 2: 3})))
+        assert_that(survey_agg[other.ntiid].parts[0],
+                    has_properties('Total', 10,
+                                   'Results', is_({u'text': 10})))
+        assert_that(poll_agg, instance_of(QAggregatedPoll))
+        assert_that(poll_agg.parts[0],
+                    has_properties('Total', 1, 'Results', is_({})))
+
+        # the same as adding the aggregate of each submission
+        expected = IQAggregatedSurvey(submission(0, u'text'))
+        expected += IQAggregatedSurvey(submission(1, u'text'))
+        aggregator.add(submission(0, u'text'))
+        aggregator.add(submission(1, u'text'))
+        actual, = aggregator.materialize()
+        for idx in range(2):
+            assert_that(actual.questions[idx].parts[0].Results,
+                        is_(expected.questions[idx].parts[0].Results))
+        assert_that(aggregator.materialize(), has_length(1))
+
+    def test_bounded_aggregation(self):
+        choice = QNonGradableMultipleChoicePart(choices=[u'a', u'b'],
+                                                content=u'here')
+        modeled = QNonGradableModeledContentPart(content=u'there')
+        poll = QPoll(parts=(choice, modeled))
+        poll.ntiid = u'tag:nextthought.com,2011-10:AOPS-HTML-poll.4'
+        component.globalSiteManager.registerUtility(poll, IQPoll,
+                                                    name=poll.ntiid)
+
+        def submission(idx):
+            response = QModeledContentResponse(value=[u'r%s' % idx])
+            return QPollSubmission(pollId=poll.ntiid, parts=(idx % 2, response))
+
+        aggregated = aggregate_poll_submission(submission(0), reservoir_size=3)
+        assert_that(aggregated.parts[0], instance_of(QAggregatedMultipleChoicePart))
+        assert_that(aggregated.parts[1],
+                    has_properties('reservoir_size', 3, 'Total', 1, 'seen', 1))
+
+        aggregator = SurveyAggregator(reservoir_size=3)
+        aggregator.extend(submission(x) for x in range(10))
+        first, = aggregator.materialize()
+        assert_that(first.parts[0], has_properties('Total', 10,
+                                                   'Results', is_({0: 5, 1: 5})))
+        assert_that(first.parts[1],
+                    has_properties('reservoir_size', 3, 'Total', 10, 'seen', 10,
+                                   'Results', has_length(3)))
+        aggregated += first
+        assert_that(aggregated.parts[1],
+                    has_properties('Total', 11, 'seen', 11, 'Results', has_length(3)))
+
+        # materializing again does not share the sample
+        aggregator.add(submission(10))
+        second, = aggregator.flush()
+        assert_that(first.parts[1], has_property('Total', 10))
+        assert_that(second.parts[1],
+                    has_properties('Total', 11, 'seen', 11, 'Results', has_length(3)))
+
+    def test_sketched_aggregation(self):
+        free = QNonGradableFreeResponsePart(content=u'there')
+        poll = QPoll(parts=(free,))
+        poll.ntiid = u'tag:nextthought.com,2011-10:AOPS-HTML-poll.5'
+        survey = QSurvey(questions=[poll])
+        survey.ntiid = u'tag:nextthought.com,2011-10:AOPS-HTML-survey.5'
+        for inquiry, provided in ((poll, IQPoll), (survey, IQSurvey)):
+            component.globalSiteManager.registerUtility(inquiry, provided,
+                                                        name=inquiry.ntiid)
+
+        def submission(text):
+            polls = [QPollSubmission(pollId=poll.ntiid, parts=(text,))]
+            return QSurveySubmission(surveyId=survey.ntiid, questions=polls)
+
+        aggregated = aggregate_survey_submission(submission(u'a'), sketch_size=2)
+        assert_that(aggregated[poll.ntiid].parts[0],
+                    has_properties('sketch_size', 2, 'Total', 1))
+
+        texts = [u'a'] * 8 + [u'b'] * 3 + [u'c%s' % x for x in range(4)]
+        aggregator = SurveyAggregator(sketch_size=2)
+        aggregator.extend(submission(x) for x in texts)
+        result, = aggregator.flush()
+        part = result[poll.ntiid].parts[0]
+        assert_that(part, has_properties('sketch_size', 2,
+                                         'Total', len(texts),
+                                         'Results', has_length(2)))
+        assert_that(part.top(1)[0][0], is_(u'a'))
+        aggregated += result
+        assert_that(aggregated[poll.ntiid].parts[0],
+                    has_properties('Total', len(texts) + 1, 'Results', has_length(2)))
+
+        # removing a submission from a sketch fails
+        with self.assertRaises(ValueError):
+            update_aggregated_inquiry(aggregated, submission(u'a'))
+
+        # sketches count a positive number of responses
+        for size in (0, -1, 2.5, u'2', True):
+            with self.assertRaises(ValueError):
+                QAggregatedFreeResponsePart(sketch_size=size)
+            with self.assertRaises(ValueError):
+                aggregate_poll_submission(submission(u'a').questions[0],
+                                          sketch_size=size)
+            with self.assertRaises(ValueError):
+                aggregate_survey_submission(submission(u'a'), sketch_size=size)
+            with self.assertRaises(ValueError):
+                SurveyAggregator(sketch_size=size)
+
+    def test_conflict_resolution(self):
+        def aggregated(*responses):
+            part = QAggregatedMultipleChoicePart()
+            for response in responses:
+                part.append(response)
+            return QAggregatedPoll(pollId=u'poll', parts=PersistentList((part,)))
+
+        # MappingStorage does not resolve conflicts; DemoStorage does
+        db = DB(DemoStorage())
+        tm = transaction.TransactionManager()
+        db.open(tm).root()['aggregated'] = aggregated(0)
+        tm.commit()
+
+        # concurrent merges into the same aggregate
+        tm1 = transaction.TransactionManager()
+        tm2 = transaction.TransactionManager()
+        first = db.open(tm1).root()['aggregated']
+        second = db.open(tm2).root()['aggregated']
+        first += aggregated(0, 1)
+        second += aggregated(1, 1, 2)
+        tm1.commit()
+        tm2.commit()
+
+        tm = transaction.TransactionManager()
+        result = db.open(tm).root()['aggregated']
+        assert_that(result.parts[0].results,
+                    instance_of(ConflictResolvingCounter))
+        assert_that(result.parts[0],
+                    has_properties('Total', 6,
+                                   'Results', is_({0: 2, 1: 3, 2: 1})))
+        db.close()
+
+    def test_subtraction(self):
+        part = QAggregatedMultipleChoicePart()
+        for response in (0, 1, 1):
+            part.append(response)
+        part.remove(1)
+        assert_that(part, has_properties('Total', 2, 'Results', is_({0: 1, 1: 1})))
+        other = QAggregatedMultipleChoicePart()
+        other.append(0)
+        part -= other
+        assert_that(part, has_properties('Total', 1, 'Results', is_({1: 1})))
+
+        part = QAggregatedMultipleChoiceMultipleAnswerPart()
+        part.append((0, 1))
+        part.append((1,))
+        part.remove((0, 1))
+        assert_that(part, has_properties('Total', 1, 'Results', is_({1: 1})))
+
+        part = QAggregatedModeledContentPart()
+        part.append(u'a')
+        part.append(u'b')
+        part.remove(u'a')
+        assert_that(part, has_properties('Total', 1, 'Results', is_([u'b'])))
+
+        part = QAggregatedMatchingPart()
+        part.append({u'a': 1, u'b': 0})
+        part.append({u'a': 1, u'b': 1})
+        part.remove({u'a': 1, u'b': 0})
+        assert_that(part, has_properties('Total', 1,
+                                         'Results', is_({u'a': {1: 1},
+                                                         u'b': {1: 1}})))
+
+    def test_remove_missing(self):
+        part = QAggregatedMultipleChoicePart()
+        with self.assertRaises(ValueError):
+            part.remove(None)
+        part.append(0)
+        with self.assertRaises(ValueError):
+            part.remove(1)
+        other = QAggregatedMultipleChoicePart()
+        other.append(0)
+        other.append(1)
+        with self.assertRaises(ValueError):
+            part -= other
+        assert_that(part, has_properties('Total', 1, 'Results', is_({0: 1})))
+
+        part = QAggregatedMultipleChoiceMultipleAnswerPart()
+        part.append((0, 1))
+        with self.assertRaises(ValueError):
+            part.remove((0, 0))
+        assert_that(part, has_properties('Total', 1, 'Results', is_({0: 1, 1: 1})))
+
+        part = QAggregatedMatchingPart()
+        part.append({u'a': 1, u'b': 0})
+        with self.assertRaises(ValueError):
+            part.remove({u'a': 1, u'b': 1})
+        assert_that(part, has_properties('Total', 1,
+                                         'Results', is_({u'a': {1: 1},
+                                                         u'b': {0: 1}})))
+
+    def test_remove_modeled_content(self):
+        responses = [[u'r%s' % (x % 7)] for x in range(50)]
+        part = QAggregatedModeledContentPart()
+        for response in responses:
+            part.append(response)
+        # the positions are kept up to date across removals and appends
+        for response in responses[::3]:
+            part.remove(response)
+            responses.remove(response)
+        part.append([u'new'])
+        responses.append([u'new'])
+        assert_that(part, has_property('Total', 50 - 17 + 1))
+        assert_that(sorted(part.Results), is_(sorted(responses)))
+        positions = part._v_positions
+        part._v_positions = None
+        assert_that(part._positions(), is_(positions))
+
+        other = QAggregatedModeledContentPart()
+        other.append([u'r1'])
+        other.append([u'missing'])
+        with self.assertRaises(ValueError):
+            part -= other
+        assert_that(sorted(part.Results), is_(sorted(responses)))
+
+        # unhashable responses are looked up in the results
+        part = QAggregatedModeledContentPart()
+        part.append([{u'a': 1}])
+        part.append([u'b'])
+        part.remove([{u'a': 1}])
+        with self.assertRaises(ValueError):
+            part.remove([{u'a': 1}])
+        assert_that(part, has_properties('Total', 1, 'Results', is_([[u'b']])))
+
+    def test_update_aggregated_inquiry(self):
+        choice = QNonGradableMultipleChoicePart(choices=[u'a', u'b', u'c'],
+                                                content=u'here')
+        poll = QPoll(parts=(choice,))
+        poll.ntiid = u'tag:nextthought.com,2011-10:AOPS-HTML-poll.3'
+        survey = QSurvey(questions=[poll])
+        survey.ntiid = u'tag:nextthought.com,2011-10:AOPS-HTML-survey.3'
+        for inquiry, provided in ((poll, IQPoll), (survey, IQSurvey)):
+            component.globalSiteManager.registerUtility(inquiry, provided,
+                                                        name=inquiry.ntiid)
+
+        def submission(choice):
+            polls = [QPollSubmission(pollId=poll.ntiid, parts=(choice,))]
+            return QSurveySubmission(surveyId=survey.ntiid, questions=polls)
+
+        first = submission(0)
+        aggregated = IQAggregatedSurvey(first)
+        second = submission(1)
+        update_aggregated_inquiry(aggregated, new_submission=second)
+        assert_that(aggregated[poll.ntiid].parts[0],
+                    has_properties('Total', 2, 'Results', is_({0: 1, 1: 1})))
+
+        # the second user changes their mind
+        update_aggregated_inquiry(aggregated, second, submission(2))
+        assert_that(aggregated[poll.ntiid].parts[0],
+                    has_properties('Total', 2, 'Results', is_({0: 1, 2: 1})))
+
+        # and the first one withdraws
+        update_aggregated_inquiry(aggregated, old_submission=first)
+        assert_that(aggregated[poll.ntiid].parts[0],
+                    has_properties('Total', 1, 'Results', is_({2: 1})))
+
+        aggregated -= IQAggregatedSurvey(submission(2))
+        assert_that(aggregated[poll.ntiid].parts[0],
+                    has_properties('Total', 0, 'Results', is_({})))
+
+    def test_remove_not_aggregated(self):
+        def choice():
+            return QNonGradableMultipleChoicePart(choices=[u'a', u'b'],
+                                                  content=u'here')
+        first_poll = QPoll(parts=(choice(),))
+        first_poll.ntiid = u'tag:nextthought.com,2011-10:AOPS-HTML-poll.6'
+        second_poll = QPoll(parts=(choice(), choice()))
+        second_poll.ntiid = u'tag:nextthought.com,2011-10:AOPS-HTML-poll.7'
+        survey = QSurvey(questions=[first_poll, second_poll])
+        survey.ntiid = u'tag:nextthought.com,2011-10:AOPS-HTML-survey.6'
+        for inquiry, provided in ((first_poll, IQPoll),
+                                  (second_poll, IQPoll),
+                                  (survey, IQSurvey)):
+            component.globalSiteManager.registerUtility(inquiry, provided,
+                                                        name=inquiry.ntiid)
+
+        def submission(first, second, third):
+            polls = [QPollSubmission(pollId=first_poll.ntiid, parts=(first,)),
+                     QPollSubmission(pollId=second_poll.ntiid, parts=(second, third))]
+            return QSurveySubmission(surveyId=survey.ntiid, questions=polls)
+
+        aggregated = IQAggregatedSurvey(submission(0, 0, 0))
+
+        def assert_unchanged():
+            for agg_poll in aggregated.questions:
+                for part in agg_poll.parts:
+                    assert_that(part, has_properties('Total', 1,
+                                                     'Results', is_({0: 1})))
+
+        # the second part of a poll rejects the removal
+        agg_poll = aggregated[second_poll.ntiid]
+        with self.assertRaises(ValueError):
+            agg_poll.remove(submission(0, 0, 1).questions[1])
+        assert_unchanged()
+
+        # as does the second poll of a survey
+        with self.assertRaises(ValueError):
+            aggregated.remove(submission(0, 0, 1))
+        assert_unchanged()
+
+        aggregated.remove(submission(0, 0, 0))
+        for agg_poll in aggregated.questions:
+            for part in agg_poll.parts:
+                assert_that(part, has_properties('Total', 0, 'Results', is_({})))
+
+    def test_reservoir(self):
+        part = QAggregatedModeledContentPart(reservoir_size=10)
+        for idx in range(100):
+            part.append(idx)
+        part.append(None)
+        assert_that(part, has_properties('Total', 101, 'seen', 100))
+        assert_that(part.Results, has_length(10))
+        assert_that(set(part.Results), has_length(10))
+        assert_that(set(part.Results).issubset(range(100)), is_(True))
+
+        # merging keeps the sample bounded and counts every response
+        other = QAggregatedModeledContentPart(reservoir_size=10)
+        for idx in range(100, 150):
+            other.append(idx)
+        part += other
+        assert_that(part, has_properties('Total', 151, 'seen', 150))
+        assert_that(part.Results, has_length(10))
+        assert_that(set(part.Results).issubset(range(150)), is_(True))
+
+        unbounded = QAggregatedModeledContentPart()
+        unbounded.append(u'a')
+        unbounded.append(u'b')
+        part += unbounded
+        assert_that(part, has_properties('Total', 153, 'seen', 152))
+        assert_that(part.Results, has_length(10))
+
+        # small populations are kept whole
+        part = QAggregatedModeledContentPart(reservoir_size=10)
+        part += unbounded
+        assert_that(sorted(part.Results), is_([u'a', u'b']))
+
+        # responses cannot be removed from a sample
+        with self.assertRaises(ValueError):
+            part.remove(u'a')
+        with self.assertRaises(ValueError):
+            part -= unbounded
+        part.append(None)
+        part.remove(None)
+        assert_that(part, has_properties('Total', 2, 'seen', 2))
+
+        # nor can smaller samples be merged
+        small = QAggregatedModeledContentPart(reservoir_size=5)
+        for idx in range(20):
+            small.append(idx)
+        with self.assertRaises(ValueError):
+            part += small
+        with self.assertRaises(ValueError):
+            unbounded += small
+        assert_that(part, has_properties('Total', 2, 'seen', 2))
+        assert_that(unbounded, has_property('Total', 2))
+        small += part
+        assert_that(small, has_properties('Total', 22, 'seen', 22))
+        assert_that(small.Results, has_length(5))
+
+    def test_reservoir_distribution(self):
+        trials = 2000
+        sampled = [0] * 20
+        merged = [0] * 20
+        # sample with a seeded generator of our own, leaving the global one alone
+        with fudge.patched_context('nti.assessment.survey', 'random',
+                                   random.Random(42)):
+            for _ in range(trials):
+                part = QAggregatedModeledContentPart(reservoir_size=5)
+                for idx in range(5):
+                    part.append(idx)
+                other = QAggregatedModeledContentPart(reservoir_size=5)
+                for idx in range(5, 20):
+                    other.append(idx)
+                for idx in other.Results:
+                    sampled[idx] += 1
+                part += other
+                assert_that(part.Results, has_length(5))
+                for idx in part.Results:
+                    merged[idx] += 1
+        # each response is kept with a probability of 5/15, then 5/20
+        for count in sampled[5:]:
+            assert_that(count, is_(close_to(trials / 3, trials / 20)))
+        for count in merged:
+            assert_that(count, is_(close_to(trials / 4, trials / 20)))
+
+    def test_sketch(self):
+        responses = [u'a'] * 20 + [u'b'] * 10 + [u'c%s' % x for x in range(15)]
+        part = QAggregatedFreeResponsePart(sketch_size=5)
+        for response in responses[::2]:
+            part.append(response)
+        other = QAggregatedFreeResponsePart(sketch_size=5)
+        for response in responses[1::2]:
+            other.append(response)
+        assert_that(part.Results, has_length(5))
+
+        part += other
+        assert_that(part, has_property('Total', len(responses)))
+        assert_that(part.Results, has_length(5))
+        top = part.top(2)
+        assert_that([x[0] for x in top], is_([u'a', u'b']))
+        for response, count, error in part.top(5):
+            actual = responses.count(response)
+            assert_that(count - error <= actual <= count, is_(True))
+
+        # exact parts merge without errors
+        exact = QAggregatedFreeResponsePart()
+        exact.append(u'd')
+        exact.append(u'd')
+        assert_that(exact.top(), is_([(u'd', 2, 0)]))
+        part = QAggregatedFreeResponsePart(sketch_size=5)
+        part += exact
+        assert_that(part.top(), is_([(u'd', 2, 0)]))
+
+        # but sketches cannot be merged into exact counts
+        with self.assertRaises(ValueError):
+            exact += part
+        with self.assertRaises(ValueError):
+            exact -= part
+        assert_that(exact, has_properties('Total', 2, 'Results', is_({u'd': 2})))
+
+    def test_sketch_removal(self):
+        part = QAggregatedFreeResponsePart(sketch_size=5)
+        # concurrent changes to the counts of a sketch conflict
+        assert_that(part.results, is_not(instance_of(ConflictResolvingCounter)))
+        assert_that(part.results, instance_of(PersistentMapping))
+        part.append(u'a')
+        part.append(None)
+
+        other = QAggregatedFreeResponsePart()
+        other.append(u'a')
+        with self.assertRaises(ValueError):
+            part.remove(u'a')
+        with self.assertRaises(ValueError):
+            part -= other
+        part.remove(None)
+        assert_that(part, has_properties('Total', 1, 'Results', is_({u'a': 1})))
+        assert_that(part.top(), is_([(u'a', 1, 0)]))
+
+        part.reset()
+        assert_that(part.results, instance_of(PersistentMapping))
+        assert_that(part.errors, is_({}))
@@ -16,6 +16,8 @@ from functools import total_ordering
 from zope import component
 from zope import interface
 
+from nti.assessment._ntiid_index import query_by_ntiid
+
 from nti.assessment.interfaces import IQPoll
 from nti.assessment.interfaces import IQuestion
 
@@ -72,7 +74,7 @@ class QuestionWeakRef(ItemWeakRef):
 
     def __call__(self):
         # We're not a caching weak ref
-        return component.queryUtility(IQuestion, name=self.ntiid)
+        return query_by_ntiid(IQuestion, self.ntiid)
 
 
 @component.adapter(IQPoll)
@@ -80,7 +82,7 @@ class PollWeakRef(ItemWeakRef):
 
     def __call__(self):
         # We're not a caching weak ref
-        return component.queryUtility(IQPoll, name=self.ntiid)
+        return query_by_ntiid(IQPoll, self.ntiid)
 
 
 def question_wref_to_missing_ntiid(ntiid):